@@ -9,24 +9,37 @@ from fastapi import (
     Depends,
     Path,
     Query,
+    Header,
+    Request,
+    Response,
 )
 from fastapi.responses import JSONResponse
+from typing import List
 from sqlmodel import Session
 from dotenv import load_dotenv
 from src.logger import get_formatted_logger
 from src.config import global_config
 from api.services.document_service import DocumentService
+from api.services.admission_service import tenant_from_request
 from src.db import get_session
-from api.schemas.document_schema import DocumentResponse,DocumentCreate
-from api.schemas.job_schema import JobResponse
+from api.schemas.document_schema import (
+    DocumentResponse,
+    DocumentCreate,
+    BatchUploadResponse,
+    ResumableUploadCreate,
+    ResumableUploadResponse,
+    DocumentChunkPage,
+)
+from api.schemas.job_schema import JobResponse,BatchStatusResponse
+from src.storage import is_archive
 
 load_dotenv()
 logger = get_formatted_logger(__name__)
 document_router = APIRouter(prefix="/document", tags=["document"])
 
 
-def get_document_service(session: Session = Depends(get_session)):
-    return DocumentService(session)
+def get_document_service(request: Request, session: Session = Depends(get_session)):
+    return DocumentService(session, tenant_from_request(request))
 
 
 @document_router.post(
@@ -38,12 +51,14 @@ def get_document_service(session: Session = Depends(get_session)):
 )
 async def upload_document(
     file: UploadFile = File(...),
+    auto_parse: bool = Form(False, description="Parse the document as soon as it is uploaded"),
     document_service: DocumentService = Depends(get_document_service),
 ):
     """
     Upload a document and create a job for processing
 
     - **file**: The file to upload (must be one of the supported formats)
+    - **auto_parse**: Chain the parse task after the upload, its job ID is returned as `parse_job_id`
 
     Returns:
         Document information and job ID
@@ -79,7 +94,7 @@ async def upload_document(
             detail=f"File size exceeds the allowed limit of {global_config.READER_CONFIG.max_file_size/1024/1024}MB",
         )
     try:
-        result = await document_service.create_and_upload_document(file)
+        result = await document_service.create_and_upload_document(file, auto_parse=auto_parse)
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -91,10 +106,14 @@ async def upload_document(
                 "extension": result.extension,
                 "extra_info": result.extra_info,
                 "job_id": result.job_id,
+                "parse_job_id": result.parse_job_id,
                 "status": result.status,
                 "status": result.status,
             }
         )
+    except HTTPException as he:
+        # Re-raise HTTP exceptions, 429 carries its Retry-After header
+        raise he
     except Exception as e:
         logger.error(f"Error uploading document: {str(e)}")
         raise HTTPException(
@@ -103,6 +122,261 @@ async def upload_document(
         )
 
 
+@document_router.post(
+    "/upload/batch",
+    response_model=BatchUploadResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Upload a batch of documents",
+    description="Upload many documents or zip/tar archives and create one job per document",
+)
+async def upload_documents_batch(
+    files: List[UploadFile] = File(...),
+    auto_parse: bool = Form(False, description="Parse each document as soon as it is uploaded"),
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """
+    Upload a batch of documents and create a job for each of them
+
+    - **files**: Files to upload, supported formats or zip/tar archives of them
+    - **auto_parse**: Chain a parse task after each upload, parse jobs are part of the batch
+
+    Returns:
+        Batch ID, documents information and job IDs
+    """
+    extension_allowed = global_config.READER_CONFIG.supported_formats
+
+    if not extension_allowed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No supported file formats configured",
+        )
+
+    for file in files:
+        if not file.filename:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Missing filename"
+            )
+        filename_lower = file.filename.lower()
+        if is_archive(filename_lower):
+            # Members are checked while the archive is extracted
+            if file.size is not None and file.size > global_config.READER_CONFIG.max_archive_size:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"{file.filename}: archive size exceeds the allowed limit of {global_config.READER_CONFIG.max_archive_size/1024/1024}MB",
+                )
+            continue
+        if not any(filename_lower.endswith(ext.lower()) for ext in extension_allowed):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{file.filename}: only {', '.join(extension_allowed)} files or zip/tar archives allowed",
+            )
+        if file.size > global_config.READER_CONFIG.max_file_size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{file.filename}: file size exceeds the allowed limit of {global_config.READER_CONFIG.max_file_size/1024/1024}MB",
+            )
+    try:
+        result = await document_service.create_and_upload_documents(files, auto_parse=auto_parse)
+
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "message": "Batch upload processing in background!",
+                **result.model_dump(mode="json"),
+            },
+        )
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error uploading batch: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error uploading batch: {str(e)}",
+        )
+
+
+@document_router.get(
+    "/batch/status/{batch_uuid}",
+    response_model=BatchStatusResponse,
+    summary="Get batch status",
+    description="Get the aggregated status of all jobs of a batch upload",
+)
+async def get_batch_status(
+    batch_uuid: str = Path(..., description="UUID of the batch to retrieve"),
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """Get the aggregated status of a batch"""
+    try:
+        result = await document_service.get_batch_status(batch_uuid)
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=result.model_dump(mode="json"),
+        )
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error getting batch status: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting batch status: {str(e)}",
+        )
+
+
+@document_router.post(
+    "/upload/resumable",
+    response_model=ResumableUploadResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Start a resumable upload",
+    description="Start a chunked upload for files larger than the single request limit",
+)
+async def create_resumable_upload(
+    upload: ResumableUploadCreate,
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """
+    Start a resumable upload
+
+    - **filename**: Name of the file (must be one of the supported formats)
+    - **size**: Total size of the file in bytes
+    - **sha256**: Optional digest of the file, verified when the upload is finalized
+
+    Returns:
+        Upload ID and current offset
+    """
+    extension_allowed = global_config.READER_CONFIG.supported_formats
+    max_size = global_config.READER_CONFIG.max_resumable_file_size
+
+    filename_lower = upload.filename.lower()
+    if not any(filename_lower.endswith(ext.lower()) for ext in extension_allowed):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Only {', '.join(extension_allowed)} files allowed",
+        )
+    if upload.size <= 0 or upload.size > max_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File size must be between 1 byte and {max_size/1024/1024}MB",
+        )
+
+    result = await document_service.create_resumable_upload(
+        upload.filename, upload.size, upload.sha256
+    )
+    return JSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={
+            **result.model_dump(exclude={"sha256"}),
+            "chunk_size": global_config.STORAGE_CONFIG.upload_chunk_size,
+        },
+        headers={"Upload-Offset": str(result.offset)},
+    )
+
+
+@document_router.head(
+    "/upload/resumable/{upload_id}",
+    summary="Get the offset of a resumable upload",
+)
+async def head_resumable_upload(
+    upload_id: str = Path(..., description="ID of the resumable upload"),
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """Get the number of bytes received so far in the `Upload-Offset` header"""
+    result = await document_service.get_resumable_upload(upload_id)
+    return Response(
+        status_code=status.HTTP_200_OK,
+        headers={"Upload-Offset": str(result.offset), "Upload-Length": str(result.size)},
+    )
+
+
+@document_router.get(
+    "/upload/resumable/{upload_id}",
+    response_model=ResumableUploadResponse,
+    summary="Get a resumable upload",
+)
+async def get_resumable_upload(
+    upload_id: str = Path(..., description="ID of the resumable upload"),
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """Get the state of a resumable upload"""
+    result = await document_service.get_resumable_upload(upload_id)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=result.model_dump(exclude={"sha256"}),
+        headers={"Upload-Offset": str(result.offset)},
+    )
+
+
+@document_router.patch(
+    "/upload/resumable/{upload_id}",
+    response_model=ResumableUploadResponse,
+    summary="Upload a part of a resumable upload",
+    description="Append the raw request body at the given offset",
+)
+async def patch_resumable_upload(
+    request: Request,
+    upload_id: str = Path(..., description="ID of the resumable upload"),
+    upload_offset: int = Header(..., alias="Upload-Offset", description="Offset of the first byte of the body"),
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """
+    Append a part to a resumable upload
+
+    The body is written straight to disk as it is received. On a 409 the
+    `Upload-Offset` response header carries the offset to resume from.
+    """
+    result = await document_service.append_resumable_upload(
+        upload_id, upload_offset, request.stream()
+    )
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=result.model_dump(exclude={"sha256"}),
+        headers={"Upload-Offset": str(result.offset)},
+    )
+
+
+@document_router.post(
+    "/upload/resumable/{upload_id}/finalize",
+    response_model=DocumentResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Finalize a resumable upload",
+    description="Verify the assembled file and create a job for processing",
+)
+async def finalize_resumable_upload(
+    upload_id: str = Path(..., description="ID of the resumable upload"),
+    auto_parse: bool = Query(False, description="Parse the document as soon as it is uploaded"),
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """Verify a complete resumable upload and start processing the document"""
+    result = await document_service.finalize_resumable_upload(upload_id, auto_parse=auto_parse)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "message": "Document upload processing in background!",
+            "uuid": result.uuid,
+            "name": result.name,
+            "source": result.source,
+            "extension": result.extension,
+            "extra_info": result.extra_info,
+            "job_id": result.job_id,
+            "parse_job_id": result.parse_job_id,
+            "status": result.status,
+        },
+    )
+
+
+@document_router.delete(
+    "/upload/resumable/{upload_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Abort a resumable upload",
+)
+async def abort_resumable_upload(
+    upload_id: str = Path(..., description="ID of the resumable upload"),
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """Drop a resumable upload and the bytes received so far"""
+    await document_service.abort_resumable_upload(upload_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @document_router.post(
     "/parse/{document_uuid}",
     response_model=DocumentResponse,
@@ -148,6 +422,40 @@ async def parse_document(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error parsing document: {str(e)}",
         )
+
+
+@document_router.get(
+    "/{document_uuid}/chunks",
+    response_model=DocumentChunkPage,
+    summary="Get document chunks",
+    description="Get the parsed chunks of a document, one page at a time",
+)
+async def get_document_chunks(
+    document_uuid: str = Path(..., description="UUID of the parsed document"),
+    start: int = Query(0, ge=0, description="Chunk index to start from, `next_start` of the previous page"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of chunks to return"),
+    include_metadata: bool = Query(True, description="Include the metadata (e.g. page thumbnails) of the chunks"),
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """Get a page of the chunks of a parsed document"""
+    try:
+        result = await document_service.get_document_chunks(
+            document_uuid, start=start, limit=limit, include_metadata=include_metadata
+        )
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=result.model_dump(mode="json"),
+        )
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error getting document chunks: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting document chunks: {str(e)}",
+        )
+
+
 @document_router.get("/job/status/{job_uuid}",
                     response_model=JobResponse,
                     summary="Get document",
@@ -165,6 +473,7 @@ async def get_document_status(
             content={
                 "file": job.file,
                 "progress": job.progress,
+                "eta_seconds": job.eta_seconds,
                 "task": job.task,
                 "message": job.message,
                 "status": job.status,
@@ -1,5 +1,5 @@
 # api/schemas/document.py
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 from src.db.models import DocumentStatus
@@ -27,7 +27,46 @@ class DocumentResponse(DocumentBase):
     """Response model for Document"""
     uuid: str
     status: DocumentStatus
+    content_hash: Optional[str] = None
+    size: Optional[int] = None
     job_id: Optional[str] = None
+    parse_job_id: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
-    
\ No newline at end of file
+
+class BatchUploadResponse(BaseModel):
+    """Response model for a batch upload"""
+    batch_uuid: str
+    documents: List[DocumentResponse]
+    skipped: List[str] = []
+
+class ResumableUploadCreate(BaseModel):
+    """Create model for a resumable upload"""
+    filename: str
+    size: int
+    sha256: Optional[str] = None
+
+class ResumableUploadResponse(BaseModel):
+    """Response model for a resumable upload"""
+    upload_id: str
+    filename: str
+    size: int
+    offset: int
+    chunk_size: Optional[int] = None
+
+class DocumentChunkResponse(BaseModel):
+    """Response model for a chunk of a parsed document"""
+    uuid: str
+    chunk_index: int
+    text: Optional[str] = None
+    token_count: int = 0
+    extra_info: Optional[Dict[str, Any]] = None
+
+class DocumentChunkPage(BaseModel):
+    """Page of chunks, `next_start` is the `start` of the following page"""
+    document_uuid: str
+    chunk_source_uuid: str
+    start: int
+    limit: int
+    next_start: Optional[int] = None
+    chunks: List[DocumentChunkResponse]
@@ -15,5 +15,16 @@ class JobBase(BaseModel):
 class JobResponse(JobBase):
     """Response model for Job"""
     uuid: str
+    # Parses move page by page for PDF files only, other files stay at the start of the
+    # extraction until their reader returns, then advance while their chunks are stored
+    eta_seconds: Optional[float] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+
+class BatchStatusResponse(BaseModel):
+    """Aggregated status of the jobs of a batch"""
+    batch_uuid: str
+    status: JobStatus
+    total: int
+    progress: int
+    counts: Dict[JobStatus, int]
@@ -0,0 +1,96 @@
+# api/services/admission_service.py
+import math
+from typing import List, Tuple
+from celery.canvas import Signature
+from fastapi import HTTPException, Request
+from sqlmodel import Session
+from src.config import global_config
+from src.db import Job
+from src.logger import get_formatted_logger
+from src.tasks.dispatch import count_deferred, count_in_flight, plan_dispatch
+
+logger = get_formatted_logger(__name__)
+
+
+def tenant_from_request(request: Request) -> str:
+    """
+    Tenant of a request: its client or project key header, else the client address
+
+    The header is not authenticated, it must be set by a trusted proxy. A client sending
+    a new key per request escapes its tenant budget, the deferred jobs of all tenants
+    stay bounded by `AdmissionConfig.max_deferred`.
+    """
+    tenant = request.headers.get(global_config.ADMISSION_CONFIG.tenant_header)
+    if tenant:
+        return tenant.strip()
+    return request.client.host if request.client else "anonymous"
+
+
+def _retry_after(excess: int, drained: int) -> int:
+    """Seconds before retrying `excess` jobs when about `drained` jobs complete per retry period"""
+    admission_config = global_config.ADMISSION_CONFIG
+    return min(
+        admission_config.max_retry_after,
+        admission_config.retry_after * math.ceil(excess / max(drained, 1)),
+    )
+
+
+class AdmissionService:
+    """
+    Admission control of the work submitted by a tenant
+
+    A tenant has at most `AdmissionConfig.max_in_flight` pending and processing jobs,
+    more work is refused with 429. Admitted jobs over the tenant quota of the broker
+    wait in the jobs table and are dispatched round robin between tenants, up to
+    `AdmissionConfig.max_deferred` waiting jobs for all tenants.
+    """
+
+    def __init__(self, session: Session, tenant: str):
+        self.session = session
+        self.tenant = tenant
+
+    def admit(self, jobs: int) -> None:
+        """
+        Refuse new work over the in-flight budget of the tenant or the deferred jobs budget
+
+        Args:
+            jobs (int): Jobs the request creates
+
+        Raises:
+            HTTPException: 429 with a `Retry-After` header when over budget
+        """
+        admission_config = global_config.ADMISSION_CONFIG
+        in_flight = count_in_flight(self.session, self.tenant)
+        excess = in_flight + jobs - admission_config.max_in_flight
+        if excess > 0:
+            logger.warning(f"Tenant {self.tenant} over budget: {in_flight} jobs in flight, {jobs} requested")
+            # The broker drains about one tenant quota per retry period
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many jobs in flight ({in_flight} of {admission_config.max_in_flight}), retry later",
+                headers={"Retry-After": str(_retry_after(excess, admission_config.tenant_queue_quota))},
+            )
+
+        deferred = count_deferred(self.session)
+        excess = deferred + jobs - admission_config.max_deferred
+        if excess > 0:
+            logger.warning(f"Deferred jobs over budget: {deferred} waiting, {jobs} requested by {self.tenant}")
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many jobs waiting for dispatch ({deferred} of {admission_config.max_deferred}), retry later",
+                headers={"Retry-After": str(_retry_after(excess, admission_config.max_queue_depth))},
+            )
+
+    def dispatch(self, entries: List[Tuple[Job, Signature]]) -> List[Signature]:
+        """
+        Keep the new jobs over the broker quota of the tenant waiting, see `plan_dispatch`
+
+        Call it before the jobs are committed and send the returned signatures after.
+
+        Args:
+            entries (List[Tuple[Job, Signature]]): New jobs with their task signature, in submission order
+
+        Returns:
+            List[Signature]: Signatures to send now
+        """
+        return plan_dispatch(self.session, self.tenant, entries)
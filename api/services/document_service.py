@@ -1,45 +1,133 @@
 # api/services/document_service.py
+import asyncio
 import uuid
-from sqlmodel import Session, select
+from typing import AsyncIterator, List, Optional
+from celery import chain, group
+from sqlalchemy import update
+from sqlmodel import Session, select, func
 from fastapi import UploadFile, HTTPException
+from src.config import global_config
 from src.logger import get_formatted_logger
 from src.db import (
     JobStatus,
     JobType,
     Document,
     DocumentStatus,DocumentStep,
-    DocumentJobs, Job
+    DocumentJobs, Job, DocumentChunk
 )
+from src.celery_worker import celery_app
+from src.task_routes import queue_for_file
+from src.tasks.dedup import find_parsed_duplicate, reuse_parsed_chunks
+from src.tasks.priority import parse_task_options
 from src.tasks import (
     upload_document,
     parse_document,
 )
-from api.schemas.document_schema import DocumentResponse
-from api.schemas.job_schema import JobResponse
+from api.schemas.document_schema import (
+    DocumentResponse,
+    BatchUploadResponse,
+    DocumentChunkPage,
+    DocumentChunkResponse,
+)
+from api.schemas.job_schema import JobResponse, BatchStatusResponse
 from api.services.job_service import JobService
-import base64
+from api.services.admission_service import AdmissionService
+from src.storage import (
+    StagedFile,
+    ResumableUpload,
+    get_staging_area,
+    get_blob_store,
+    get_resumable_upload_store,
+    get_storage,
+    is_archive,
+    UploadOffsetMismatch,
+)
 
 logger = get_formatted_logger(__name__)
 
 
 class DocumentService:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, tenant: str = "anonymous"):
         self.session = session
+        self.tenant = tenant
         self.job_service = JobService(session)
+        self.admission = AdmissionService(session, tenant)
+        self.staging_area = get_staging_area()
+        self.blob_store = get_blob_store()
+        self.resumable_uploads = get_resumable_upload_store()
+
+    def _add_pending_parse_job(
+        self, document: Document, batch_uuid: Optional[str] = None, priority: Optional[int] = None
+    ) -> str:
+        """Add the parse job run right after the upload of `document` (auto parse)"""
+        parse_job_uuid = str(uuid.uuid4())
+        self.session.add(
+            Job(
+                uuid=parse_job_uuid,
+                type=JobType.PARSE,
+                status=JobStatus.PENDING,
+                message=f"Parse task queued after upload, document: {document.name}",
+                file=document.name,
+                batch_uuid=batch_uuid,
+                tenant=self.tenant,
+                priority=priority,
+            )
+        )
+        self.session.add(DocumentJobs(document_uuid=document.uuid, job_uuid=parse_job_uuid))
+        return parse_job_uuid
+
+    def _upload_signature(
+        self,
+        blob_ref: dict,
+        filename: str,
+        job_uuid: str,
+        parse_job_uuid: Optional[str] = None,
+        parse_options: Optional[dict] = None,
+    ):
+        """
+        Upload task, chained with the parse task when `parse_job_uuid` is given
+
+        `parse_options` are the priority, time limits and work units of the parse, see `parse_task_options`
+        """
+        upload = upload_document.signature(
+            args=["test-bucket", blob_ref, filename],
+            task_id=job_uuid,
+        )
+        if parse_job_uuid is None:
+            return upload
+        # The parse task receives the upload result, with the file location, as first argument
+        parse = parse_document.signature(task_id=parse_job_uuid, **(parse_options or {}))
+        return chain(upload, parse)
 
     async def create_and_upload_document(
-        self, file: UploadFile
+        self, file: UploadFile, auto_parse: bool = False
     ) -> DocumentResponse:
         """Create a new document and start the upload process asynchronously"""
+        # Refused before the file is read when the tenant is over budget
+        self.admission.admit(2 if auto_parse else 1)
+        try:
+            filename = file.filename.lower() if file.filename else "unknown_file"
+
+            # Stream file content to the staging area
+            staged = await self.staging_area.stage_upload(file, filename)
+        except Exception as e:
+            logger.error(f"Error staging document: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail=f"Failed to create document: {str(e)}"
+            )
+        return await self.create_and_upload_staged_document(staged, auto_parse=auto_parse)
+
+    async def create_and_upload_staged_document(
+        self, staged: StagedFile, auto_parse: bool = False
+    ) -> DocumentResponse:
+        """Create a new document from a staged file and start the upload process asynchronously"""
         # Generate job ID and document ID
         job_uuid = str(uuid.uuid4())
         doc_uuid = str(uuid.uuid4())
+        filename = staged.filename
 
         try:
-            filename = file.filename.lower() if file.filename else "unknown_file"
-
-            # Read file content
-            file_content = await file.read()
+            blob_ref = await asyncio.to_thread(self.blob_store.put_staged, staged)
 
             # Create job record first
             job = await self.job_service.create_job(
@@ -48,6 +136,7 @@ class DocumentService:
                 file=filename,
                 type=JobType.UPLOAD,
                 status=JobStatus.PENDING,  # Change to PROCESSING immediately
+                tenant=self.tenant,
             )
 
             # Create document record with initial status
@@ -58,7 +147,8 @@ class DocumentService:
                 source="",  # Temporary source until updated by task
                 extension=filename.split(".")[-1] if "." in filename else "",
                 status=DocumentStatus.UPLOADING,  # New status to indicate process started
-                text=base64.b64encode(file_content).decode("ascii"),
+                content_hash=blob_ref.sha256,
+                size=blob_ref.size,
                 extra_info={},
             )
 
@@ -69,23 +159,35 @@ class DocumentService:
 
             document_jobs = DocumentJobs(document_uuid=document.uuid, job_uuid=job_uuid)
             self.session.add(document_jobs)
-            self.session.commit()
-            
-            upload_document.apply_async(
-                args=[
-                    "test-bucket",
-                    file_content,
-                    filename,
-                ],
-                task_id=job_uuid,
+            # Reads the pages or sheets of the file from the storage
+            parse_options = (
+                await asyncio.to_thread(parse_task_options, filename, blob_ref.key, blob_ref.size)
+                if auto_parse else None
             )
+            parse_job_uuid = None
+            if auto_parse:
+                parse_job_uuid = self._add_pending_parse_job(document, priority=parse_options["priority"])
+                # Ranks the chain while it waits for dispatch
+                job.priority = parse_options["priority"]
+            # Sent now, or kept waiting when the tenant has its share of the broker
+            signatures = self.admission.dispatch([
+                (job, self._upload_signature(
+                    blob_ref.model_dump(), filename, job_uuid, parse_job_uuid, parse_options
+                ))
+            ])
+            self.session.commit()
+
+            for signature in signatures:
+                signature.apply_async()
             response.job_id = job_uuid  # Include job ID for status checking
+            response.parse_job_id = parse_job_uuid
 
             return response
 
         except Exception as e:
             # Rollback and set failure status
             self.session.rollback()
+            self.staging_area.discard(staged)
             
             if 'job' in locals():
                 await self.job_service.update_job(
@@ -100,6 +202,201 @@ class DocumentService:
                 status_code=500, detail=f"Failed to create document: {str(e)}"
             )
 
+    async def create_and_upload_documents(
+        self, files: List[UploadFile], auto_parse: bool = False
+    ) -> BatchUploadResponse:
+        """Create documents for many files or archives and start their uploads as one group"""
+        batch_uuid = str(uuid.uuid4())
+        reader_config = global_config.READER_CONFIG
+        staged_files: List[StagedFile] = []
+        skipped: List[str] = []
+        committed = False
+        jobs_per_file = 2 if auto_parse else 1
+        # Archives expand to more files, checked again once they are staged
+        self.admission.admit(len(files) * jobs_per_file)
+
+        try:
+            # Stream every file (and every archive member) to the staging area, archives
+            # stop extracting as soon as the batch is over its file count or extracted size
+            extracted_size = 0
+            for file in files:
+                filename = file.filename.lower() if file.filename else "unknown_file"
+                try:
+                    if is_archive(filename):
+                        staged = await self.staging_area.stage_upload(
+                            file, filename, max_size=reader_config.max_archive_size
+                        )
+                        members, archive_skipped = await asyncio.to_thread(
+                            self.staging_area.stage_archive_members,
+                            staged,
+                            reader_config.supported_formats,
+                            reader_config.max_file_size,
+                            reader_config.max_batch_files - len(staged_files),
+                            reader_config.max_archive_extracted_size - extracted_size,
+                        )
+                        staged_files.extend(members)
+                        skipped.extend(archive_skipped)
+                        extracted_size += sum(member.size for member in members)
+                    else:
+                        staged_files.append(await self.staging_area.stage_upload(file, filename))
+                except ValueError as e:
+                    raise HTTPException(status_code=413, detail=str(e))
+                if len(staged_files) > reader_config.max_batch_files:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Batch exceeds the limit of {reader_config.max_batch_files} files",
+                    )
+
+            if not staged_files:
+                raise HTTPException(status_code=400, detail="No supported files found in batch")
+            self.admission.admit(len(staged_files) * jobs_per_file)
+
+            # Create all records in a single transaction
+            uploads = []
+            responses = []
+            for staged in staged_files:
+                blob_ref = await asyncio.to_thread(self.blob_store.put_staged, staged)
+                job_uuid = str(uuid.uuid4())
+                document = Document(
+                    uuid=str(uuid.uuid4()),
+                    name=staged.filename,
+                    step=DocumentStep.UPLOAD,
+                    source="",
+                    extension=staged.filename.split(".")[-1] if "." in staged.filename else "",
+                    status=DocumentStatus.UPLOADING,
+                    content_hash=blob_ref.sha256,
+                    size=blob_ref.size,
+                    extra_info={},
+                )
+                job = Job(
+                    uuid=job_uuid,
+                    type=JobType.UPLOAD,
+                    status=JobStatus.PENDING,
+                    message=f"Upload task submitted to queue, document: {staged.filename}",
+                    file=staged.filename,
+                    batch_uuid=batch_uuid,
+                    tenant=self.tenant,
+                )
+                self.session.add(job)
+                self.session.add(document)
+                self.session.add(DocumentJobs(document_uuid=document.uuid, job_uuid=job_uuid))
+                parse_options = (
+                    await asyncio.to_thread(parse_task_options, staged.filename, blob_ref.key, blob_ref.size)
+                    if auto_parse else None
+                )
+                parse_job_uuid = None
+                if auto_parse:
+                    parse_job_uuid = self._add_pending_parse_job(document, batch_uuid, parse_options["priority"])
+                    # Ranks the chain while it waits for dispatch
+                    job.priority = parse_options["priority"]
+                uploads.append((
+                    job,
+                    self._upload_signature(
+                        blob_ref.model_dump(), staged.filename, job_uuid, parse_job_uuid, parse_options
+                    ),
+                ))
+                responses.append(
+                    DocumentResponse(
+                        **document.model_dump(), job_id=job_uuid, parse_job_id=parse_job_uuid
+                    )
+                )
+
+            # Uploads over the share of the tenant wait in the jobs table
+            signatures = self.admission.dispatch(uploads)
+            self.session.commit()
+            committed = True
+
+            # Dispatch the batch with a single broker round trip
+            if signatures:
+                group(signatures).apply_async()
+
+            return BatchUploadResponse(
+                batch_uuid=batch_uuid, documents=responses, skipped=skipped
+            )
+
+        except Exception as e:
+            self.session.rollback()
+            for staged in staged_files:
+                self.staging_area.discard(staged)
+
+            if committed:
+                self.session.execute(
+                    update(Job)
+                    .where(Job.batch_uuid == batch_uuid)
+                    .values(
+                        status=JobStatus.FAILED,
+                        message=f"Failed to initiate batch upload: {str(e)}",
+                    )
+                )
+                self.session.commit()
+
+            if isinstance(e, HTTPException):
+                raise
+            logger.error(f"Error creating batch {batch_uuid}: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail=f"Failed to create batch: {str(e)}"
+            )
+
+    async def create_resumable_upload(
+        self, filename: str, size: int, sha256: Optional[str] = None
+    ) -> ResumableUpload:
+        """Start a resumable upload, admitted when it is finalized since no job is created before"""
+        try:
+            return self.resumable_uploads.create(filename.lower(), size, sha256)
+        except Exception as e:
+            logger.error(f"Error creating resumable upload: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail=f"Failed to create resumable upload: {str(e)}"
+            )
+
+    async def get_resumable_upload(self, upload_id: str) -> ResumableUpload:
+        """Get the current offset of a resumable upload"""
+        try:
+            return self.resumable_uploads.get(upload_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Upload not found")
+
+    async def append_resumable_upload(
+        self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]
+    ) -> ResumableUpload:
+        """Append a part to a resumable upload"""
+        try:
+            return await self.resumable_uploads.append(upload_id, offset, chunks)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Upload not found")
+        except UploadOffsetMismatch as e:
+            raise HTTPException(
+                status_code=409,
+                detail=str(e),
+                headers={"Upload-Offset": str(e.expected)},
+            )
+        except BlockingIOError:
+            raise HTTPException(
+                status_code=409, detail="Another part of this upload is being written"
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+
+    async def finalize_resumable_upload(
+        self, upload_id: str, auto_parse: bool = False
+    ) -> DocumentResponse:
+        """Verify a complete resumable upload and start the document upload process"""
+        self.admission.admit(2 if auto_parse else 1)
+        try:
+            staged = await self.resumable_uploads.finalize(upload_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Upload not found")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return await self.create_and_upload_staged_document(staged, auto_parse=auto_parse)
+
+    async def abort_resumable_upload(self, upload_id: str) -> None:
+        """Drop a resumable upload"""
+        try:
+            self.resumable_uploads.abort(upload_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Upload not found")
+
     async def parse_document(self, document_uuid: str) -> DocumentResponse:
         """Parse a document and extract its content"""
         job_uuid = str(uuid.uuid4())
@@ -137,13 +434,39 @@ class DocumentService:
                  (document.status == DocumentStatus.FAILED or document.status == DocumentStatus.PARSING)
                 )
             ):
+                if document.step == DocumentStep.UPLOAD:
+                    # Parse already chained after the upload (auto parse)
+                    queued_job = self.session.exec(
+                        select(Job)
+                        .join(DocumentJobs, DocumentJobs.job_uuid == Job.uuid)
+                        .where(
+                            DocumentJobs.document_uuid == document.uuid,
+                            Job.type == JobType.PARSE,
+                            Job.status.in_([JobStatus.PENDING, JobStatus.PROCESSING]),
+                        )
+                    ).first()
+                    if queued_job:
+                        return DocumentResponse(**document.model_dump(), job_id=queued_job.uuid)
+
+                duplicate = find_parsed_duplicate(self.session, document)
+                if duplicate:
+                    return await self._reuse_parsed_chunks(document, duplicate, job_uuid)
+
                 # Create a new parsing job
+                self.admission.admit(1)
+                parse_options = await asyncio.to_thread(
+                    parse_task_options,
+                    document.source,
+                    get_storage().key_from_uri(document.source),
+                    document.size,
+                )
                 job = await self.job_service.create_job(
                     job_uuid=job_uuid,
                     message=f"Parsing document: {document_uuid}",
                     file=document.name,
                     type=JobType.PARSE,
                     status=JobStatus.PENDING,
+                    tenant=self.tenant,
                 )
                 document.step = DocumentStep.PARSE
                 document.status = DocumentStatus.PARSING
@@ -151,18 +474,26 @@ class DocumentService:
                 self.session.flush()
                 self.session.refresh(document)
 
+                job.priority = parse_options["priority"]
+                self.session.add(job)
                 document_jobs = DocumentJobs(document_uuid=document.uuid, job_uuid=job.uuid)
                 self.session.add(document_jobs)
                 self.session.flush()
+                # Parsing task, the size is not part of the task arguments seen by the router
+                signatures = self.admission.dispatch([
+                    (job, parse_document.signature(
+                        args=[
+                            document.source
+                        ],
+                        task_id=job_uuid,
+                        queue=queue_for_file(document.source, document.size),
+                        **parse_options,
+                    ))
+                ])
                 self.session.commit()
                 self.session.refresh(document)
-                # Submit parsing task
-                parse_document.apply_async(
-                    args=[
-                        document.source
-                    ],
-                    task_id=job_uuid,
-                )
+                for signature in signatures:
+                    signature.apply_async()
 
                 return DocumentResponse(
                     **document.model_dump(),job_id = job_uuid
@@ -190,6 +521,30 @@ class DocumentService:
             raise HTTPException(
                 status_code=500, detail=f"Failed to pasre document: {str(e)}"
             )   
+    async def _reuse_parsed_chunks(
+        self, document: Document, duplicate: Document, job_uuid: str
+    ) -> DocumentResponse:
+        """Mark a document as parsed by referencing the chunks of a duplicate"""
+        task_response = reuse_parsed_chunks(
+            self.session, document, duplicate, job_uuid, parse_document.name
+        )
+        job = Job(
+            uuid=job_uuid,
+            type=JobType.PARSE,
+            status=JobStatus.COMPLETED,
+            progress=100,
+            message=task_response.message,
+            file=document.name,
+            task=task_response.model_dump(),
+            tenant=self.tenant,
+        )
+        self.session.add(job)
+        self.session.add(DocumentJobs(document_uuid=document.uuid, job_uuid=job_uuid))
+        self.session.commit()
+        self.session.refresh(document)
+
+        return DocumentResponse(**document.model_dump(), job_id=job_uuid)
+
     async def get_document(self, document_uuid: str) -> Document:
         """Retrieve a document by UUID"""
         try:
@@ -207,6 +562,52 @@ class DocumentService:
                 status_code=500, detail=f"Failed to get document: {str(e)}"
             )
 
+    async def get_document_chunks(
+        self,
+        document_uuid: str,
+        start: int = 0,
+        limit: int = 100,
+        include_metadata: bool = True,
+    ) -> DocumentChunkPage:
+        """Get a page of the chunks of a parsed document, ordered by chunk index"""
+        document = await self.get_document(document_uuid)
+        try:
+            # Documents deduplicated by content hash read the chunks of their source document
+            chunk_source_uuid = document.chunk_source_uuid or document.uuid
+            columns = [
+                DocumentChunk.uuid,
+                DocumentChunk.chunk_index,
+                DocumentChunk.text,
+                DocumentChunk.token_count,
+            ]
+            if include_metadata:
+                columns.append(DocumentChunk.extra_info)
+            # Keyset pagination on (document_uuid, chunk_index), served by the composite index
+            rows = self.session.exec(
+                select(*columns)
+                .where(
+                    DocumentChunk.document_uuid == chunk_source_uuid,
+                    DocumentChunk.chunk_index >= start,
+                )
+                .order_by(DocumentChunk.chunk_index)
+                .limit(limit + 1)
+            ).all()
+
+            chunks = [DocumentChunkResponse(**row._mapping) for row in rows[:limit]]
+            return DocumentChunkPage(
+                document_uuid=document.uuid,
+                chunk_source_uuid=chunk_source_uuid,
+                start=start,
+                limit=limit,
+                next_start=rows[limit].chunk_index if len(rows) > limit else None,
+                chunks=chunks,
+            )
+        except Exception as e:
+            logger.error(f"Error getting document chunks: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail=f"Failed to get document chunks: {str(e)}"
+            )
+
     # Add a new endpoint to check the status of a job
     async def get_document_status(self, job_uuid: str) -> JobResponse:
         """Get the current status of a job"""
@@ -229,8 +630,17 @@ class DocumentService:
                 if document:
                     return JobResponse(**job.model_dump())
             
+            response = JobResponse(**job.model_dump())
+            if job.status == JobStatus.PROCESSING:
+                # Live progress is published to the result backend, the jobs table lags behind
+                result = celery_app.AsyncResult(job_uuid)
+                if result.state == "PROGRESS" and isinstance(result.info, dict):
+                    response.progress = max(response.progress, result.info.get("current", 0))
+                    response.message = result.info.get("message") or response.message
+                    response.eta_seconds = result.info.get("eta_seconds")
+
             # Otherwise return just the job status
-            return JobResponse(**job.model_dump())
+            return response
                 
         except HTTPException:
             raise
@@ -239,3 +649,42 @@ class DocumentService:
             raise HTTPException(
                 status_code=500, detail=f"Failed to get job status: {str(e)}"
             )
+
+    async def get_batch_status(self, batch_uuid: str) -> BatchStatusResponse:
+        """Get the aggregated status of the jobs of a batch"""
+        try:
+            rows = self.session.exec(
+                select(Job.status, func.count(Job.id), func.sum(Job.progress))
+                .where(Job.batch_uuid == batch_uuid)
+                .group_by(Job.status)
+            ).all()
+            if not rows:
+                raise HTTPException(status_code=404, detail="Batch not found")
+
+            counts = {job_status: count for job_status, count, _ in rows}
+            total = sum(counts.values())
+            progress = sum(progress_sum or 0 for _, _, progress_sum in rows) // total
+
+            if counts.get(JobStatus.PENDING, 0) == total:
+                batch_status = JobStatus.PENDING
+            elif counts.get(JobStatus.PENDING, 0) or counts.get(JobStatus.PROCESSING, 0):
+                batch_status = JobStatus.PROCESSING
+            elif counts.get(JobStatus.FAILED, 0):
+                batch_status = JobStatus.FAILED
+            else:
+                batch_status = JobStatus.COMPLETED
+
+            return BatchStatusResponse(
+                batch_uuid=batch_uuid,
+                status=batch_status,
+                total=total,
+                progress=progress,
+                counts=counts,
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting batch status: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail=f"Failed to get batch status: {str(e)}"
+            )
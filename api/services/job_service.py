@@ -20,6 +20,7 @@ class JobService:
         file: str = None,
         type: JobType = JobType.PARSE,
         status: JobStatus = JobStatus.PENDING,
+        tenant: Optional[str] = None,
     ) -> Job:
         try:
             job = Job(
@@ -29,6 +30,7 @@ class JobService:
                 progress=progress,
                 message=message,
                 file=file,
+                tenant=tenant,
             )
             self.session.add(job)
             self.session.commit()
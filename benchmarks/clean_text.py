@@ -0,0 +1,61 @@
+# benchmarks/clean_text.py
+"""
+Throughput of `clean_text_for_db` on multi-MB texts, against the former
+four-pass implementation.
+
+Run from the repository root: `python -m benchmarks.clean_text --size-mb 4`
+"""
+import argparse
+import random
+import re
+import time
+from src.text import clean_text_for_db
+
+
+def legacy_clean_text_for_db(text: str) -> str:
+    text = re.sub(r"[\x00-\x1F\x7F]", "", text)
+    text = re.sub(r"[\uFDD0-\uFDEF]", "", text)
+    text = re.sub(r"[\uFFFE\uFFFF]", "", text)
+    text = re.sub(r"[\u200B-\u200F\u202A-\u202E\u2060-\u206F]", "", text)
+    return text.strip()
+
+
+def make_text(size: int, alphabet: str, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return "".join(rng.choices(alphabet, k=size))
+
+
+def measure(func, text: str, repeat: int) -> float:
+    """Best throughput over `repeat` runs, in MB/s"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return len(text.encode("utf-8")) / best / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024 * 1024)
+    printable = "".join(chr(c) for c in range(0x20, 0x7F))
+    texts = {
+        "ascii": make_text(size, printable + "\n\t"),
+        "ascii+control": make_text(size, printable * 20 + "\x00\x07\x1b\n\t"),
+        "unicode": make_text(size, printable * 20 + "éàü中文日本語\u200b\u2060\ufdd0\n"),
+    }
+
+    print(f"{'text':<16}{'legacy MB/s':>14}{'current MB/s':>14}{'speedup':>10}")
+    for name, text in texts.items():
+        assert clean_text_for_db(text) == legacy_clean_text_for_db(text)
+        legacy = measure(legacy_clean_text_for_db, text, args.repeat)
+        current = measure(clean_text_for_db, text, args.repeat)
+        print(f"{name:<16}{legacy:>14.1f}{current:>14.1f}{current / legacy:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 # src/celery.py
 from celery import Celery
+from celery.signals import celeryd_init
 from src.config import global_config
+from src.task_routes import PRIORITY_SEP, PRIORITY_STEPS, QUEUE_LIGHT, configure_queue_worker, route_task
 
 celery_app = Celery(
     "document_task",
@@ -17,8 +19,27 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
+    # Defaults, parse tasks are sent with limits estimated from their file (src/tasks/time_limits.py)
     task_time_limit=600,  # 10 minutes
     task_soft_time_limit=300,  # 5 minutes
     worker_max_tasks_per_child=200,  # Restart worker after 200 tasks
-    worker_prefetch_multiplier=4,  # One task at a time
-)
\ No newline at end of file
+    worker_prefetch_multiplier=1,  # One task at a time per process, `light` workers prefetch more (QueueConfig.workers)
+    # Tasks are routed by file type and size (light, cpu, llm and audio queues)
+    task_default_queue=QUEUE_LIGHT,
+    task_routes=(route_task,),
+    # Parses are sent with a priority from their expected duration, short ones overtake long ones.
+    # Queues keep the default round robin, a worker consuming several queues serves them all
+    broker_transport_options={
+        "priority_steps": PRIORITY_STEPS,
+        "sep": PRIORITY_SEP,
+    },
+    # Jobs over the quota of their tenant wait in the jobs table, sent round robin with
+    # their priority raised every `PriorityConfig.aging_interval` waited
+    beat_schedule={
+        "dispatch-deferred-jobs": {
+            "task": "document.dispatch_deferred",
+            "schedule": global_config.ADMISSION_CONFIG.dispatch_interval,
+        },
+    },
+)
+celeryd_init.connect(configure_queue_worker)
\ No newline at end of file
@@ -74,6 +74,14 @@ class ReaderConfig(BaseModel):
     enable_tables: bool = True
     max_pages: int = 100
     max_file_size: int = 20971520  # 20MB
+    max_resumable_file_size: int = 2147483648  # 2GB, for chunked resumable uploads
+    max_batch_files: int = 1000
+    max_archive_size: int = 209715200  # 200MB, zip/tar archive of a batch upload
+    max_archive_extracted_size: int = 1073741824  # 1GB, members extracted from the archives of a batch
+    parse_batch_size: int = 200  # parsed documents sanitized, counted and written together
+    pdf_split_min_pages: int = 200  # PDFs with at least this many pages are parsed by page ranges, 0 disables
+    pdf_split_pages: int = 50  # pages parsed by each page range subtask
+    checkpoint_pages: int = 25  # PDF pages parsed between two checkpoints of a parse
     supported_formats: list[str] = (
         SUPPORTED_NORMAL_FILE_EXTENSIONS
         + SUPPORTED_SPECIAL_FILE_EXTENSIONS
@@ -81,8 +89,136 @@ class ReaderConfig(BaseModel):
     )  # For future extension
 
 
+class StorageConfig(BaseModel):
+    """Configuration for file storage"""
+
+    backend: str = "local"  # "local" or "s3"
+    local_dir: str = "data"
+    bucket: str = "document-parser"
+    staging_dir: str = "data/staging"
+    upload_chunk_size: int = 1048576  # 1MB
+    resumable_upload_ttl: int = 86400  # seconds before an idle resumable upload is dropped
+    resumable_cleanup_interval: int = 3600  # seconds between two sweeps of the idle resumable uploads
+    s3_multipart_threshold: int = 8388608  # 8MB
+    s3_multipart_chunksize: int = 8388608  # 8MB
+    s3_max_concurrency: int = 10
+    s3_max_pool_connections: int = 20
+    s3_range_block_size: int = 1048576  # 1MB
+    fsync: str = "none"  # "none", "file" or "full" (file and parent directory)
+
+
+class TokenizerConfig(BaseModel):
+    """Configuration for token counting"""
+
+    encoding_name: str = "cl100k_base"
+    num_threads: int = 4
+    memo_size: int = 10000  # counts of recently seen chunks, keyed by text hash
+    estimate_threshold: int = 1000000  # characters, longer texts are estimated
+    chars_per_token: float = 4.0  # estimator ratio until calibrated by exact counts
+
+
+class ProgressConfig(BaseModel):
+    """Configuration for task progress reporting"""
+
+    min_interval: float = 1.0  # seconds between two progress updates in the result backend
+    min_delta: float = 1.0  # percent of progress needed for a new update
+    db_interval: float = 15.0  # seconds between two progress writes to the jobs table
+
+
+class QueueConfig(BaseModel):
+    """Configuration for task queues, see `src/task_routes.py`"""
+
+    light_max_size: int = 1048576  # 1MB, larger files of light extensions go to the cpu queue
+    cpu_extensions: list[str] = [".pdf", ".docx", ".xlsx", ".xls"]
+    llm_extensions: list[str] = [".jpg", ".jpeg", ".png"]  # OCR through the LLM
+    audio_extensions: list[str] = [".wav", ".mp3", ".m4a", ".mp4"]
+    # Celery settings of a worker consuming a single queue (`-Q <queue>`), command line options win
+    workers: dict[str, dict[str, Any]] = {
+        "light": {"worker_concurrency": 8, "worker_prefetch_multiplier": 4},  # short tasks, prefetch hides the broker round trip
+        "cpu": {"worker_prefetch_multiplier": 1},  # one process per core
+        "llm": {"worker_concurrency": 16, "worker_prefetch_multiplier": 1},
+        "audio": {
+            "worker_concurrency": 2,
+            "worker_prefetch_multiplier": 1,
+            "task_soft_time_limit": 1800,
+            "task_time_limit": 2100,
+        },
+    }
+
+
+class RetryConfig(BaseModel):
+    """Configuration for task retries, see `src/tasks/errors.py`"""
+
+    base_delay: float = 10.0  # seconds before the first retry of a transient error
+    max_delay: float = 300.0
+    rate_limit_base_delay: float = 30.0  # seconds before the first retry of a rate limited LLM call
+    rate_limit_max_retries: int = 6
+
+
+class TimeLimitConfig(BaseModel):
+    """Configuration for per task time limits, see `src/tasks/time_limits.py`"""
+
+    overhead: float = 10.0  # seconds of a parse whatever the file size
+    # Seconds per unit of work before calibration: PDF pages, Excel sheets, MB for other files
+    prior_rates: dict[str, float] = {
+        ".pdf": 1.5,
+        ".xlsx": 20.0,
+        ".xls": 20.0,
+        ".wav": 15.0,
+        ".mp3": 60.0,
+        ".m4a": 60.0,
+        ".mp4": 30.0,
+        ".jpg": 30.0,
+        ".jpeg": 30.0,
+        ".png": 30.0,
+    }
+    default_rate: float = 10.0  # seconds per MB of other extensions
+    safety_factor: float = 3.0  # soft limit over the expected duration
+    min_soft_time_limit: int = 30
+    max_soft_time_limit: int = 3600
+    hard_time_limit_margin: int = 60  # seconds between the soft and the hard limit, at least
+    calibration_weight: float = 0.2  # weight of an observed duration in the calibrated rate
+    calibration_min_samples: int = 5  # observed durations needed before the calibrated rate is used
+
+
+class PriorityConfig(BaseModel):
+    """Configuration for parse priorities, see `src/tasks/priority.py`"""
+
+    # Upper bounds in seconds of the expected duration of priorities 0, 1, ... (0 runs first),
+    # longer parses get the lowest priority, len(duration_thresholds)
+    duration_thresholds: list[float] = [20, 40, 80, 160, 320, 640, 1280, 2560, 5120]
+    aging_interval: float = 120.0  # seconds a waiting parse waits before it is raised one priority
+
+
+class AdmissionConfig(BaseModel):
+    """Configuration for admission control and fair dispatch, see `src/tasks/dispatch.py`"""
+
+    tenant_header: str = "X-Tenant-Key"  # client or project key set by a trusted proxy, the client address without it
+    max_in_flight: int = 2000  # pending and processing jobs of a tenant, more are refused with 429
+    tenant_queue_quota: int = 100  # jobs of a tenant in the broker at a time, the others wait in the jobs table
+    max_queue_depth: int = 5000  # jobs sent and not started, waiting jobs are not dispatched above it
+    max_deferred: int = 50000  # jobs of all tenants waiting for dispatch, more work is refused with 429
+    pending_timeout: float = 21600.0  # seconds a sent job may stay pending, its broker message is taken as lost after
+    retry_after: int = 30  # seconds in the Retry-After header per quota of jobs over the budget
+    max_retry_after: int = 600
+    dispatch_interval: float = 2.0  # seconds between two passes of the dispatch task
+
+
+class DatabaseConfig(BaseModel):
+    """Configuration for database writes"""
+
+    chunk_batch_size: int = 2000  # chunks buffered before they are written
+    chunk_batch_bytes: int = 33554432  # 32MB, text and metadata buffered before they are written
+    chunk_copy_threshold: int = 1000  # batches at least this large use COPY on PostgreSQL
+
+
 class Config:
     CELERY_BROKER_URL: str = os.environ.get("CELERY_BROKER_URL", "")
+    AWS_ACCESS_KEY_ID: str = os.environ.get("AWS_ACCESS_KEY_ID", "")
+    AWS_SECRET_ACCESS_KEY: str = os.environ.get("AWS_SECRET_ACCESS_KEY", "")
+    AWS_REGION_NAME: str = os.environ.get("AWS_REGION_NAME", "us-east-1")
+    AWS_STORAGE_TYPE: str = os.environ.get("AWS_STORAGE_TYPE", "s3")
+    AWS_ENDPOINT_URL: str | None = os.environ.get("AWS_ENDPOINT_URL") or None
     OPENAI_CONFIG = LLMConfig(
         api_key=os.environ.get("OPENAI_API_KEY", ""),
         provider=LLMProviderType.OPENAI,
@@ -101,6 +237,21 @@ class Config:
         system_prompt=LLM_SYSTEM_PROMPT,
     )
     READER_CONFIG = ReaderConfig()
+    DATABASE_CONFIG = DatabaseConfig()
+    TOKENIZER_CONFIG = TokenizerConfig()
+    PROGRESS_CONFIG = ProgressConfig()
+    QUEUE_CONFIG = QueueConfig()
+    RETRY_CONFIG = RetryConfig()
+    TIME_LIMIT_CONFIG = TimeLimitConfig()
+    PRIORITY_CONFIG = PriorityConfig()
+    ADMISSION_CONFIG = AdmissionConfig()
+    STORAGE_CONFIG = StorageConfig(
+        backend=os.environ.get("STORAGE_BACKEND", "local"),
+        local_dir=os.environ.get("STORAGE_DIR", "data"),
+        bucket=os.environ.get("STORAGE_BUCKET", "document-parser"),
+        staging_dir=os.environ.get("STAGING_DIR", "data/staging"),
+        fsync=os.environ.get("STORAGE_FSYNC", "none"),
+    )
 
 
 global_config = Config()
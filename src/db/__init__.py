@@ -7,9 +7,9 @@ from .models import (
     db_metadata,
     DATABASE_URL,
     create_db_tables,initialize_all_databases, get_session,get_local_session,
-    Job, JobStatus,JobType,DocumentStatus,DocumentStep,Document,DocumentJobs,DocumentChunk,DocumentChunkStatus)
+    Job, JobStatus,JobType,DocumentStatus,DocumentStep,Document,DocumentJobs,DocumentChunk,DocumentCheckpoint)
 __all__ = [
     'db_engine','DATABASE_URL','db_metadata',
     'create_db_tables','initialize_all_databases', 'get_session','get_local_session',
-    'Job', 'JobStatus','JobType','DocumentStatus','DocumentStep','Document','DocumentJobs','DocumentChunk','DocumentChunkStatus'
+    'Job', 'JobStatus','JobType','DocumentStatus','DocumentStep','Document','DocumentJobs','DocumentChunk','DocumentCheckpoint'
     ]
\ No newline at end of file
@@ -1,8 +1,13 @@
 import logging
 import sys
+import threading
+from functools import lru_cache
 from src.logger import get_formatted_logger
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from pathlib import Path
+from typing import Iterable, Optional
 from fastapi import Depends
 from typing import Annotated
 from botocore.exceptions import ClientError
@@ -14,14 +19,33 @@ from urllib.parse import urlparse
 
 logger = get_formatted_logger(__file__)
 
+# Maximum number of keys accepted by a single delete_objects request
+DELETE_OBJECTS_BATCH_SIZE = 1000
 
+
+@lru_cache(maxsize=None)
+def get_boto3_session(
+    aws_access_key_id: str, aws_secret_access_key: str, region_name: str
+) -> boto3.session.Session:
+    """Process-wide boto3 session per set of credentials"""
+    return boto3.session.Session(
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=region_name,
+    )
+
+
+@lru_cache(maxsize=1)
 def get_aws_s3_client() -> "S3Client":
+    """Process-wide S3 client, known buckets are cached for the lifetime of the process"""
     return S3Client(
         aws_access_key_id=global_config.AWS_ACCESS_KEY_ID,
         aws_secret_access_key=global_config.AWS_SECRET_ACCESS_KEY,
         region_name=global_config.AWS_REGION_NAME,
         storage_type=global_config.AWS_STORAGE_TYPE,
         endpoint_url=global_config.AWS_ENDPOINT_URL,
+        max_pool_connections=global_config.STORAGE_CONFIG.s3_max_pool_connections,
+        cache_buckets=True,
     )
 
 
@@ -44,6 +68,8 @@ class S3Client:
         region_name: str,
         storage_type: str,
         endpoint_url: str,
+        max_pool_connections: int = 10,
+        cache_buckets: bool = False,
     ):
         """
         Initialize AWS S3 client
@@ -52,17 +78,23 @@ class S3Client:
             aws_access_key_id (str): AWS access key ID
             aws_secret_access_key (str): AWS secret access key
             region_name (str): AWS region name (e.g., 'us-east-1')
+            max_pool_connections (int): Size of the HTTP connection pool shared by concurrent transfers
+            cache_buckets (bool): Remember buckets known to exist instead of checking them before every
+                operation. Operations on a bucket deleted behind our back fail with NoSuchBucket and
+                evict it from the cache.
         """
         self.region_name = region_name
         self.storage_type = storage_type
         self.aws_access_key_id = aws_access_key_id
         self.aws_secret_access_key = aws_secret_access_key
-        self.client = boto3.client(
+        self.cache_buckets = cache_buckets
+        self._known_buckets: set[str] = set()
+        self._known_buckets_lock = threading.Lock()
+        session = get_boto3_session(aws_access_key_id, aws_secret_access_key, region_name)
+        self.client = session.client(
             service_name=storage_type,
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name,
             endpoint_url=endpoint_url,
+            config=BotoConfig(max_pool_connections=max_pool_connections),
         )
         self.test_connection()
         logger.info("S3Client initialized successfully!")
@@ -75,8 +107,30 @@ class S3Client:
             region_name=global_config.AWS_REGION_NAME,
             storage_type=global_config.AWS_STORAGE_TYPE,
             endpoint_url=global_config.AWS_ENDPOINT_URL,
+            max_pool_connections=global_config.STORAGE_CONFIG.s3_max_pool_connections,
         )
 
+    def _remember_bucket(self, bucket_name: str) -> None:
+        if self.cache_buckets:
+            with self._known_buckets_lock:
+                self._known_buckets.add(bucket_name)
+
+    def _forget_bucket(self, bucket_name: str) -> None:
+        with self._known_buckets_lock:
+            self._known_buckets.discard(bucket_name)
+
+    def _handle_missing_bucket(self, e: Exception, bucket_name: str) -> bool:
+        """Evict `bucket_name` from the cache if `e` says it is gone, returns True in that case"""
+        if isinstance(e, ClientError):
+            missing = e.response.get("Error", {}).get("Code") == "NoSuchBucket"
+        else:
+            # boto3 transfers wrap the ClientError, e.g. S3UploadFailedError
+            missing = "NoSuchBucket" in str(e)
+        if missing:
+            self._forget_bucket(bucket_name)
+            return True
+        return False
+
     def test_connection(self):
         """
         Test the connection with AWS S3 by listing buckets
@@ -96,8 +150,11 @@ class S3Client:
         Returns:
             bool: True if bucket exists, False otherwise
         """
+        if bucket_name in self._known_buckets:
+            return True
         try:
             self.client.head_bucket(Bucket=bucket_name)
+            self._remember_bucket(bucket_name)
             return True
         except ClientError:
             return False
@@ -129,10 +186,15 @@ class S3Client:
             if "BucketAlreadyOwnedByYou" not in str(e):
                 logger.error(f"Failed to create bucket: {e}")
                 raise
+        self._remember_bucket(bucket_name)
 
     @retry(stop=stop_after_attempt(3))
     def upload_file(
-        self, bucket_name: str, object_name: str, file_path: str | Path
+        self,
+        bucket_name: str,
+        object_name: str,
+        file_path: str | Path,
+        transfer_config: Optional[TransferConfig] = None,
     ) -> None:
         """
         Upload file to S3
@@ -141,23 +203,26 @@ class S3Client:
             bucket_name (str): Bucket name
             object_name (str): Object name to save in S3
             file_path (str | Path): Local file path to be uploaded
+            transfer_config (Optional[TransferConfig]): Multipart/concurrency settings of the transfer
         """
         file_path = str(file_path)
 
         if self.check_bucket_exists(bucket_name) is False:
             logger.debug(f"Bucket {bucket_name} does not exist. Creating bucket...")
             self.create_bucket(bucket_name)
-            # Generate date-based path in format yy/mm/dd
         try:
             self.client.upload_file(
                 Filename=file_path,
                 Bucket=bucket_name,
                 Key=object_name,
+                Config=transfer_config,
                 # ExtraArgs={'ACL':'public-read'}
             )
             logger.info(f"Uploaded: {file_path} --> {bucket_name}/{object_name}")
             return f"https://{bucket_name}.{self.storage_type}.{self.region_name}.amazonaws.com/{object_name}"
         except Exception as e:
+            # Bucket removed since it was cached, the retry recreates it
+            self._handle_missing_bucket(e, bucket_name)
             logger.error(f"Upload failed: {str(e)}")
             raise e
 
@@ -175,7 +240,7 @@ class S3Client:
             # Extract bucket name from hostname
             hostname_parts = parsed.netloc.split(".")
             bucket_name = hostname_parts[0]
-            if not self.check_bucket_exists(bucket_name):
+            if not self.cache_buckets and not self.check_bucket_exists(bucket_name):
                 logger.warning(f"Bucket {bucket_name} does not exist. Do nothing...")
                 return
             # Extract object key from path
@@ -188,6 +253,9 @@ class S3Client:
                 f"Downloaded: {bucket_name}/{object_name} --> {file_path_to_save}"
             )
         except ClientError as e:
+            if self._handle_missing_bucket(e, bucket_name):
+                logger.warning(f"Bucket {bucket_name} does not exist. Do nothing...")
+                return
             logger.error(f"Download failed: {str(e)}")
             raise
 
@@ -205,7 +273,7 @@ class S3Client:
             # Extract bucket name from hostname
             hostname_parts = parsed.netloc.split(".")
             bucket_name = hostname_parts[0]
-            if not self.check_bucket_exists(bucket_name):
+            if not self.cache_buckets and not self.check_bucket_exists(bucket_name):
                 logger.warning(f"Bucket {bucket_name} does not exist. Do nothing...")
                 return
             # Extract object key from path
@@ -216,9 +284,48 @@ class S3Client:
             )
             logger.debug(f"Removed from S3: {bucket_name}/{object_name}")
         except ClientError as e:
+            if self._handle_missing_bucket(e, bucket_name):
+                logger.warning(f"Bucket {bucket_name} does not exist. Do nothing...")
+                return
             logger.error(f"Remove failed: {str(e)}")
             raise
 
+    def remove_objects(self, bucket_name: str, object_names: Iterable[str]) -> int:
+        """
+        Remove many objects from a bucket, `DELETE_OBJECTS_BATCH_SIZE` keys per request
+
+        Args:
+            bucket_name (str): Bucket name
+            object_names (Iterable[str]): Object names to remove
+
+        Returns:
+            int: Number of removed objects
+        """
+        removed = 0
+        batch = []
+        for object_name in object_names:
+            batch.append({"Key": object_name})
+            if len(batch) == DELETE_OBJECTS_BATCH_SIZE:
+                removed += self._delete_objects(bucket_name, batch)
+                batch = []
+        if batch:
+            removed += self._delete_objects(bucket_name, batch)
+        return removed
+
+    def _delete_objects(self, bucket_name: str, objects: list[dict]) -> int:
+        response = self.client.delete_objects(
+            Bucket=bucket_name, Delete={"Objects": objects, "Quiet": True}
+        )
+        errors = response.get("Errors", [])
+        if errors:
+            first = errors[0]
+            raise RuntimeError(
+                f"Failed to remove {len(errors)} objects from {bucket_name}, "
+                f"first error on {first.get('Key')}: {first.get('Code')} {first.get('Message')}"
+            )
+        logger.debug(f"Removed {len(objects)} objects from S3 bucket {bucket_name}")
+        return len(objects)
+
     def remove_bucket(self, bucket_name: str) -> None:
         """
         Remove bucket from S3
@@ -231,15 +338,18 @@ class S3Client:
             return
 
         try:
-            # List and delete all objects in the bucket
+            # List and delete all objects in the bucket, one delete_objects request per page
             paginator = self.client.get_paginator("list_objects_v2")
-            for page in paginator.paginate(Bucket=bucket_name):
+            for page in paginator.paginate(
+                Bucket=bucket_name,
+                PaginationConfig={"PageSize": DELETE_OBJECTS_BATCH_SIZE},
+            ):
                 if "Contents" in page:
-                    for obj in page["Contents"]:
-                        self.client.delete_object(Bucket=bucket_name, Key=obj["Key"])
+                    self.remove_objects(bucket_name, (obj["Key"] for obj in page["Contents"]))
 
             # Delete the bucket itself
             self.client.delete_bucket(Bucket=bucket_name)
+            self._forget_bucket(bucket_name)
             logger.info(f"Removed bucket: {bucket_name}")
         except ClientError as e:
             logger.error(f"Bucket removal failed: {str(e)}")
@@ -0,0 +1,115 @@
+# src/db/backfill.py
+"""
+Move legacy base64 payloads out of `documents.text` into the blob store.
+
+Run with `python -m src.db.backfill --batch-size 100` after the
+`content_hash`/`size` columns have been added with alembic.
+"""
+import argparse
+import base64
+import hashlib
+import uuid
+from pathlib import Path
+from sqlalchemy import update
+from sqlmodel import select
+from src.config import global_config
+from src.logger import get_formatted_logger
+from src.storage import BlobRef, BlobStore, get_blob_store
+from .models import Document, get_local_session
+
+logger = get_formatted_logger(__file__)
+
+# Multiple of 4 so every slice is a complete base64 group
+DECODE_SLICE_SIZE = 4 * 256 * 1024
+
+
+def store_base64_payload(store: BlobStore, payload: str, staging_dir: str | Path) -> BlobRef:
+    """
+    Decode a base64 payload slice by slice into the blob store
+
+    Args:
+        store (BlobStore): Destination blob store
+        payload (str): Base64 encoded file content
+        staging_dir (str | Path): Directory for the temporary decoded file
+
+    Returns:
+        BlobRef: Reference to the stored blob
+    """
+    staging_dir = Path(staging_dir)
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    temp_path = staging_dir / f"{uuid.uuid4().hex}.backfill"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(temp_path, "wb") as handle:
+            for start in range(0, len(payload), DECODE_SLICE_SIZE):
+                chunk = base64.b64decode(payload[start:start + DECODE_SLICE_SIZE])
+                digest.update(chunk)
+                size += len(chunk)
+                handle.write(chunk)
+        return store.put_file(temp_path, digest.hexdigest(), size, move=True)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def backfill_document_blobs(batch_size: int = 100) -> int:
+    """
+    Move every legacy `documents.text` payload to the blob store
+
+    Rows are processed in id order, one batch per transaction, and each payload
+    is loaded on its own so memory stays bounded by the largest document.
+
+    Args:
+        batch_size (int): Number of documents committed per transaction
+
+    Returns:
+        int: Number of documents moved
+    """
+    store = get_blob_store()
+    staging_dir = global_config.STORAGE_CONFIG.staging_dir
+    last_id = 0
+    moved = 0
+
+    while True:
+        with get_local_session() as session:
+            document_ids = session.exec(
+                select(Document.id)
+                .where(
+                    Document.id > last_id,
+                    Document.text.is_not(None),
+                    Document.content_hash.is_(None),
+                )
+                .order_by(Document.id)
+                .limit(batch_size)
+            ).all()
+            if not document_ids:
+                break
+
+            for document_id in document_ids:
+                last_id = document_id
+                payload = session.exec(
+                    select(Document.text).where(Document.id == document_id)
+                ).first()
+                try:
+                    ref = store_base64_payload(store, payload, staging_dir)
+                except Exception as e:
+                    logger.error(f"Skipping document {document_id}: {str(e)}")
+                    continue
+                session.execute(
+                    update(Document)
+                    .where(Document.id == document_id)
+                    .values(content_hash=ref.sha256, size=ref.size, text=None)
+                )
+                moved += 1
+            session.commit()
+            logger.info(f"Moved {moved} documents to the blob store (last id: {last_id})")
+
+    logger.info(f"✅ Backfill finished, {moved} documents moved")
+    return moved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+    backfill_document_blobs(batch_size=args.batch_size)
@@ -0,0 +1,168 @@
+# src/db/chunk_writer.py
+import io
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from sqlmodel import Session
+from src.config import global_config
+from src.logger import get_formatted_logger
+from .models import DocumentChunk
+
+logger = get_formatted_logger(__file__)
+
+CHUNK_COLUMNS = (
+    "uuid",
+    "document_uuid",
+    "chunk_index",
+    "text",
+    "token_count",
+    "vector",
+    "extra_info",
+    "created_at",
+)
+JSON_COLUMNS = ("vector", "extra_info")
+
+
+class ChunkWriter:
+    """
+    Bulk writer for `DocumentChunk` rows.
+
+    Chunks are buffered and written `batch_size` rows (or about `batch_bytes`
+    of text and metadata) at a time inside the transaction of the session, instead of one ORM INSERT per chunk. On
+    PostgreSQL (psycopg2) batches use `execute_values`, or COPY when they
+    hold at least `copy_threshold` rows; other databases use a multi-row
+    INSERT through SQLAlchemy.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        batch_size: Optional[int] = None,
+        copy_threshold: Optional[int] = None,
+        batch_bytes: Optional[int] = None,
+    ):
+        """
+        Initialize the chunk writer
+
+        Args:
+            session (Session): Session whose transaction receives the rows
+            batch_size (Optional[int]): Rows buffered before a write, defaults to `DATABASE_CONFIG.chunk_batch_size`
+            copy_threshold (Optional[int]): Minimum batch size written with COPY, defaults to `DATABASE_CONFIG.chunk_copy_threshold`
+            batch_bytes (Optional[int]): Approximate buffered size before a write, defaults to `DATABASE_CONFIG.chunk_batch_bytes`
+        """
+        database_config = global_config.DATABASE_CONFIG
+        self.session = session
+        self.batch_size = batch_size or database_config.chunk_batch_size
+        self.copy_threshold = copy_threshold or database_config.chunk_copy_threshold
+        self.batch_bytes = batch_bytes or database_config.chunk_batch_bytes
+        self.written = 0
+        self._rows: List[Dict[str, Any]] = []
+        self._buffered_bytes = 0
+
+    def add(
+        self,
+        uuid: str,
+        document_uuid: str,
+        chunk_index: int,
+        text: Optional[str],
+        token_count: int = 0,
+        extra_info: Optional[Dict[str, Any]] = None,
+        vector: Optional[List[float]] = None,
+    ) -> None:
+        """Buffer a chunk, the buffer is written once it holds `batch_size` rows or `batch_bytes`"""
+        self._rows.append(
+            {
+                "uuid": uuid,
+                "document_uuid": document_uuid,
+                "chunk_index": chunk_index,
+                "text": text,
+                "token_count": token_count,
+                "vector": vector,
+                "extra_info": extra_info,
+                "created_at": datetime.now(timezone.utc),
+            }
+        )
+        # Rough size, metadata such as page thumbnails is mostly top-level strings
+        self._buffered_bytes += len(text or "") + sum(
+            len(value) for value in (extra_info or {}).values() if isinstance(value, str)
+        )
+        if len(self._rows) >= self.batch_size or self._buffered_bytes >= self.batch_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered chunks"""
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        self._buffered_bytes = 0
+        connection = self.session.connection()
+        if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2":
+            cursor = connection.connection.dbapi_connection.cursor()
+            try:
+                if len(rows) >= self.copy_threshold:
+                    self._copy(cursor, rows)
+                else:
+                    self._execute_values(cursor, rows)
+            finally:
+                cursor.close()
+        else:
+            connection.execute(DocumentChunk.__table__.insert(), rows)
+        self.written += len(rows)
+        logger.debug(f"Wrote {len(rows)} chunks ({self.written} total)")
+
+    def _execute_values(self, cursor, rows: List[Dict[str, Any]]) -> None:
+        from psycopg2.extras import Json, execute_values
+
+        values = [
+            tuple(
+                Json(row[column]) if column in JSON_COLUMNS and row[column] is not None
+                else _strip_nul(row[column])
+                for column in CHUNK_COLUMNS
+            )
+            for row in rows
+        ]
+        execute_values(
+            cursor,
+            f"INSERT INTO {DocumentChunk.__tablename__} ({', '.join(CHUNK_COLUMNS)}) VALUES %s",
+            values,
+            page_size=len(values),
+        )
+
+    def _copy(self, cursor, rows: List[Dict[str, Any]]) -> None:
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(column, row[column]) for column in CHUNK_COLUMNS))
+            buffer.write("\n")
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {DocumentChunk.__tablename__} ({', '.join(CHUNK_COLUMNS)}) FROM STDIN",
+            buffer,
+        )
+
+    def __enter__(self) -> "ChunkWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.flush()
+        else:
+            self._rows = []
+            self._buffered_bytes = 0
+
+
+# Escapes of the COPY text format, PostgreSQL text cannot hold NUL so it is dropped
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\n": "\\n", "\r": "\\r", "\t": "\\t", "\x00": None})
+
+
+def _strip_nul(value: Any) -> Any:
+    return value.replace("\x00", "") if isinstance(value, str) else value
+
+
+def _copy_value(column: str, value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if column in JSON_COLUMNS:
+        value = json.dumps(value)
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
@@ -9,6 +9,7 @@ from sqlmodel import (
     Column,
     Enum,
     JSON,
+    Index,
 )
 import enum
 from typing import Any, Dict, List, Optional
@@ -68,6 +69,11 @@ class Job(SQLModel, table=True, metadata=db_metadata):
         default=JobStatus.PENDING, sa_column=Column(Enum(JobStatus))
     )
     task: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    batch_uuid: Optional[str] = Field(default=None, index=True)
+    tenant: Optional[str] = Field(default=None, index=True)  # client or project that submitted the job
+    priority: Optional[int] = None  # broker priority of a parse (chained after the upload for uploads), 0 first
+    # Task signature of a job waiting for its turn to be sent to the broker, see src/tasks/dispatch.py
+    deferred_task: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON(none_as_null=True)))
     progress: int = 0
     message: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -89,7 +95,12 @@ class Document(SQLModel, table=True, metadata=db_metadata):
     name: Optional[str] = None
     source: Optional[str] = None
     extension: Optional[str] = None
+    # Legacy base64 payload, new uploads are kept in the blob store (see content_hash)
     text: Optional[str] = Field(sa_column=Column(Text), default=None)
+    content_hash: Optional[str] = Field(default=None, index=True)
+    size: Optional[int] = None
+    # Set when the chunks are shared with an already parsed document of the same content
+    chunk_source_uuid: Optional[str] = Field(default=None)
     step: DocumentStep = Field(
         default=DocumentStep.UPLOAD, sa_column=Column(Enum(DocumentStep))
     )
@@ -106,6 +117,10 @@ class Document(SQLModel, table=True, metadata=db_metadata):
 
 class DocumentChunk(SQLModel, table=True, metadata=db_metadata):
     __tablename__ = "document_chunks"
+    # Chunks are always read per document, in chunk order
+    __table_args__ = (
+        Index("ix_document_chunks_document_uuid_chunk_index", "document_uuid", "chunk_index"),
+    )
 
     id: Optional[int] = Field(primary_key=True, default=None)
     uuid: str = Field(index=True, unique=True)
@@ -118,6 +133,21 @@ class DocumentChunk(SQLModel, table=True, metadata=db_metadata):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+class DocumentCheckpoint(SQLModel, table=True, metadata=db_metadata):
+    """Progress of an interrupted parse, its chunks are staged until the parse completes"""
+    __tablename__ = "document_checkpoints"
+
+    id: Optional[int] = Field(primary_key=True, default=None)
+    document_uuid: str = Field(index=True, unique=True)
+    # File the staged chunks were parsed from, a checkpoint of another file is discarded
+    source: Optional[str] = None
+    # Next PDF page to parse
+    position: int = 0
+    chunk_count: int = 0
+    total_tokens: int = 0
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
 # Create tables
 def create_db_tables():
     db_metadata.create_all(db_engine)
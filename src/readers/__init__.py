@@ -1,7 +1,7 @@
 # Combine file and media reader
-from .extractor import FileExtractor
-from .utils import parse_multiple_files
-__all__=["FileExtractor","parse_multiple_files"]
+from .extractor import FileExtractor, ExtractorRegistry, get_extractor
+from .utils import parse_multiple_files, lazy_parse_multiple_files, parse_stream, is_streamable
+__all__=["FileExtractor","ExtractorRegistry","get_extractor","parse_multiple_files","lazy_parse_multiple_files","parse_stream","is_streamable"]
 # document = parse_multiple_files(
 #         str(file_path),
 #         extractor=file_extractor.get_extractor_for_file(file_path),
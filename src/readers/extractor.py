@@ -1,53 +1,134 @@
+import threading
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Callable, Iterator
+import magika
+import requests
 from .kotaemon import (
     JSONReader,
-    PandasCSVReader,
     MarkdownReader,
     IPYNBReader,
     MboxReader,
     XMLReader,
-    RTFReader,DocxReader,TxtReader,ExcelReader,HtmlReader,MhtmlReader,PDFReader,PDFThumbnailReader,PandasExcelReader)
+    RTFReader,
+    DocxReader,
+    TxtReader,
+    HtmlReader,
+    PDFThumbnailReader,
+)
 from .markitdown import MarkItDown
 from google import genai
 from src.config import global_config
 
-def get_extractor():
-    md = MarkItDown(enable_plugins=False)
-    ocr_md = MarkItDown(
-        llm_client=genai.Client(api_key=global_config.GEMINI_CONFIG.api_key),
-        llm_model=global_config.GEMINI_CONFIG.model_id.split("/")[1]
+
+@lru_cache(maxsize=1)
+def _shared_magika() -> magika.Magika:
+    return magika.Magika()
+
+
+@lru_cache(maxsize=1)
+def _shared_llm_client() -> genai.Client:
+    return genai.Client(api_key=global_config.GEMINI_CONFIG.api_key)
+
+
+@lru_cache(maxsize=1)
+def _shared_requests_session() -> requests.Session:
+    return requests.Session()
+
+
+@lru_cache(maxsize=1)
+def _markitdown() -> MarkItDown:
+    return MarkItDown(
+        enable_plugins=False,
+        magika=_shared_magika(),
+        requests_session=_shared_requests_session(),
+    )
+
+
+@lru_cache(maxsize=1)
+def _ocr_markitdown() -> MarkItDown:
+    return MarkItDown(
+        llm_client=_shared_llm_client(),
+        llm_model=global_config.GEMINI_CONFIG.model_id.split("/")[1],
+        magika=_shared_magika(),
+        requests_session=_shared_requests_session(),
     )
-    return {
-        ".pdf": PDFThumbnailReader(),
-        ".docx": DocxReader(),
-        ".html": HtmlReader(),
-        ".csv": md,
-        ".xlsx": md,
-        ".xls":md,
-        ".json": JSONReader(),
-        ".txt": TxtReader(),
-        # ".pptx": PptxReader(),
-        ".md": MarkdownReader(),
-        ".ipynb": IPYNBReader(),
-        ".mbox": MboxReader(),
-        ".xml": XMLReader(),
-        ".rtf": RTFReader(),
-        ".msg": md,
-        ".wav":md,
-        ".mp3":md,
-        ".m4a":md,
-        ".mp4":md,
-        ".jpg":ocr_md,
-        ".jpeg":ocr_md,
-        ".png":ocr_md
-    }
-    
+
+
+# Reader factory per supported extension, MarkItDown instances are shared between extensions
+READER_FACTORIES: dict[str, Callable[[], Any]] = {
+    ".pdf": PDFThumbnailReader,
+    ".docx": DocxReader,
+    ".html": HtmlReader,
+    ".csv": _markitdown,
+    ".xlsx": _markitdown,
+    ".xls": _markitdown,
+    ".json": JSONReader,
+    ".txt": TxtReader,
+    # ".pptx": PptxReader,
+    ".md": MarkdownReader,
+    ".ipynb": IPYNBReader,
+    ".mbox": MboxReader,
+    ".xml": XMLReader,
+    ".rtf": RTFReader,
+    ".msg": _markitdown,
+    ".wav": _markitdown,
+    ".mp3": _markitdown,
+    ".m4a": _markitdown,
+    ".mp4": _markitdown,
+    ".jpg": _ocr_markitdown,
+    ".jpeg": _ocr_markitdown,
+    ".png": _ocr_markitdown,
+}
+
+
+class ExtractorRegistry(Mapping):
+    """
+    Extension to reader mapping that creates each reader on first use.
+
+    Only the readers of the extensions actually parsed by a process are
+    built, and they are kept for the lifetime of the process.
+    """
+
+    def __init__(self, factories: dict[str, Callable[[], Any]]):
+        self._factories = factories
+        self._readers: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, extension: str) -> Any:
+        reader = self._readers.get(extension)
+        if reader is not None:
+            return reader
+        factory = self._factories[extension]
+        with self._lock:
+            if extension not in self._readers:
+                self._readers[extension] = factory()
+            return self._readers[extension]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+
+@lru_cache(maxsize=1)
+def get_extractor() -> ExtractorRegistry:
+    """Process-wide extractor registry, created in the worker process on first use"""
+    return ExtractorRegistry(READER_FACTORIES)
+
+
 class FileExtractor:
     def __init__(self) -> None:
         self.extractor = get_extractor()
 
-    def get_extractor_for_file(self, file_path: str | Path) -> dict[str, str]:
-        file_suffix = Path(file_path).suffix
+    def get_extractor_for_file(self, file_path: str | Path) -> dict[str, Any]:
+        """Reader of the file keyed by its lowercase extension, empty when the extension is not supported"""
+        file_suffix = Path(file_path).suffix.lower()
+        reader = self.extractor.get(file_suffix)
+        if reader is None:
+            return {}
         return {
-            file_suffix: self.extractor[file_suffix],
-        }
\ No newline at end of file
+            file_suffix: reader,
+        }
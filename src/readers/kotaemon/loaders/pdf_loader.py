@@ -2,7 +2,7 @@ import sys
 import base64
 from io import BytesIO
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
 
 sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 
@@ -27,6 +27,22 @@ def get_page_thumbnails(
         list[Image.Image]: list of page thumbnails
     """
 
+    return list(iter_page_thumbnails(file_path, pages, dpi))
+
+
+def iter_page_thumbnails(
+    file_path: Path, pages: list[int], dpi: int = 80
+) -> Iterator[str]:
+    """Yield the base64 thumbnails of the pages in the PDF file one page at a time.
+
+    Args:
+        file_path (Path): path to the PDF file
+        pages (list[int]): list of page numbers to extract
+        dpi (int): resolution of the thumbnails
+
+    Yields:
+        str: base64 data URL of the page thumbnail
+    """
     img: Image.Image
     suffix = file_path.suffix.lower()
     assert suffix == ".pdf", "This function only supports PDF files."
@@ -35,16 +51,12 @@ def get_page_thumbnails(
     except ImportError:
         raise ImportError("Please install PyMuPDF: 'pip install PyMuPDF'")
 
-    doc = fitz.open(file_path)
-
-    output_imgs = []
-    for page_number in pages:
-        page = doc.load_page(page_number)
-        pm = page.get_pixmap(dpi=dpi)
-        img = Image.frombytes("RGB", [pm.width, pm.height], pm.samples)
-        output_imgs.append(convert_image_to_base64(img))
-
-    return output_imgs
+    with fitz.open(file_path) as doc:
+        for page_number in pages:
+            page = doc.load_page(page_number)
+            pm = page.get_pixmap(dpi=dpi)
+            img = Image.frombytes("RGB", [pm.width, pm.height], pm.samples)
+            yield convert_image_to_base64(img)
 
 
 def convert_image_to_base64(img: Image.Image) -> str:
@@ -73,45 +85,101 @@ class PDFThumbnailReader(PDFReader):
         fs: Optional[AbstractFileSystem] = None,
     ) -> List[Document]:
         """Parse file."""
-        documents = super().load_data(file, extra_info, fs)
+        return list(self.lazy_load_data(file, extra_info, fs))
 
-        page_numbers_str = []
-        filtered_docs = []
-        is_int_page_number: dict[str, bool] = {}
+    def lazy_load_data(
+        self,
+        file: Path,
+        extra_info: Optional[Dict] = None,
+        fs: Optional[AbstractFileSystem] = None,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    ) -> Iterator[Document]:
+        """Parse file one page at a time: the text of every page, then the page thumbnails.
+
+        `progress` is called after each page with the number of pages done and the total.
+        """
+        for _, document in self.iter_page_range(file, extra_info=extra_info, progress=progress):
+            yield document
 
-        for doc in documents:
-            if "page_label" in doc.metadata:
-                page_num_str = doc.metadata["page_label"]
-                page_numbers_str.append(page_num_str)
+    @staticmethod
+    def count_pages(file: Path | BinaryIO) -> int:
+        """Number of pages of a PDF file or seekable stream, read from the cross-reference table."""
+        try:
+            import pypdf
+        except ImportError:
+            raise ImportError("pypdf is required to read PDF files: `pip install pypdf`")
+
+        return len(pypdf.PdfReader(file).pages)
+
+    def iter_page_range(
+        self,
+        file: Path,
+        start: int = 0,
+        end: Optional[int] = None,
+        extra_info: Optional[Dict] = None,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    ) -> Iterator[Tuple[int, Document]]:
+        """Parse the pages `[start, end)` of the file: the text of every page, then the page thumbnails.
+
+        Documents are yielded with their position in the whole file: the page index for
+        the page text and the number of pages plus the page index for the thumbnail, so
+        ranges parsed separately sort back into the order of a full parse.
+
+        Args:
+            file (Path): path to the PDF file
+            start (int): index of the first page
+            end (Optional[int]): index after the last page, the end of the file when None
+            extra_info (Optional[Dict]): metadata added to every document
+            progress (Optional[Callable]): called after each page with the pages done and the total
+
+        Yields:
+            Tuple[int, Document]: position and document
+        """
+        try:
+            import pypdf
+        except ImportError:
+            raise ImportError("pypdf is required to read PDF files: `pip install pypdf`")
+
+        file = Path(file)
+        # Index and label of the pages with an integer label, they get a thumbnail
+        thumbnail_pages: list[tuple[int, str]] = []
+
+        with open(file, "rb") as fp:
+            pdf = pypdf.PdfReader(fp)
+            num_pages = len(pdf.pages)
+            end = num_pages if end is None else min(end, num_pages)
+            # Labels are computed for the whole file at once, not per page
+            page_labels = pdf.page_labels
+            # Every page is visited twice, for its text and for its thumbnail
+            total = 2 * (end - start)
+            for page_index in range(start, end):
+                if progress is not None:
+                    progress(page_index - start, total)
+                page_label = page_labels[page_index]
                 try:
-                    _ = int(page_num_str)
-                    is_int_page_number[page_num_str] = True
-                    filtered_docs.append(doc)
+                    _ = int(page_label)
                 except ValueError:
-                    is_int_page_number[page_num_str] = False
                     continue
+                thumbnail_pages.append((page_index, page_label))
 
-        documents = filtered_docs
-        page_numbers = list(range(len(page_numbers_str)))
-
-        page_thumbnails = get_page_thumbnails(file, page_numbers)
-
-        documents.extend(
-            [
-                Document(
-                    text="Page thumbnail",
-                    metadata={
-                        "image_origin": page_thumbnail,
-                        "type": "thumbnail",
-                        "page_label": page_number,
-                        **(extra_info if extra_info is not None else {}),
-                    },
-                )
-                for (page_thumbnail, page_number) in zip(
-                    page_thumbnails, page_numbers_str
-                )
-                if is_int_page_number[page_number]
-            ]
-        )
+                metadata = {"page_label": page_label, "file_name": file.name}
+                if extra_info is not None:
+                    metadata.update(extra_info)
+                yield page_index, Document(text=pdf.pages[page_index].extract_text(), metadata=metadata)
 
-        return documents
+        page_thumbnails = iter_page_thumbnails(
+            file, [page_index for page_index, _ in thumbnail_pages]
+        )
+        total = (end - start) + len(thumbnail_pages)
+        for idx, (page_thumbnail, (page_index, page_label)) in enumerate(zip(page_thumbnails, thumbnail_pages)):
+            if progress is not None:
+                progress(end - start + idx, total)
+            yield num_pages + page_index, Document(
+                text="Page thumbnail",
+                metadata={
+                    "image_origin": page_thumbnail,
+                    "type": "thumbnail",
+                    "page_label": page_label,
+                    **(extra_info if extra_info is not None else {}),
+                },
+            )
@@ -2,4 +2,5 @@
 from .__about__ import __version__
 from ._markitdown import MarkItDown
 from ._base_converter import DocumentConverterResult
-__all__=["MarkItDown","DocumentConverterResult"]
\ No newline at end of file
+from ._stream_info import StreamInfo
+__all__=["MarkItDown","DocumentConverterResult","StreamInfo"]
\ No newline at end of file
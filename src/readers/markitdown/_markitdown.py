@@ -95,7 +95,8 @@ class MarkItDown:
         else:
             self._requests_session = requests_session
 
-        self._magika = magika.Magika()
+        # Loading the Magika model is expensive, allow sharing one between instances
+        self._magika = kwargs.get("magika") or magika.Magika()
 
         # TODO - remove these (see enable_builtins)
         self._llm_client: Any = None
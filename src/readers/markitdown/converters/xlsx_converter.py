@@ -1,5 +1,5 @@
 import sys
-from typing import BinaryIO, Any
+from typing import BinaryIO, Any, Iterator
 from .html_converter import HtmlConverter
 from .._base_converter import DocumentConverter, DocumentConverterResult
 from .._exceptions import MissingDependencyException, MISSING_DEPENDENCY_MESSAGE
@@ -33,6 +33,20 @@ ACCEPTED_XLS_MIME_TYPE_PREFIXES = [
 ACCEPTED_XLS_FILE_EXTENSIONS = [".xls"]
 
 
+def _iter_sheet_markdown(
+    html_converter: HtmlConverter, file_stream: BinaryIO, engine: str, **kwargs: Any
+) -> Iterator[str]:
+    """Markdown of each sheet of a workbook, one sheet in memory at a time"""
+    with pd.ExcelFile(file_stream, engine=engine) as workbook:
+        for sheet_name in workbook.sheet_names:
+            html_content = workbook.parse(sheet_name).to_html(index=False)
+            yield (
+                f"## {sheet_name}\n"
+                + html_converter.convert_string(html_content, **kwargs).markdown.strip()
+                + "\n\n"
+            )
+
+
 class XlsxConverter(DocumentConverter):
     """
     Converts XLSX files to Markdown, with each sheet presented as a separate Markdown table.
@@ -80,23 +94,21 @@ class XlsxConverter(DocumentConverter):
                 _xlsx_dependency_exc_info[2]
             )
 
-        sheets = pd.read_excel(file_stream, sheet_name=None, engine="openpyxl")
-        md_content = []
-        for s in sheets:
-            s_content = f"## {s}\n"
-            html_content = sheets[s].to_html(index=False)
-            
-            s_content += (
-                self._html_converter.convert_string(
-                    html_content, **kwargs
-                ).markdown.strip()
-                + "\n\n"
-            )
-            
-            md_content.append(s_content)
-
+        md_content = list(self.iter_sheets(file_stream, **kwargs))
         return DocumentConverterResult(markdown=f"{md_content}")
 
+    def iter_sheets(self, file_stream: BinaryIO, **kwargs: Any) -> Iterator[str]:
+        """Markdown of each sheet, as in `convert` but yielded one sheet at a time"""
+        if _xlsx_dependency_exc_info is not None:
+            raise MissingDependencyException(
+                MISSING_DEPENDENCY_MESSAGE.format(
+                    converter=type(self).__name__,
+                    extension=".xlsx",
+                    feature="xlsx",
+                )
+            ) from _xlsx_dependency_exc_info[1]
+        return _iter_sheet_markdown(self._html_converter, file_stream, "openpyxl", **kwargs)
+
 
 class XlsConverter(DocumentConverter):
     """
@@ -145,19 +157,17 @@ class XlsConverter(DocumentConverter):
                 _xls_dependency_exc_info[2]
             )
 
-        sheets = pd.read_excel(file_stream, sheet_name=None, engine="xlrd")
-        md_content = []
-        for s in sheets:
-            s_content = f"## {s}\n"
-            html_content = sheets[s].to_html(index=False)
-            
-            s_content += (
-                self._html_converter.convert_string(
-                    html_content, **kwargs
-                ).markdown.strip()
-                + "\n\n"
-            )
-            
-            md_content.append(s_content)
+        md_content = list(self.iter_sheets(file_stream, **kwargs))
+        return DocumentConverterResult(markdown=f"{md_content}")
 
-        return DocumentConverterResult(markdown=f"{md_content}")
\ No newline at end of file
+    def iter_sheets(self, file_stream: BinaryIO, **kwargs: Any) -> Iterator[str]:
+        """Markdown of each sheet, as in `convert` but yielded one sheet at a time"""
+        if _xls_dependency_exc_info is not None:
+            raise MissingDependencyException(
+                MISSING_DEPENDENCY_MESSAGE.format(
+                    converter=type(self).__name__,
+                    extension=".xls",
+                    feature="xls",
+                )
+            ) from _xls_dependency_exc_info[1]
+        return _iter_sheet_markdown(self._html_converter, file_stream, "xlrd", **kwargs)
\ No newline at end of file
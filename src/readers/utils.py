@@ -1,14 +1,21 @@
 # This file contains utility functions for the readers module.
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Any
+import inspect
+import multiprocessing
+import os
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Optional
 from dotenv import load_dotenv
 from datetime import datetime
 from llama_index.core import Document
 import ast
 from tqdm import tqdm
-from src.config import SUPPORTED_NORMAL_FILE_EXTENSIONS, SUPPORTED_SPECIAL_FILE_EXTENSIONS, SUPPORTED_EXCEL_FILE_EXTENSIONS
+from src.config import global_config, SUPPORTED_NORMAL_FILE_EXTENSIONS, SUPPORTED_SPECIAL_FILE_EXTENSIONS, SUPPORTED_EXCEL_FILE_EXTENSIONS
 from src.logger import get_formatted_logger
-from .markitdown import DocumentConverterResult
+from .extractor import get_extractor
+from .markitdown import DocumentConverterResult, StreamInfo
+from .markitdown.converters import XlsConverter, XlsxConverter
 
 load_dotenv()
 logger = get_formatted_logger(__file__)
@@ -25,7 +32,7 @@ def check_valid_extenstion(file_path: str | Path) -> bool:
         bool: True if the file extension is supported, False otherwise.
     """
     allowed_extensions = SUPPORTED_NORMAL_FILE_EXTENSIONS + SUPPORTED_SPECIAL_FILE_EXTENSIONS + SUPPORTED_EXCEL_FILE_EXTENSIONS
-    return Path(file_path).suffix in allowed_extensions
+    return Path(file_path).suffix.lower() in allowed_extensions
 
 
 def get_files_from_folder_or_file_paths(files_or_folders: list[str]) -> list[str]:
@@ -58,18 +65,297 @@ def get_files_from_folder_or_file_paths(files_or_folders: list[str]) -> list[str
 
     return files
 
-def parse_multiple_files(
-    files_or_folder: list[str] | str, extractor: dict[str, Any],
-    show_progress: bool = True
+def documents_from_conversion(
+    result: DocumentConverterResult, file_name: str, file_suffix: str
 ) -> list[Document]:
     """
-    Read the content of multiple files.
+    Convert a MarkItDown conversion result to documents
+
+    Args:
+        result (DocumentConverterResult): Conversion result
+        file_name (str): Name of the converted file
+        file_suffix (str): Lowercase extension of the converted file
+
+    Returns:
+        list[Document]: One document, or one per sheet for Excel files.
+    """
+    metadata={
+        "title": result.title,
+        "created_at": datetime.now().isoformat(),
+        "file_name": file_name,
+    }
+    if result.metadata and result.metadata["image_base64"]:
+        metadata["image_origin"] = result.metadata["image_base64"]
+
+    if file_suffix not in SUPPORTED_EXCEL_FILE_EXTENSIONS:
+        return [Document(text=result.text_content, metadata=metadata)]
+
+    try:
+        sheet_excel_texts: list = ast.literal_eval(result.text_content)
+        documents = []
+        for idx, sheet_excel_text in enumerate(sheet_excel_texts):
+            sheet_metadata = metadata.copy()
+            sheet_metadata["sheet_index"] = idx
+            documents.append(
+                Document(
+                    text=sheet_excel_text,
+                    metadata=sheet_metadata,
+                )
+            )
+        return documents
+    except:
+        return [Document(text=result.text_content, metadata=metadata)]
+
+
+# Excel files are converted sheet by sheet instead of through `MarkItDown.convert`
+EXCEL_SHEET_CONVERTERS = {".xlsx": XlsxConverter, ".xls": XlsConverter}
+
+
+def iter_excel_documents(
+    file: str | Path | BinaryIO, file_name: str, file_suffix: str,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> Iterator[Document]:
+    """
+    Read an Excel file one sheet at a time, only the sheet being converted is held in memory
+
+    Args:
+        file (str | Path | BinaryIO): File path or seekable stream
+        file_name (str): Name of the file
+        file_suffix (str): Lowercase extension of the file, ".xlsx" or ".xls"
+        progress (Optional[Callable]): Called with the number of sheets done, their total is unknown
+
+    Returns:
+        Iterator[Document]: One document per sheet, as `documents_from_conversion` builds them.
+    """
+    metadata = {
+        "title": None,
+        "created_at": datetime.now().isoformat(),
+        "file_name": file_name,
+    }
+    converter = EXCEL_SHEET_CONVERTERS[file_suffix]()
+    for idx, sheet_text in enumerate(converter.iter_sheets(file)):
+        yield Document(text=sheet_text, metadata={**metadata, "sheet_index": idx})
+        if progress is not None:
+            progress(idx + 1, None)
+
+
+def is_streamable(file_path: str | Path) -> bool:
+    """
+    Check if the file can be parsed from a stream (see `parse_stream`)
+
+    Args:
+        file_path (str | Path): File path to check
+
+    Returns:
+        bool: True if the file is converted by MarkItDown, which reads seekable streams.
+    """
+    return Path(file_path).suffix.lower() in SUPPORTED_SPECIAL_FILE_EXTENSIONS + SUPPORTED_EXCEL_FILE_EXTENSIONS
+
+
+def parse_stream(
+    stream: BinaryIO, file_name: str, extractor: dict[str, Any],
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> Iterable[Document]:
+    """
+    Read the content of a file from a seekable binary stream, without a local copy.
+
+    Args:
+        stream (BinaryIO): Seekable stream with the file content
+        file_name (str): Name of the file, its extension selects the extractor
+        extractor (dict[str, Any]): Extractor to extract content from files.
+        progress (Optional[Callable]): Called with the sheets done of an Excel file
+    Returns:
+        Iterable[Document]: List of documents from the file, an iterator yielding one sheet
+            at a time for Excel files.
+    """
+    assert extractor, "Extractor is required."
+    file_suffix = Path(file_name).suffix.lower()
+    if not is_streamable(file_name):
+        raise ValueError(f"{file_suffix} files cannot be parsed from a stream")
+    if file_suffix in EXCEL_SHEET_CONVERTERS:
+        return iter_excel_documents(stream, file_name, file_suffix, progress)
+
+    result: DocumentConverterResult = extractor[file_suffix].convert_stream(
+        stream,
+        stream_info=StreamInfo(extension=file_suffix, filename=file_name),
+    )
+    documents = documents_from_conversion(result, file_name, file_suffix)
+    logger.info(f"Parse stream successfully with {file_name} split to {len(documents)} documents")
+    return documents
+
+
+def load_file_lazily(
+    reader: Any, file_path: Path, progress: Optional[Callable[[int, Optional[int]], None]] = None
+) -> Iterator[Document]:
+    """
+    Load a file through the reader's `lazy_load_data` when it provides one
+
+    Only the PDF reader implements it, its pages are read one at a time. The other readers
+    (DOCX, TXT, HTML, JSON...) build the list of documents of the whole file through
+    `load_data`, their peak memory is the whole file. Excel files are read sheet by sheet
+    (`iter_excel_documents`), CSV files are converted to a single table by MarkItDown.
+
+    Args:
+        reader (Any): Reader of the file extension
+        file_path (Path): File to load
+        progress (Optional[Callable]): Progress callback `(done, total)` of the file
+
+    Returns:
+        Iterator[Document]: Documents of the file.
+    """
+    try:
+        if progress is not None and "progress" in inspect.signature(reader.lazy_load_data).parameters:
+            # The reader reports its own units of work (pages...)
+            return iter(reader.lazy_load_data(file_path, progress=progress))
+        documents = reader.lazy_load_data(file_path)
+    except NotImplementedError:
+        # llama-index readers without lazy loading raise on call
+        documents = reader.load_data(file_path)
+    if progress is not None and isinstance(documents, list):
+        return _with_progress(documents, progress)
+    return iter(documents)
+
+
+def _with_progress(
+    documents: list[Document], progress: Callable[[int, Optional[int]], None]
+) -> Iterator[Document]:
+    # The reader already parsed the whole file, the progress only covers the storing of its
+    # documents. Only the PDF reader reports its pages while it parses
+    for idx, document in enumerate(documents):
+        progress(idx, len(documents))
+        yield document
+
+
+def parse_file(
+    file: str, extractor: dict[str, Any],
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> Iterator[Document]:
+    """
+    Read the content of a single file, yielding documents as they are extracted.
+
+    Args:
+        file (str): File path
+        extractor (dict[str, Any]): Extractor to extract content from files.
+        progress (Optional[Callable]): Progress callback `(done, total)` of the file
+    Returns:
+        Iterator[Document]: Documents of the file.
+    """
+    file_path_obj = Path(file)
+    file_suffix = file_path_obj.suffix.lower()
+    file_extractor = extractor[file_suffix]
+
+    if file_suffix in EXCEL_SHEET_CONVERTERS:
+        return iter_excel_documents(file, file_path_obj.name, file_suffix, progress)
+    if file_suffix in SUPPORTED_SPECIAL_FILE_EXTENSIONS + SUPPORTED_EXCEL_FILE_EXTENSIONS:
+        result: DocumentConverterResult = file_extractor.convert(file)
+        results = documents_from_conversion(result, file_path_obj.name, file_suffix)
+        if progress is not None:
+            return _with_progress(results, progress)
+        return iter(results)
+    return load_file_lazily(file_extractor, file_path_obj, progress)
+
+
+def _init_parse_worker(extensions: list[str]) -> None:
+    """Build the readers of the parsed extensions once per pool worker"""
+    extractor = get_extractor()
+    for extension in extensions:
+        extractor[extension]
+
+
+def _parse_file_in_worker(file: str) -> tuple[str, list[Document], Optional[str]]:
+    """Parse a file in a pool worker, failures are returned instead of raised"""
+    try:
+        return file, list(parse_file(file, get_extractor())), None
+    except Exception as e:
+        return file, [], f"{type(e).__name__}: {e}"
+
+
+def get_parse_workers(num_files: int) -> int:
+    """Pool size for parallel parsing: `ReaderConfig.num_threads`, or the CPU count when unset"""
+    num_workers = global_config.READER_CONFIG.num_threads or os.cpu_count() or 1
+    return max(1, min(num_workers, num_files))
+
+
+def _parallel_parse_files(
+    valid_files: list[str], num_workers: int,
+    show_progress: bool = True,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> Iterator[Document]:
+    """
+    Parse files over a process pool, yielding the documents of each file as soon as it is parsed
+
+    At most two files per worker are queued at once so results of large folders do not pile up
+    in memory. A failing file is logged and skipped, the other files are still parsed.
+    """
+    extensions = sorted({Path(file).suffix.lower() for file in valid_files})
+    pending_files = iter(valid_files)
+    in_flight: dict[Future, str] = {}
+    pool_broken = False
+    files_done = 0
+    progress_bar = tqdm(total=len(valid_files), desc="Starting parse files", unit="file") if show_progress else None
+
+    # Spawned workers do not inherit the threads and open connections of the parent
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_parse_worker,
+        initargs=(extensions,),
+    ) as executor:
+        def submit_next() -> None:
+            file = next(pending_files, None)
+            if file is not None:
+                in_flight[executor.submit(_parse_file_in_worker, file)] = file
+
+        for _ in range(num_workers * 2):
+            submit_next()
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                file = in_flight.pop(future)
+                try:
+                    _, documents, error = future.result()
+                except BrokenProcessPool as e:
+                    # A worker died (out of memory, crash in a native reader), the pool cannot be reused
+                    documents, error = [], f"{type(e).__name__}: {e}"
+                    pool_broken = True
+                if error:
+                    logger.error(f"Error parsing file {file}: {error}")
+                files_done += 1
+                if progress_bar is not None:
+                    progress_bar.update(1)
+                if progress is not None:
+                    progress(files_done, len(valid_files))
+                yield from documents
+                if not pool_broken:
+                    submit_next()
+
+    if progress_bar is not None:
+        progress_bar.close()
+    skipped = sum(1 for _ in pending_files)
+    if skipped:
+        logger.error(f"Parse pool broken, {skipped} files were not parsed")
+
+
+def lazy_parse_multiple_files(
+    files_or_folder: list[str] | str, extractor: dict[str, Any],
+    show_progress: bool = True,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    parallel: bool = False,
+) -> Iterator[Document]:
+    """
+    Read the content of multiple files, yielding documents as they are extracted.
 
     Args:
         files_or_folder (list[str] | str): List of file paths or folder paths containing files.
         extractor (dict[str, Any]): Extractor to extract content from files.
+        progress (Optional[Callable]): Called with `(done, total)` units of work of the file being
+            parsed (pages, sheets or documents, depending on the reader), or files when parallel
+        parallel (bool): Parse the files over a process pool of `ReaderConfig.num_threads` workers
+            (CPU count when unset). Documents are yielded file by file in completion order, pool
+            workers use their own `get_extractor()` readers and a failing file is skipped.
     Returns:
-        list[Document]: List of documents from all files.
+        Iterator[Document]: Documents from all files.
     """
     assert extractor, "Extractor is required."
 
@@ -83,61 +369,38 @@ def parse_multiple_files(
 
     logger.info(f"Valid files: {valid_files}")
 
-    documents: list[Document] = []
-
-    files_to_process = tqdm(valid_files, desc="Starting parse files", unit="file") if show_progress else valid_files
-
-    for file in files_to_process:
-        file_path_obj = Path(file)
-        file_suffix = file_path_obj.suffix.lower()
-        file_extractor = extractor[file_suffix]
-
-        if file_suffix in SUPPORTED_SPECIAL_FILE_EXTENSIONS:
-            result: DocumentConverterResult = file_extractor.convert(file)
-            metadata={
-                "title": result.title,
-                "created_at": datetime.now().isoformat(),
-                "file_name": file_path_obj.name,
-            }
-            if result.metadata and result.metadata["image_base64"]:
-                metadata["image_origin"] = result.metadata["image_base64"]
-                
-            documents.append(
-                Document(
-                    text=result.text_content,
-                    metadata=metadata,
-                )
-            )
-        elif (file_suffix in SUPPORTED_EXCEL_FILE_EXTENSIONS):
-            result: DocumentConverterResult = file_extractor.convert(file)
-            metadata={
-                "title": result.title,
-                "created_at": datetime.now().isoformat(),
-                "file_name": file_path_obj.name,
-            }
-            if result.metadata and result.metadata["image_base64"]:
-                metadata["image_origin"] = result.metadata["image_base64"]
-            try:
-                sheet_excel_texts: list = ast.literal_eval(result.text_content)
-                for idx, sheet_excel_text in enumerate(sheet_excel_texts):
-                    sheet_metadata = metadata.copy()
-                    sheet_metadata["sheet_index"] = idx
-                    documents.append(
-                        Document(
-                            text=sheet_excel_text,
-                            metadata=sheet_metadata,
-                        )
-                    )
-            except:
-                documents.append(
-                    Document(
-                        text=result.text_content,
-                        metadata=metadata,
-                    )
-                )
-        else:
-            results = file_extractor.load_data(file_path_obj)
-            documents.extend(results)
+    document_count = 0
+
+    num_workers = get_parse_workers(len(valid_files)) if parallel else 1
+    if num_workers > 1:
+        results = _parallel_parse_files(valid_files, num_workers, show_progress, progress)
+    else:
+        files_to_process = tqdm(valid_files, desc="Starting parse files", unit="file") if show_progress else valid_files
+        results = (
+            document
+            for file in files_to_process
+            for document in parse_file(file, extractor, progress)
+        )
+    for document in results:
+        document_count += 1
+        yield document
+
+    logger.info(f"Parse files successfully with {files_or_folder} split to {document_count} documents")
 
-    logger.info(f"Parse files successfully with {files_or_folder} split to {len(documents)} documents")
-    return documents
\ No newline at end of file
+
+def parse_multiple_files(
+    files_or_folder: list[str] | str, extractor: dict[str, Any],
+    show_progress: bool = True,
+    parallel: bool = False,
+) -> list[Document]:
+    """
+    Read the content of multiple files.
+
+    Args:
+        files_or_folder (list[str] | str): List of file paths or folder paths containing files.
+        extractor (dict[str, Any]): Extractor to extract content from files.
+        parallel (bool): Parse the files over a process pool, see `lazy_parse_multiple_files`
+    Returns:
+        list[Document]: List of documents from all files.
+    """
+    return list(lazy_parse_multiple_files(files_or_folder, extractor, show_progress, parallel=parallel))
@@ -0,0 +1,32 @@
+# src/storage/__init__.py
+from .base import OutsideStorageError, Storage
+from .local import LocalStorage
+from .factory import get_storage
+from .staging import StagedFile, StagingArea, get_staging_area, is_archive
+from .blob_store import BlobRef, BlobStore, get_blob_store
+from .quarantine import quarantine_file
+from .resumable import (
+    ResumableUpload,
+    ResumableUploadStore,
+    UploadOffsetMismatch,
+    get_resumable_upload_store,
+)
+
+__all__ = [
+    "Storage",
+    "OutsideStorageError",
+    "LocalStorage",
+    "get_storage",
+    "StagedFile",
+    "StagingArea",
+    "get_staging_area",
+    "is_archive",
+    "BlobRef",
+    "BlobStore",
+    "get_blob_store",
+    "quarantine_file",
+    "ResumableUpload",
+    "ResumableUploadStore",
+    "UploadOffsetMismatch",
+    "get_resumable_upload_store",
+]
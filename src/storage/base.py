@@ -0,0 +1,120 @@
+# src/storage/base.py
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+FSYNC_POLICIES = ("none", "file", "full")
+
+
+def fsync_file(handle: BinaryIO, policy: str) -> None:
+    """Flush a file written under `policy` to disk"""
+    if policy == "none":
+        return
+    handle.flush()
+    os.fsync(handle.fileno())
+
+
+def fsync_directory(path: str | Path, policy: str) -> None:
+    """Persist the directory entries of `path` under the `full` policy"""
+    if policy != "full":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class OutsideStorageError(ValueError):
+    """Raised when a URI does not address an object of the storage, e.g. a legacy path outside of its root"""
+
+
+class Storage(ABC):
+    """
+    Minimal object storage interface, objects are addressed by a `/` separated key
+    """
+
+    @abstractmethod
+    def put_file(self, local_path: str | Path, key: str) -> None:
+        """Copy a local file to `key`"""
+        ...
+
+    @abstractmethod
+    def get_file(self, key: str, local_path: str | Path) -> None:
+        """Copy the object at `key` to a local file"""
+        ...
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Open the object at `key` as a seekable binary stream"""
+        ...
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Check if an object exists at `key`"""
+        ...
+
+    @abstractmethod
+    def size(self, key: str) -> Optional[int]:
+        """Size of the object in bytes, None if it does not exist"""
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the object at `key`, missing objects are ignored"""
+        ...
+
+    @abstractmethod
+    def uri(self, key: str) -> str:
+        """Location of the object as stored in `Document.source`"""
+        ...
+
+    @abstractmethod
+    def key_from_uri(self, uri: str) -> str:
+        """Inverse of `uri`, raises `OutsideStorageError` for a URI outside of the storage"""
+        ...
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        """Read bytes `start` to `end` (exclusive) of the object at `key`"""
+        with self.open(key) as stream:
+            stream.seek(start)
+            return stream.read(end - start)
+
+    def copy(self, src_key: str, dst_key: str) -> None:
+        """Copy the object at `src_key` to `dst_key` without going through the caller when possible"""
+        with self.local_copy(src_key) as path:
+            self.put_file(path, dst_key)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Path of the object on the local filesystem, None for remote storages"""
+        return None
+
+    def move_file(self, local_path: str | Path, key: str) -> None:
+        """Move a local file to `key`, the local file is removed afterwards"""
+        self.put_file(local_path, key)
+        Path(local_path).unlink(missing_ok=True)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[Path]:
+        """
+        Make the object at `key` available as a local file for the duration of the context
+
+        Local storages yield the object itself, remote ones download it to a
+        temporary file that is removed on exit.
+        """
+        path = self.local_path(key)
+        if path is not None:
+            yield path
+            return
+
+        temp_dir = Path(tempfile.mkdtemp(prefix="storage_"))
+        try:
+            temp_path = temp_dir / Path(key).name
+            self.get_file(key, temp_path)
+            yield temp_path
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
@@ -0,0 +1,135 @@
+# src/storage/blob_store.py
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from pydantic import BaseModel
+from src.logger import get_formatted_logger
+from .base import Storage
+from .factory import get_storage
+from .staging import StagedFile
+
+logger = get_formatted_logger(__file__)
+
+
+class BlobRef(BaseModel):
+    """Small reference to a blob, safe to send through the task broker"""
+
+    key: str
+    sha256: str
+    size: int
+
+
+class BlobStore:
+    """
+    Content-addressed blob store.
+
+    Blobs are keyed by their sha256 digest and sharded into `ab/cd/<sha256>`
+    directories, so storing the same content twice keeps a single copy.
+    """
+
+    def __init__(self, storage: Storage, prefix: str = "blobs"):
+        """
+        Initialize the blob store
+
+        Args:
+            storage (Storage): Backend holding the blobs
+            prefix (str): Key prefix of the blobs inside the storage
+        """
+        self.storage = storage
+        self.prefix = prefix.strip("/")
+
+    def key_for(self, sha256: str) -> str:
+        return f"{self.prefix}/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+    def ref_for(self, sha256: str) -> Optional[BlobRef]:
+        """
+        Get a reference to an already stored blob
+
+        Args:
+            sha256 (str): Digest of the blob
+
+        Returns:
+            Optional[BlobRef]: Reference to the blob, None if it is not stored
+        """
+        key = self.key_for(sha256)
+        size = self.storage.size(key)
+        if size is None:
+            return None
+        return BlobRef(key=key, sha256=sha256, size=size)
+
+    def put_file(self, local_path: str | Path, sha256: str, size: int, move: bool = False) -> BlobRef:
+        """
+        Store a local file whose digest is already known
+
+        Args:
+            local_path (str | Path): File to store
+            sha256 (str): Digest of the file
+            size (int): Size of the file in bytes
+            move (bool): Remove the local file once it is stored
+
+        Returns:
+            BlobRef: Reference to the stored blob
+        """
+        key = self.key_for(sha256)
+        if self.storage.exists(key):
+            logger.debug(f"Blob {sha256} already stored")
+            if move:
+                Path(local_path).unlink(missing_ok=True)
+        elif move:
+            self.storage.move_file(local_path, key)
+        else:
+            self.storage.put_file(local_path, key)
+        return BlobRef(key=key, sha256=sha256, size=size)
+
+    def put_staged(self, staged: StagedFile) -> BlobRef:
+        """
+        Move a staged file into the store
+
+        Args:
+            staged (StagedFile): File written to the staging area
+
+        Returns:
+            BlobRef: Reference to the stored blob
+        """
+        return self.put_file(staged.path, staged.sha256, staged.size, move=True)
+
+    def fetch(self, ref: BlobRef, local_path: str | Path) -> None:
+        """
+        Copy a blob to a local file
+
+        Args:
+            ref (BlobRef): Reference to the blob
+            local_path (str | Path): Destination file
+        """
+        size = self.storage.size(ref.key)
+        if size is None:
+            raise FileNotFoundError(f"Blob not found: {ref.key}")
+        if size != ref.size:
+            raise ValueError(f"Blob {ref.key} size mismatch: expected {ref.size}, got {size}")
+        self.storage.get_file(ref.key, local_path)
+
+    def place(self, ref: BlobRef, key: str) -> None:
+        """
+        Make a blob available under another key of the same storage
+
+        Local storages hardlink the blob and S3 copies it server-side, so the
+        content is not written a second time by the caller.
+
+        Args:
+            ref (BlobRef): Reference to the blob
+            key (str): Destination key
+        """
+        size = self.storage.size(ref.key)
+        if size is None:
+            raise FileNotFoundError(f"Blob not found: {ref.key}")
+        if size != ref.size:
+            raise ValueError(f"Blob {ref.key} size mismatch: expected {ref.size}, got {size}")
+        self.storage.copy(ref.key, key)
+
+    def delete(self, ref: BlobRef) -> None:
+        self.storage.delete(ref.key)
+
+
+@lru_cache(maxsize=1)
+def get_blob_store() -> BlobStore:
+    return BlobStore(get_storage(), prefix="blobs")
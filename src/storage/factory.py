@@ -0,0 +1,29 @@
+# src/storage/factory.py
+from functools import lru_cache
+from src.config import global_config
+from .base import Storage
+from .local import LocalStorage
+
+
+@lru_cache(maxsize=1)
+def get_storage() -> Storage:
+    """Process-wide storage selected by `STORAGE_CONFIG.backend`"""
+    storage_config = global_config.STORAGE_CONFIG
+    if storage_config.backend == "s3":
+        from boto3.s3.transfer import TransferConfig
+        from src.db.aws import get_aws_s3_client
+        from .s3 import S3Storage
+
+        return S3Storage(
+            s3_client=get_aws_s3_client(),
+            bucket_name=storage_config.bucket,
+            transfer_config=TransferConfig(
+                multipart_threshold=storage_config.s3_multipart_threshold,
+                multipart_chunksize=storage_config.s3_multipart_chunksize,
+                max_concurrency=storage_config.s3_max_concurrency,
+            ),
+            range_block_size=storage_config.s3_range_block_size,
+        )
+    if storage_config.backend == "local":
+        return LocalStorage(root=storage_config.local_dir, fsync=storage_config.fsync)
+    raise ValueError(f"Unsupported storage backend: {storage_config.backend}")
@@ -0,0 +1,109 @@
+# src/storage/local.py
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO, Optional
+from .base import FSYNC_POLICIES, OutsideStorageError, Storage, fsync_directory, fsync_file
+
+
+class LocalStorage(Storage):
+    """
+    Storage backed by a directory on the local filesystem.
+
+    Also serves as the offline stand-in for S3Storage in development and tests.
+    """
+
+    def __init__(self, root: str | Path, fsync: str = "none"):
+        """
+        Initialize the local storage
+
+        Args:
+            root (str | Path): Directory holding the objects
+            fsync (str): "none", "file" to fsync written files, "full" to also fsync their directory
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Invalid fsync policy: {fsync}")
+        self.root = Path(root)
+        self.fsync = fsync
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def _write_copy(self, src_path: str | Path, path: Path) -> None:
+        # Copy next to the destination and rename, readers never see a partial file
+        part_path = path.with_name(f".{path.name}.{os.getpid()}.part")
+        try:
+            shutil.copyfile(src_path, part_path)
+            if self.fsync != "none":
+                with open(part_path, "rb") as handle:
+                    fsync_file(handle, self.fsync)
+            os.replace(part_path, path)
+        except Exception:
+            part_path.unlink(missing_ok=True)
+            raise
+        fsync_directory(path.parent, self.fsync)
+
+    def put_file(self, local_path: str | Path, key: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_copy(local_path, path)
+
+    def move_file(self, local_path: str | Path, key: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(local_path, path)
+        except OSError:
+            # Different filesystem, fall back to copy + delete
+            self._write_copy(local_path, path)
+            Path(local_path).unlink(missing_ok=True)
+            return
+        fsync_directory(path.parent, self.fsync)
+
+    def copy(self, src_key: str, dst_key: str) -> None:
+        # Objects are never modified in place, so a hardlink is as good as a copy
+        src_path = self._path(src_key)
+        path = self._path(dst_key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(src_path, path)
+        except FileExistsError:
+            path.unlink()
+            os.link(src_path, path)
+        except OSError:
+            # Filesystem without hardlinks
+            self._write_copy(src_path, path)
+            return
+        fsync_directory(path.parent, self.fsync)
+
+    def get_file(self, key: str, local_path: str | Path) -> None:
+        shutil.copyfile(self._path(key), local_path)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def size(self, key: str) -> Optional[int]:
+        path = self._path(key)
+        return path.stat().st_size if path.exists() else None
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def uri(self, key: str) -> str:
+        return str(self.root / key)
+
+    def key_from_uri(self, uri: str) -> str:
+        try:
+            return Path(uri).resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            raise OutsideStorageError(f"{uri} is outside of the storage root {self.root}")
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self._path(key)
@@ -0,0 +1,30 @@
+# src/storage/quarantine.py
+from datetime import datetime
+from pathlib import PurePosixPath
+from src.logger import get_formatted_logger
+from .factory import get_storage
+
+logger = get_formatted_logger(__file__)
+
+QUARANTINE_PREFIX = "quarantine"
+
+
+def quarantine_file(key: str) -> str:
+    """
+    Move a file that cannot be parsed out of the upload area
+
+    The file is kept under `quarantine/<date>/` of the same storage for inspection,
+    its blob in the blob store is left untouched.
+
+    Args:
+        key (str): Storage key of the file
+
+    Returns:
+        str: Storage URI of the quarantined file
+    """
+    storage = get_storage()
+    quarantine_key = f"{QUARANTINE_PREFIX}/{datetime.now().strftime('%Y/%m/%d')}/{PurePosixPath(key).name}"
+    storage.copy(key, quarantine_key)
+    storage.delete(key)
+    logger.warning(f"Quarantined {key} as {quarantine_key}")
+    return storage.uri(quarantine_key)
@@ -0,0 +1,272 @@
+# src/storage/resumable.py
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from pydantic import BaseModel
+from src.config import global_config
+from src.logger import get_formatted_logger
+from .staging import StagedFile, StagingArea, get_staging_area
+
+logger = get_formatted_logger(__file__)
+
+
+class ResumableUpload(BaseModel):
+    """State of a resumable upload, `offset` is the number of bytes received so far"""
+
+    upload_id: str
+    filename: str
+    size: int
+    sha256: Optional[str] = None
+    offset: int = 0
+
+
+class UploadOffsetMismatch(Exception):
+    """Raised when a part does not start at the current offset of the upload"""
+
+    def __init__(self, expected: int, received: int):
+        self.expected = expected
+        self.received = received
+        super().__init__(f"Upload offset mismatch: expected {expected}, received {received}")
+
+
+class ResumableUploadStore:
+    """
+    Keeps partially received uploads on disk.
+
+    Each upload is a `<id>.part` file, to which parts are appended as they
+    arrive, and a `<id>.json` file with the declared filename, size and hash.
+    A dropped connection only loses the part in flight; the client asks for
+    the current offset and continues from there.
+
+    Parts are hashed as they are appended. The hash state cannot be written to
+    disk, it is kept in memory with the offset it covers; an upload continued on
+    another process is hashed again when it is finalized. Uploads idle for
+    longer than `ttl` seconds are dropped.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        staging_area: StagingArea,
+        ttl: Optional[int] = None,
+        cleanup_interval: int = 3600,
+    ):
+        """
+        Initialize the resumable upload store
+
+        Args:
+            root (str | Path): Directory holding the partial uploads
+            staging_area (StagingArea): Staging area receiving finalized uploads
+            ttl (Optional[int]): Seconds before an idle upload is dropped, None keeps them
+            cleanup_interval (int): Seconds between two sweeps of the idle uploads
+        """
+        self.root = Path(root)
+        self.staging_area = staging_area
+        self.ttl = ttl
+        self.cleanup_interval = cleanup_interval
+        self._digests: Dict[str, Tuple[int, Any]] = {}
+        self._last_cleanup = 0.0
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _part_path(self, upload_id: str) -> Path:
+        return self.root / f"{uuid.UUID(upload_id).hex}.part"
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.root / f"{uuid.UUID(upload_id).hex}.json"
+
+    def create(self, filename: str, size: int, sha256: Optional[str] = None) -> ResumableUpload:
+        """
+        Start a new resumable upload
+
+        Args:
+            filename (str): Original filename
+            size (int): Total size of the file in bytes
+            sha256 (Optional[str]): Expected digest, checked when the upload is finalized
+
+        Returns:
+            ResumableUpload: State of the new upload
+        """
+        if self.ttl is not None and time.monotonic() - self._last_cleanup >= self.cleanup_interval:
+            self._last_cleanup = time.monotonic()
+            self.cleanup_expired()
+        upload = ResumableUpload(
+            upload_id=str(uuid.uuid4()),
+            filename=filename,
+            size=size,
+            sha256=sha256.lower() if sha256 else None,
+        )
+        self._part_path(upload.upload_id).touch()
+        self._meta_path(upload.upload_id).write_text(
+            upload.model_dump_json(exclude={"offset"})
+        )
+        return upload
+
+    def get(self, upload_id: str) -> ResumableUpload:
+        """
+        Get the state of a resumable upload
+
+        Args:
+            upload_id (str): ID of the upload
+
+        Returns:
+            ResumableUpload: State of the upload
+        """
+        try:
+            meta = json.loads(self._meta_path(upload_id).read_text())
+            offset = self._part_path(upload_id).stat().st_size
+        except (ValueError, FileNotFoundError):
+            raise KeyError(f"Upload {upload_id} not found")
+        return ResumableUpload(**meta, offset=offset)
+
+    async def append(
+        self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]
+    ) -> ResumableUpload:
+        """
+        Append a part to an upload
+
+        Args:
+            upload_id (str): ID of the upload
+            offset (int): Offset of the first byte of the part, must match the current offset
+            chunks (AsyncIterator[bytes]): Content of the part
+
+        Returns:
+            ResumableUpload: State of the upload after the part is written
+        """
+        upload = self.get(upload_id)
+        with open(self._part_path(upload_id), "ab") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            current = handle.seek(0, os.SEEK_END)
+            if offset != current:
+                raise UploadOffsetMismatch(expected=current, received=offset)
+            # Continue the hash of the previous parts, unless they were received by another process
+            hashed_offset, digest = self._digests.get(uuid.UUID(upload_id).hex, (0, hashlib.sha256()))
+            digest = digest.copy() if hashed_offset == current else None
+            try:
+                async for chunk in chunks:
+                    if current + len(chunk) > upload.size:
+                        raise ValueError(f"Upload exceeds the declared size of {upload.size} bytes")
+                    await asyncio.to_thread(handle.write, chunk)
+                    if digest is not None:
+                        digest.update(chunk)
+                    current += len(chunk)
+            except ValueError:
+                # Drop the rejected part so the upload can continue from `offset`
+                handle.truncate(offset)
+                digest = None
+                raise
+            finally:
+                # The bytes written before a dropped connection are kept, and so is their hash
+                if digest is not None and current != offset:
+                    self._digests[uuid.UUID(upload_id).hex] = (current, digest)
+        upload.offset = current
+        return upload
+
+    def _hash_part(self, upload_id: str) -> str:
+        digest = hashlib.sha256()
+        with open(self._part_path(upload_id), "rb") as handle:
+            while chunk := handle.read(self.staging_area.chunk_size):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    async def finalize(self, upload_id: str) -> StagedFile:
+        """
+        Verify a complete upload and move it to the staging area
+
+        Args:
+            upload_id (str): ID of the upload
+
+        Returns:
+            StagedFile: The assembled file in the staging area
+        """
+        upload = self.get(upload_id)
+        if upload.offset != upload.size:
+            raise ValueError(f"Upload incomplete: received {upload.offset} of {upload.size} bytes")
+
+        part_path = self._part_path(upload_id)
+        hashed_offset, digest = self._digests.get(uuid.UUID(upload_id).hex, (None, None))
+        if hashed_offset == upload.offset:
+            sha256 = digest.hexdigest()
+        else:
+            sha256 = await asyncio.to_thread(self._hash_part, upload_id)
+        if upload.sha256 and upload.sha256 != sha256:
+            raise ValueError(f"Upload hash mismatch: expected {upload.sha256}, got {sha256}")
+
+        staged_path = self.staging_area.root / f"{uuid.UUID(upload_id).hex}{Path(upload.filename).suffix.lower()}"
+        os.replace(part_path, staged_path)
+        self._meta_path(upload_id).unlink(missing_ok=True)
+        self._digests.pop(uuid.UUID(upload_id).hex, None)
+        logger.debug(f"Finalized resumable upload {upload_id} --> {staged_path}")
+        return StagedFile(
+            path=str(staged_path),
+            filename=upload.filename,
+            sha256=sha256,
+            size=upload.size,
+        )
+
+    def abort(self, upload_id: str) -> None:
+        """
+        Drop a resumable upload and everything received so far
+
+        Args:
+            upload_id (str): ID of the upload
+        """
+        self.get(upload_id)
+        self._part_path(upload_id).unlink(missing_ok=True)
+        self._meta_path(upload_id).unlink(missing_ok=True)
+        self._digests.pop(uuid.UUID(upload_id).hex, None)
+
+    def cleanup_expired(self) -> int:
+        """
+        Drop the uploads that received nothing for `ttl` seconds
+
+        Returns:
+            int: Number of uploads dropped
+        """
+        if self.ttl is None:
+            return 0
+        expires = time.time() - self.ttl
+        dropped = 0
+        for meta_path in self.root.glob("*.json"):
+            part_path = meta_path.with_suffix(".part")
+            try:
+                last_modified = max(
+                    path.stat().st_mtime for path in (meta_path, part_path) if path.exists()
+                )
+                if last_modified >= expires:
+                    continue
+                part_path.unlink(missing_ok=True)
+                meta_path.unlink(missing_ok=True)
+            except (ValueError, OSError) as e:
+                logger.warning(f"Failed to drop idle resumable upload {meta_path.stem}: {str(e)}")
+                continue
+            self._digests.pop(meta_path.stem, None)
+            dropped += 1
+        # A part whose metadata is gone can no longer be finalized
+        for part_path in self.root.glob("*.part"):
+            if not part_path.with_suffix(".json").exists():
+                try:
+                    if part_path.stat().st_mtime < expires:
+                        part_path.unlink(missing_ok=True)
+                except OSError:
+                    continue
+        if dropped:
+            logger.info(f"Dropped {dropped} idle resumable uploads")
+        return dropped
+
+
+@lru_cache(maxsize=1)
+def get_resumable_upload_store() -> ResumableUploadStore:
+    staging_area = get_staging_area()
+    return ResumableUploadStore(
+        root=staging_area.root / "resumable",
+        staging_area=staging_area,
+        ttl=global_config.STORAGE_CONFIG.resumable_upload_ttl,
+        cleanup_interval=global_config.STORAGE_CONFIG.resumable_cleanup_interval,
+    )
@@ -0,0 +1,173 @@
+# src/storage/s3.py
+import io
+from pathlib import Path
+from typing import BinaryIO, Optional
+from urllib.parse import urlparse
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+from src.db.aws import S3Client
+from .base import OutsideStorageError, Storage
+
+
+class S3ObjectReader(io.RawIOBase):
+    """
+    Seekable read-only view of an S3 object backed by ranged GET requests.
+
+    Readers that seek around a file (zip based formats, PDF cross references)
+    only download the byte ranges they actually touch.
+    """
+
+    def __init__(self, client, bucket_name: str, object_name: str, size: int):
+        self._client = client
+        self._bucket_name = bucket_name
+        self._object_name = object_name
+        self._size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        if self._position >= self._size or len(buffer) == 0:
+            return 0
+        end = min(self._position + len(buffer), self._size) - 1
+        response = self._client.get_object(
+            Bucket=self._bucket_name,
+            Key=self._object_name,
+            Range=f"bytes={self._position}-{end}",
+        )
+        data = response["Body"].read()
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+class S3Storage(Storage):
+    """Storage backed by an S3 bucket"""
+
+    def __init__(
+        self,
+        s3_client: S3Client,
+        bucket_name: str,
+        prefix: str = "",
+        transfer_config: Optional[TransferConfig] = None,
+        range_block_size: int = 1048576,
+    ):
+        """
+        Initialize the S3 storage
+
+        Args:
+            s3_client (S3Client): Client used for all S3 requests
+            bucket_name (str): Bucket holding the objects
+            prefix (str): Prefix prepended to every key
+            transfer_config (Optional[TransferConfig]): Multipart/concurrency settings for uploads and downloads
+            range_block_size (int): Size of the ranged GET requests issued by `open`
+        """
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.prefix = prefix.strip("/")
+        self.transfer_config = transfer_config or TransferConfig()
+        self.range_block_size = range_block_size
+
+    def _object_name(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put_file(self, local_path: str | Path, key: str) -> None:
+        self.s3_client.upload_file(
+            bucket_name=self.bucket_name,
+            object_name=self._object_name(key),
+            file_path=local_path,
+            transfer_config=self.transfer_config,
+        )
+
+    def get_file(self, key: str, local_path: str | Path) -> None:
+        self.s3_client.client.download_file(
+            Bucket=self.bucket_name,
+            Key=self._object_name(key),
+            Filename=str(local_path),
+            Config=self.transfer_config,
+        )
+
+    def copy(self, src_key: str, dst_key: str) -> None:
+        # Server-side (multipart) copy, the content never leaves S3
+        self.s3_client.client.copy(
+            CopySource={"Bucket": self.bucket_name, "Key": self._object_name(src_key)},
+            Bucket=self.bucket_name,
+            Key=self._object_name(dst_key),
+            Config=self.transfer_config,
+        )
+
+    def open(self, key: str) -> BinaryIO:
+        size = self.size(key)
+        if size is None:
+            raise FileNotFoundError(f"Object not found: {self.bucket_name}/{self._object_name(key)}")
+        raw = S3ObjectReader(
+            self.s3_client.client, self.bucket_name, self._object_name(key), size
+        )
+        return io.BufferedReader(raw, buffer_size=self.range_block_size)
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        if end <= start:
+            return b""
+        response = self.s3_client.client.get_object(
+            Bucket=self.bucket_name,
+            Key=self._object_name(key),
+            Range=f"bytes={start}-{end - 1}",
+        )
+        return response["Body"].read()
+
+    def _head(self, key: str) -> Optional[dict]:
+        try:
+            return self.s3_client.client.head_object(
+                Bucket=self.bucket_name, Key=self._object_name(key)
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NoSuchBucket"):
+                return None
+            raise
+
+    def exists(self, key: str) -> bool:
+        return self._head(key) is not None
+
+    def size(self, key: str) -> Optional[int]:
+        head = self._head(key)
+        return head["ContentLength"] if head else None
+
+    def delete(self, key: str) -> None:
+        self.s3_client.client.delete_object(
+            Bucket=self.bucket_name, Key=self._object_name(key)
+        )
+
+    def uri(self, key: str) -> str:
+        return f"s3://{self.bucket_name}/{self._object_name(key)}"
+
+    def key_from_uri(self, uri: str) -> str:
+        parsed = urlparse(uri)
+        object_name = parsed.path.lstrip("/")
+        if parsed.scheme != "s3" or parsed.netloc != self.bucket_name:
+            raise OutsideStorageError(f"{uri} is not in bucket {self.bucket_name}")
+        if self.prefix:
+            if not object_name.startswith(f"{self.prefix}/"):
+                raise OutsideStorageError(f"{uri} is outside of prefix {self.prefix}")
+            object_name = object_name[len(self.prefix) + 1:]
+        return object_name
@@ -0,0 +1,262 @@
+# src/storage/staging.py
+import asyncio
+import hashlib
+import os
+import tarfile
+import uuid
+import zipfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+from pydantic import BaseModel
+from src.config import global_config
+from src.logger import get_formatted_logger
+from .base import FSYNC_POLICIES, fsync_directory, fsync_file
+
+logger = get_formatted_logger(__file__)
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz")
+
+
+def is_archive(filename: str) -> bool:
+    return filename.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+class StagedFile(BaseModel):
+    """A file written to the staging area"""
+
+    path: str
+    filename: str
+    sha256: str
+    size: int
+
+
+class StagingArea:
+    """
+    Local directory where incoming uploads are written chunk by chunk.
+
+    Files are hashed while they are written, so the content never has to be
+    held in memory as a whole.
+    """
+
+    def __init__(self, root: str | Path, chunk_size: int, fsync: str = "none"):
+        """
+        Initialize the staging area
+
+        Args:
+            root (str | Path): Directory used for staged files
+            chunk_size (int): Number of bytes read from the upload per iteration
+            fsync (str): "none", "file" to fsync staged files, "full" to also fsync the directory
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Invalid fsync policy: {fsync}")
+        self.root = Path(root)
+        self.chunk_size = chunk_size
+        self.fsync = fsync
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _new_paths(self, filename: str) -> tuple[Path, Path]:
+        suffix = Path(filename).suffix.lower()
+        staged_id = uuid.uuid4().hex
+        return self.root / f"{staged_id}.part", self.root / f"{staged_id}{suffix}"
+
+    async def stage_upload(self, file: Any, filename: str, max_size: Optional[int] = None) -> StagedFile:
+        """
+        Stream an upload into the staging area
+
+        Args:
+            file (Any): Upload object exposing an async `read(size)` (e.g. fastapi.UploadFile)
+            filename (str): Original filename, its extension is kept on the staged file
+            max_size (Optional[int]): Abort when more bytes than this are received
+
+        Returns:
+            StagedFile: Location, sha256 digest and size of the staged file
+        """
+        part_path, final_path = self._new_paths(filename)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(part_path, "wb") as handle:
+                while True:
+                    chunk = await file.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise ValueError(f"{filename} exceeds the allowed size of {max_size} bytes")
+                    digest.update(chunk)
+                    await asyncio.to_thread(handle.write, chunk)
+                await asyncio.to_thread(fsync_file, handle, self.fsync)
+            os.replace(part_path, final_path)
+            fsync_directory(self.root, self.fsync)
+        except Exception:
+            part_path.unlink(missing_ok=True)
+            raise
+
+        logger.debug(f"Staged {filename} --> {final_path} ({size} bytes)")
+        return StagedFile(
+            path=str(final_path),
+            filename=filename,
+            sha256=digest.hexdigest(),
+            size=size,
+        )
+
+    def stage_fileobj(
+        self, fileobj: BinaryIO, filename: str, max_size: Optional[int] = None
+    ) -> StagedFile:
+        """
+        Stream a synchronous file object into the staging area
+
+        Args:
+            fileobj (BinaryIO): Readable binary file object
+            filename (str): Original filename, its extension is kept on the staged file
+            max_size (Optional[int]): Abort when more bytes than this are read
+
+        Returns:
+            StagedFile: Location, sha256 digest and size of the staged file
+        """
+        part_path, final_path = self._new_paths(filename)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(part_path, "wb") as handle:
+                while chunk := fileobj.read(self.chunk_size):
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise ValueError(f"{filename} exceeds the allowed size of {max_size} bytes")
+                    digest.update(chunk)
+                    handle.write(chunk)
+                fsync_file(handle, self.fsync)
+            os.replace(part_path, final_path)
+            fsync_directory(self.root, self.fsync)
+        except Exception:
+            part_path.unlink(missing_ok=True)
+            raise
+
+        return StagedFile(
+            path=str(final_path),
+            filename=filename,
+            sha256=digest.hexdigest(),
+            size=size,
+        )
+
+    def stage_archive_members(
+        self,
+        archive: StagedFile,
+        allowed_extensions: list[str],
+        max_member_size: Optional[int] = None,
+        max_members: Optional[int] = None,
+        max_total_size: Optional[int] = None,
+    ) -> tuple[list[StagedFile], list[str]]:
+        """
+        Stage every supported file of a zip or tar archive, the archive is discarded afterwards
+
+        The limits are checked against the sizes and member count declared by the archive
+        before anything is extracted, and against the bytes actually written while extracting.
+
+        Args:
+            archive (StagedFile): Staged zip/tar archive
+            allowed_extensions (list[str]): Extensions of the members to keep
+            max_member_size (Optional[int]): Maximum size of a single member
+            max_members (Optional[int]): Maximum number of files in the archive
+            max_total_size (Optional[int]): Maximum total size of the extracted members
+
+        Returns:
+            tuple[list[StagedFile], list[str]]: Staged members and names of the skipped members
+
+        Raises:
+            ValueError: When the archive exceeds one of the limits
+        """
+        staged_members: list[StagedFile] = []
+        skipped: list[str] = []
+        extracted_size = 0
+
+        def _is_supported(name: str) -> bool:
+            filename = Path(name).name.lower()
+            return Path(filename).suffix in allowed_extensions
+
+        def _check_declared(members: list[tuple[str, int]]) -> None:
+            if max_members is not None and len(members) > max_members:
+                raise ValueError(f"{archive.filename} exceeds the limit of {max_members} files")
+            declared_size = sum(size for name, size in members if _is_supported(name))
+            if max_total_size is not None and declared_size > max_total_size:
+                raise ValueError(f"{archive.filename} exceeds the allowed extracted size of {max_total_size} bytes")
+
+        def _stage_member(name: str, open_member) -> None:
+            nonlocal extracted_size
+            filename = Path(name).name.lower()
+            if not filename or filename.startswith(".") or "__macosx" in name.lower():
+                return
+            if not _is_supported(name):
+                skipped.append(name)
+                return
+            # Declared sizes can be forged, the bytes written are bounded too
+            max_size = max_member_size
+            if max_total_size is not None and (max_size is None or max_total_size - extracted_size < max_size):
+                max_size = max_total_size - extracted_size
+            with open_member() as member_file:
+                try:
+                    staged = self.stage_fileobj(member_file, filename, max_size=max_size)
+                except ValueError:
+                    if max_size != max_member_size:
+                        raise ValueError(f"{archive.filename} exceeds the allowed extracted size of {max_total_size} bytes")
+                    raise
+            staged_members.append(staged)
+            extracted_size += staged.size
+
+        try:
+            if archive.filename.endswith(".zip"):
+                with zipfile.ZipFile(archive.path) as zf:
+                    infos = [info for info in zf.infolist() if not info.is_dir()]
+                    _check_declared([(info.filename, info.file_size) for info in infos])
+                    for info in infos:
+                        _stage_member(info.filename, lambda info=info: zf.open(info))
+            else:
+                with tarfile.open(archive.path, "r:*") as tf:
+                    # Members are read as the archive is streamed, checked one at a time
+                    count = 0
+                    for member in tf:
+                        if not member.isfile():
+                            continue
+                        count += 1
+                        if max_members is not None and count > max_members:
+                            raise ValueError(f"{archive.filename} exceeds the limit of {max_members} files")
+                        if (
+                            max_total_size is not None
+                            and _is_supported(member.name)
+                            and extracted_size + member.size > max_total_size
+                        ):
+                            raise ValueError(f"{archive.filename} exceeds the allowed extracted size of {max_total_size} bytes")
+                        _stage_member(member.name, lambda member=member: tf.extractfile(member))
+        except Exception:
+            for staged in staged_members:
+                self.discard(staged)
+            raise
+        finally:
+            self.discard(archive)
+
+        logger.debug(f"Extracted {len(staged_members)} files from {archive.filename}, skipped {len(skipped)}")
+        return staged_members, skipped
+
+    def discard(self, staged: Optional[StagedFile]) -> None:
+        """
+        Remove a staged file if it still exists
+
+        Args:
+            staged (Optional[StagedFile]): Staged file to remove
+        """
+        if staged is None:
+            return
+        try:
+            Path(staged.path).unlink(missing_ok=True)
+        except Exception as e:
+            logger.warning(f"Failed to delete staged file: {str(e)}")
+
+
+@lru_cache(maxsize=1)
+def get_staging_area() -> StagingArea:
+    return StagingArea(
+        root=global_config.STORAGE_CONFIG.staging_dir,
+        chunk_size=global_config.STORAGE_CONFIG.upload_chunk_size,
+        fsync=global_config.STORAGE_CONFIG.fsync,
+    )
@@ -0,0 +1,103 @@
+# src/task_routes.py
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import redis
+from celery.utils.text import str_to_list
+from src.config import global_config
+from src.logger import get_formatted_logger
+
+logger = get_formatted_logger(__file__)
+
+QUEUE_LIGHT = "light"
+QUEUE_CPU = "cpu"
+QUEUE_LLM = "llm"
+QUEUE_AUDIO = "audio"
+QUEUES = (QUEUE_LIGHT, QUEUE_CPU, QUEUE_LLM, QUEUE_AUDIO)
+# Priority steps of the Redis transport, 0 is consumed first (src/tasks/priority.py)
+PRIORITY_STEPS = list(range(10))
+PRIORITY_SEP = ":"
+
+# Tasks whose queue does not depend on the file they handle
+TASK_QUEUES = {
+    # Upload only links or copies the stored blob, whatever the file type
+    "document.upload": QUEUE_LIGHT,
+    "document.parse_pages": QUEUE_CPU,
+    "document.merge_pages": QUEUE_LIGHT,
+    "document.dispatch_deferred": QUEUE_LIGHT,
+}
+
+
+def queue_for_file(file_name: str, size: Optional[int] = None) -> str:
+    """
+    Queue of a task processing a file
+
+    Args:
+        file_name (str): File name or path, its extension selects the queue
+        size (Optional[int]): File size in bytes, when known
+
+    Returns:
+        str: `audio`, `llm`, `cpu` or `light`
+    """
+    queue_config = global_config.QUEUE_CONFIG
+    suffix = Path(file_name).suffix.lower()
+    if suffix in queue_config.audio_extensions:
+        return QUEUE_AUDIO
+    if suffix in queue_config.llm_extensions:
+        return QUEUE_LLM
+    if suffix in queue_config.cpu_extensions:
+        return QUEUE_CPU
+    if size is not None and size > queue_config.light_max_size:
+        return QUEUE_CPU
+    return QUEUE_LIGHT
+
+
+def _file_of_task(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[Optional[str], Optional[int]]:
+    """Name and size of the file handled by a task, from its arguments"""
+    if kwargs.get("file_name"):
+        return kwargs["file_name"], kwargs.get("file_size")
+    for arg in args:
+        if isinstance(arg, str) and Path(arg).suffix:
+            return arg, None
+        if isinstance(arg, dict):
+            # Result of `document.upload` when a parse is chained after it
+            task_info = arg.get("task_info") or {}
+            if task_info.get("file_name"):
+                return task_info["file_name"], task_info.get("size")
+    return None, None
+
+
+def route_task(name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any], options: Dict[str, Any], task=None, **kw) -> Optional[Dict[str, str]]:
+    """
+    Celery router: send each task to the queue of the file it handles
+
+    Tasks without a file go to the default `light` queue, an explicit `queue`
+    option given when the task is sent takes precedence.
+    """
+    if name in TASK_QUEUES:
+        return {"queue": TASK_QUEUES[name]}
+    file_name, size = _file_of_task(args or (), kwargs or {})
+    if file_name is None:
+        return None
+    return {"queue": queue_for_file(file_name, size)}
+
+
+def configure_queue_worker(sender=None, conf=None, options=None, **kwargs) -> None:
+    """
+    `celeryd_init` handler applying `QueueConfig.workers` to a worker started for a single queue
+    """
+    queues = str_to_list((options or {}).get("queues") or [])
+    if len(queues) != 1 or queues[0] not in global_config.QUEUE_CONFIG.workers:
+        return
+    settings = global_config.QUEUE_CONFIG.workers[queues[0]]
+    conf.update(settings)
+    logger.info(f"Worker {sender} configured for queue {queues[0]}: {settings}")
+
+
+@lru_cache(maxsize=1)
+def get_broker_client() -> Optional[redis.Redis]:
+    """Client of the Redis broker, None when the broker is not Redis"""
+    broker_url = global_config.CELERY_BROKER_URL
+    if not broker_url.startswith(("redis://", "rediss://")):
+        return None
+    return redis.Redis.from_url(broker_url, socket_timeout=1.0)
@@ -0,0 +1,133 @@
+# src/tasks/checkpoint.py
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from sqlalchemy import delete, func, update
+from sqlmodel import Session, select
+from src.db import DocumentCheckpoint, DocumentChunk
+from src.logger import get_formatted_logger
+
+logger = get_formatted_logger(__file__)
+
+
+def staging_chunk_key(document_uuid: str) -> str:
+    """`DocumentChunk.document_uuid` of the chunks of a parse that is not complete yet"""
+    return f"staging:{document_uuid}"
+
+
+class ChunkCheckpoint:
+    """
+    Checkpoints of a document parse.
+
+    Chunks are written under `staging_chunk_key(document_uuid)` and committed
+    together with a `DocumentCheckpoint` row recording the next PDF page to
+    parse, so a retried parse resumes from there. `swap` replaces the chunks of
+    the document with the staged ones in the final transaction.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        document_uuid: str,
+        source: str,
+        commit: bool = True,
+    ):
+        """
+        Initialize the checkpoint of a parse
+
+        Args:
+            session (Session): Session writing the chunks
+            document_uuid (str): UUID of the parsed document
+            source (str): Storage URI of the parsed file
+            commit (bool): Commit the session at each checkpoint, False when the caller owns the transaction
+        """
+        self.session = session
+        self.document_uuid = document_uuid
+        self.source = source
+        self.commit = commit
+        self.staging_key = staging_chunk_key(document_uuid)
+        self.position = 0
+        self.chunk_count = 0
+        self.total_tokens = 0
+
+    def _row(self) -> Optional[DocumentCheckpoint]:
+        return self.session.exec(
+            select(DocumentCheckpoint).where(DocumentCheckpoint.document_uuid == self.document_uuid)
+        ).first()
+
+    def load(self) -> int:
+        """
+        Resume from the last checkpoint of the same file, staged chunks of any other parse are dropped
+
+        Returns:
+            int: Next page to parse, 0 without checkpoint
+        """
+        row = self._row()
+        if row is not None and row.source == self.source:
+            self.position = row.position
+            self.chunk_count = row.chunk_count
+            self.total_tokens = row.total_tokens
+            # Staged chunks are committed with their checkpoint, the ones written after it were rolled back
+            logger.info(f"Resume parse of document {self.document_uuid} from position {self.position}")
+            return self.position
+        self.discard()
+        return 0
+
+    def save(self, position: int, chunk_count: int, total_tokens: int) -> None:
+        """
+        Record a checkpoint, the staged chunks must already be written to the session
+
+        Args:
+            position (int): Next page to parse
+            chunk_count (int): Number of staged chunks
+            total_tokens (int): Total token count of the staged chunks
+        """
+        row = self._row() or DocumentCheckpoint(document_uuid=self.document_uuid)
+        row.source = self.source
+        row.position = position
+        row.chunk_count = chunk_count
+        row.total_tokens = total_tokens
+        row.updated_at = datetime.now(timezone.utc)
+        self.session.add(row)
+        if self.commit:
+            self.session.commit()
+        else:
+            self.session.flush()
+        self.position, self.chunk_count, self.total_tokens = position, chunk_count, total_tokens
+
+    def swap(self) -> Tuple[int, int]:
+        """
+        Replace the chunks of the document with the staged chunks, renumbered 0..n-1
+
+        Nothing is committed, the swap becomes visible with the transaction of the caller.
+
+        Returns:
+            Tuple[int, int]: Number of chunks and their total token count
+        """
+        chunk_count, total_tokens = self.session.exec(
+            select(
+                func.count(DocumentChunk.id),
+                func.coalesce(func.sum(DocumentChunk.token_count), 0),
+            ).where(DocumentChunk.document_uuid == self.staging_key)
+        ).one()
+        self.session.exec(delete(DocumentChunk).where(DocumentChunk.document_uuid == self.document_uuid))
+        ranked = (
+            select(
+                DocumentChunk.id,
+                (func.row_number().over(order_by=DocumentChunk.chunk_index) - 1).label("chunk_index"),
+            )
+            .where(DocumentChunk.document_uuid == self.staging_key)
+            .subquery()
+        )
+        self.session.exec(
+            update(DocumentChunk)
+            .where(DocumentChunk.id == ranked.c.id)
+            .values(document_uuid=self.document_uuid, chunk_index=ranked.c.chunk_index)
+        )
+        self.session.exec(delete(DocumentCheckpoint).where(DocumentCheckpoint.document_uuid == self.document_uuid))
+        return chunk_count, total_tokens
+
+    def discard(self) -> None:
+        """Drop the staged chunks and the checkpoint, nothing is committed"""
+        self.session.exec(delete(DocumentChunk).where(DocumentChunk.document_uuid == self.staging_key))
+        self.session.exec(delete(DocumentCheckpoint).where(DocumentCheckpoint.document_uuid == self.document_uuid))
+        self.position = self.chunk_count = self.total_tokens = 0
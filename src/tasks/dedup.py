@@ -0,0 +1,85 @@
+# src/tasks/dedup.py
+from typing import Optional
+from sqlmodel import Session, func, select
+from src.db import Document, DocumentChunk, DocumentStatus, DocumentStep
+from src.logger import get_formatted_logger
+from src.tasks.utils import TaskResponse
+
+logger = get_formatted_logger(__file__)
+
+
+def find_parsed_duplicate(session: Session, document: Document) -> Optional[Document]:
+    """
+    Find an already parsed document with the same content hash
+
+    Args:
+        session: Database session
+        document: Document about to be parsed
+
+    Returns:
+        The first parsed document with the same content, None when there is none
+    """
+    if not document.content_hash:
+        return None
+    statement = (
+        select(Document)
+        .where(
+            Document.content_hash == document.content_hash,
+            Document.uuid != document.uuid,
+            Document.status == DocumentStatus.PARSED,
+            Document.is_deleted == False,  # noqa: E712
+        )
+        .order_by(Document.id)
+    )
+    return session.exec(statement).first()
+
+
+def reuse_parsed_chunks(
+    session: Session, document: Document, duplicate: Document, task_id: str, task_name: str
+) -> TaskResponse:
+    """
+    Mark a document as parsed by referencing the chunks of a duplicate, nothing is parsed or copied
+
+    The document is added to the session, the caller completes its parse job and commits.
+
+    Args:
+        session: Database session
+        document: Document to mark as parsed
+        duplicate: Parsed document with the same content, see `find_parsed_duplicate`
+        task_id: UUID of the parse job
+        task_name: Name of the parse task
+
+    Returns:
+        TaskResponse of the parse job
+    """
+    chunk_source_uuid = duplicate.chunk_source_uuid or duplicate.uuid
+    chunk_count, total_tokens = session.exec(
+        select(
+            func.count(DocumentChunk.id),
+            func.coalesce(func.sum(DocumentChunk.token_count), 0),
+        ).where(DocumentChunk.document_uuid == chunk_source_uuid)
+    ).one()
+
+    document.step = DocumentStep.PARSE
+    document.status = DocumentStatus.PARSED
+    document.chunk_source_uuid = chunk_source_uuid
+    session.add(document)
+    logger.info(f"Document {document.uuid} reuses chunks of {chunk_source_uuid}")
+
+    return TaskResponse(
+        status="success",
+        task_id=task_id,
+        task_name=task_name,
+        task_info={
+            "document_uuid": document.uuid,
+            "chunk_source_uuid": chunk_source_uuid,
+            "total_tokens": total_tokens,
+            "chunk_count": chunk_count,
+            "chunk_range": {
+                "document_uuid": chunk_source_uuid,
+                "start": 0,
+                "end": chunk_count,
+            },
+        },
+        message=f"Document content already parsed as {duplicate.uuid}, chunks reused",
+    )
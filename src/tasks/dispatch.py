@@ -0,0 +1,276 @@
+# src/tasks/dispatch.py
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Collection, Dict, List, Optional, Tuple
+from celery.canvas import Signature
+from sqlalchemy import Select, or_, update
+from sqlmodel import Session, func, select
+from src.celery_worker import celery_app
+from src.config import global_config
+from src.db import Document, DocumentJobs, DocumentStatus, Job, JobStatus, JobType
+from src.logger import get_formatted_logger
+from src.task_routes import PRIORITY_STEPS
+from src.tasks.priority import aged_priority, with_parse_priority
+
+logger = get_formatted_logger(__file__)
+
+
+def _sent_since() -> datetime:
+    """Oldest send time of a pending job still taken as in the broker, see `expire_pending`"""
+    return datetime.now(timezone.utc) - timedelta(seconds=global_config.ADMISSION_CONFIG.pending_timeout)
+
+
+def count_in_flight(session: Session, tenant: str) -> int:
+    """Pending and processing jobs of a tenant, waiting ones included"""
+    return session.exec(
+        select(func.count(Job.id)).where(
+            Job.tenant == tenant,
+            Job.status.in_([JobStatus.PENDING, JobStatus.PROCESSING]),
+        )
+    ).one()
+
+
+def count_deferred(session: Session) -> int:
+    """Jobs of all tenants waiting in the jobs table for their dispatch"""
+    return session.exec(select(func.count(Job.id)).where(Job.deferred_task.is_not(None))).one()
+
+
+def count_queued(session: Session, tenant: Optional[str] = None, exclude: Collection[str] = ()) -> int:
+    """
+    Jobs sent to the broker and not started yet, of a tenant or of all tenants
+
+    A parse chained after an upload is only counted once the upload stored the
+    file, before that its message is not in the broker. Jobs whose UUID is in
+    `exclude` (not sent yet) and jobs sent more than `pending_timeout` seconds
+    ago (lost, see `expire_pending`) are not counted.
+    """
+    statement = (
+        select(func.count(Job.id))
+        .join(DocumentJobs, DocumentJobs.job_uuid == Job.uuid)
+        .join(Document, DocumentJobs.document_uuid == Document.uuid)
+        .where(
+            Job.status == JobStatus.PENDING,
+            Job.deferred_task.is_(None),
+            Job.updated_at >= _sent_since(),
+            or_(Job.type == JobType.UPLOAD, Document.source != ""),
+        )
+    )
+    if tenant is not None:
+        statement = statement.where(Job.tenant == tenant)
+    if exclude:
+        statement = statement.where(Job.uuid.not_in(exclude))
+    return session.exec(statement).one()
+
+
+def broker_capacity(session: Session, exclude: Collection[str] = ()) -> int:
+    """
+    Jobs the broker can still take under `AdmissionConfig.max_queue_depth`
+
+    The depth is the number of jobs sent and not started (`count_queued`), read from
+    the jobs table rather than the broker so it works with any broker and only
+    counts messages that will run.
+    """
+    depth = count_queued(session, exclude=exclude)
+    return max(0, global_config.ADMISSION_CONFIG.max_queue_depth - depth)
+
+
+def plan_dispatch(session: Session, tenant: str, entries: List[Tuple[Job, Signature]]) -> List[Signature]:
+    """
+    Split new jobs of a tenant between the broker and the jobs table
+
+    The jobs within the tenant quota and the broker capacity are sent right away,
+    the others keep their signature in `Job.deferred_task` until `dispatch_deferred`
+    sends them. Jobs of a tenant that already has waiting jobs always wait, so they
+    keep their order. Call it before the jobs are committed.
+
+    Args:
+        session: Database session
+        tenant: Tenant submitting the jobs
+        entries: New jobs with the signature of their task, in submission order
+
+    Returns:
+        Signatures to send once the jobs are committed
+    """
+    admission_config = global_config.ADMISSION_CONFIG
+    new_jobs = [job.uuid for job, _ in entries]
+    waiting = session.exec(
+        select(func.count(Job.id)).where(Job.tenant == tenant, Job.deferred_task.is_not(None))
+    ).one()
+    slots = 0
+    if not waiting:
+        slots = min(
+            admission_config.tenant_queue_quota - count_queued(session, tenant, new_jobs),
+            broker_capacity(session, new_jobs),
+        )
+    slots = max(0, slots)
+    for job, signature in entries[slots:]:
+        job.deferred_task = dict(signature)
+        session.add(job)
+    if len(entries) > slots:
+        logger.info(f"Tenant {tenant}: {len(entries) - slots} of {len(entries)} jobs wait for dispatch")
+    return [signature for _, signature in entries[:slots]]
+
+
+def _waited(job_created_at: datetime, now: datetime) -> float:
+    """Seconds since a job was submitted, databases without time zones return naive UTC datetimes"""
+    if job_created_at.tzinfo is None:
+        job_created_at = job_created_at.replace(tzinfo=timezone.utc)
+    return (now - job_created_at).total_seconds()
+
+
+def _jobs_of_same_documents(job_uuids) -> Select:
+    """UUIDs of the jobs of the documents of `job_uuids`, a list or a subquery"""
+    return select(DocumentJobs.job_uuid).where(
+        DocumentJobs.document_uuid.in_(
+            select(DocumentJobs.document_uuid).where(DocumentJobs.job_uuid.in_(job_uuids))
+        )
+    )
+
+
+def dispatch_deferred(session: Session) -> Dict[str, int]:
+    """
+    Send waiting jobs to the broker, one tenant after the other
+
+    Tenants take turns, the one with the most room left in its quota first, until the
+    broker capacity or the tenant quotas are used up. A tenant with thousands of
+    waiting jobs gets the same share as one with a few.
+
+    Within a tenant the job with the highest priority goes first. Waiting raises the
+    priority of a parse (`aged_priority`), so long parses are not starved by short ones,
+    and it is sent once with that priority: a message in the broker keeps its priority.
+
+    Args:
+        session: Database session, committed before the jobs are sent
+
+    Returns:
+        Dict[str, int]: Number of jobs sent per tenant
+    """
+    admission_config = global_config.ADMISSION_CONFIG
+    capacity = broker_capacity(session)
+    if not capacity:
+        return {}
+
+    now = datetime.now(timezone.utc)
+    tenants = session.exec(
+        select(Job.tenant).where(Job.deferred_task.is_not(None)).distinct()
+    ).all()
+    turns = []
+    for tenant in tenants:
+        quota = admission_config.tenant_queue_quota - count_queued(session, tenant)
+        if quota <= 0:
+            continue
+        # Bounded by `max_in_flight`, only the columns needed to rank them are read
+        waiting = session.exec(
+            select(Job.id, Job.priority, Job.created_at)
+            .where(Job.tenant == tenant, Job.deferred_task.is_not(None))
+        ).all()
+        ranked = sorted(
+            (aged_priority(priority or PRIORITY_STEPS[0], _waited(created_at, now)), created_at, job_id)
+            for job_id, priority, created_at in waiting
+        )[:min(quota, capacity)]
+        turns.append((quota, tenant, deque(ranked)))
+    turns.sort(key=lambda turn: -turn[0])
+
+    selected: List[Tuple[int, int]] = []
+    while capacity and turns:
+        for turn in list(turns):
+            _, _, ranked = turn
+            if not capacity:
+                break
+            if not ranked:
+                turns.remove(turn)
+                continue
+            priority, _, job_id = ranked.popleft()
+            selected.append((job_id, priority))
+            capacity -= 1
+    if not selected:
+        return {}
+
+    jobs = {job.id: job for job in session.exec(select(Job).where(Job.id.in_([job_id for job_id, _ in selected])))}
+    # The parses chained after the uploads are sent with them
+    session.exec(
+        update(Job)
+        .where(
+            Job.status == JobStatus.PENDING,
+            Job.uuid.in_(_jobs_of_same_documents([job.uuid for job in jobs.values()])),
+        )
+        .values(updated_at=now)
+    )
+    sending: List[Tuple[Job, dict]] = []
+    for job_id, priority in selected:
+        job = jobs[job_id]
+        sending.append((job, with_parse_priority(dict(job.deferred_task), priority)))
+        job.deferred_task = None
+        # Send time, a job still pending `pending_timeout` seconds later is expired
+        job.updated_at = now
+        if job.priority is not None:
+            job.priority = priority
+        session.add(job)
+    session.commit()
+
+    sent: Dict[str, int] = {}
+    for index, (job, signature) in enumerate(sending):
+        try:
+            celery_app.signature(signature).apply_async()
+        except Exception:
+            # Back to waiting, the next pass sends them again
+            for unsent, unsent_signature in sending[index:]:
+                unsent.deferred_task = unsent_signature
+                session.add(unsent)
+            session.commit()
+            raise
+        sent[job.tenant] = sent.get(job.tenant, 0) + 1
+    logger.info(f"Dispatched waiting jobs: {sent}")
+    return sent
+
+
+def expire_pending(session: Session) -> int:
+    """
+    Fail the jobs sent to the broker that did not start within `AdmissionConfig.pending_timeout`
+
+    Their message was lost (broker restart, worker killed before the task started, chain
+    broken after the upload). Left pending they would count against the broker depth and
+    the tenant budget forever. Their documents, still uploading or parsing, fail too and
+    can be uploaded or parsed again.
+
+    Args:
+        session: Database session, committed
+
+    Returns:
+        int: Number of jobs expired
+    """
+    timeout = global_config.ADMISSION_CONFIG.pending_timeout
+    expired = session.exec(
+        select(Job).where(
+            Job.status == JobStatus.PENDING,
+            Job.deferred_task.is_(None),
+            Job.updated_at < _sent_since(),
+            # A parse chained after an upload still waiting for its dispatch was not sent
+            Job.uuid.not_in(
+                _jobs_of_same_documents(select(Job.uuid).where(Job.deferred_task.is_not(None)))
+            ),
+        )
+    ).all()
+    if not expired:
+        return 0
+
+    message = f"Not started within {timeout:.0f} seconds, the task message was lost"
+    for job in expired:
+        job.status = JobStatus.FAILED
+        job.message = message
+        job.updated_at = datetime.now(timezone.utc)
+        session.add(job)
+    documents = session.exec(
+        select(Document)
+        .join(DocumentJobs, DocumentJobs.document_uuid == Document.uuid)
+        .where(
+            DocumentJobs.job_uuid.in_([job.uuid for job in expired]),
+            Document.status.in_([DocumentStatus.UPLOADING, DocumentStatus.PARSING]),
+        )
+    ).all()
+    for document in documents:
+        document.status = DocumentStatus.FAILED
+        session.add(document)
+    session.commit()
+    logger.warning(f"Expired {len(expired)} jobs pending for more than {timeout:.0f} seconds")
+    return len(expired)
@@ -1,32 +1,155 @@
 # src/tasks/document_task.py
-import os
-import tempfile
 from pathlib import Path
-from typing import Any, Dict
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sized, Tuple, Union
 import uuid
 from datetime import datetime
 import celery
+from celery.exceptions import Ignore
+from sqlalchemy import delete, or_, update
 from sqlmodel import Session, select
 import traceback
 from asgiref.sync import async_to_sync
 from src.celery_worker import celery_app
-# from src.db.aws import get_aws_s3_client
-from src.readers import FileExtractor, parse_multiple_files
+from src.readers import FileExtractor, get_extractor, lazy_parse_multiple_files, parse_stream, is_streamable
 from src.config import global_config
 from src.logger import get_formatted_logger
-from src.db import Job, Document,DocumentChunk, DocumentJobs,JobStatus, DocumentStatus,get_local_session
-from src.tasks.utils import count_tokens_from_string,clean_text_for_db, TaskResponse
+from src.db import Job, Document,DocumentChunk, DocumentJobs,JobStatus, DocumentStatus, DocumentStep,get_local_session
+from src.db.chunk_writer import ChunkWriter
+from src.storage import BlobRef, get_blob_store, get_storage, quarantine_file
+from src.tasks.utils import batched, clean_text_for_db, TaskResponse
+from src.tasks.token_counter import get_token_counter
+from src.tasks.progress import ProgressCallback, ProgressReporter
+from src.tasks.checkpoint import ChunkCheckpoint, staging_chunk_key
+from src.tasks.errors import ErrorKind, PermanentTaskError, UnsupportedFileError, retry_transient_error
+from src.tasks.time_limits import estimate_time_limits, record_duration
+from src.tasks.dispatch import dispatch_deferred, expire_pending
+from src.tasks.dedup import find_parsed_duplicate, reuse_parsed_chunks
 
 logger = get_formatted_logger(__file__)
 
-# Initialize services that will be used by tasks
-# s3_client = get_aws_s3_client()
+
+def store_document_chunks(
+    documents: Iterable[Any],
+    document_uuid: str,
+    db_session: Session,
+    progress: Optional[ProgressCallback] = None,
+) -> Tuple[int, int]:
+    """
+    Sanitize, count and bulk insert parsed documents as chunks, one bounded batch at a time
+
+    Args:
+        documents: Parsed documents, consumed lazily
+        document_uuid: UUID of the document owning the chunks
+        db_session: Database session
+        progress: Called after each batch when the number of documents is known up front
+
+    Returns:
+        Tuple of the number of chunks and their total token count
+    """
+    total = len(documents) if isinstance(documents, Sized) else None
+    return store_indexed_chunks(enumerate(documents), document_uuid, db_session, progress, total)
+
+
+def store_indexed_chunks(
+    indexed_documents: Iterable[Tuple[int, Any]],
+    document_uuid: str,
+    db_session: Session,
+    progress: Optional[ProgressCallback] = None,
+    total: Optional[int] = None,
+) -> Tuple[int, int]:
+    """
+    Same as `store_document_chunks` for documents paired with their chunk index
+
+    Args:
+        indexed_documents: `(chunk_index, document)` pairs, consumed lazily
+        document_uuid: UUID of the document owning the chunks
+        db_session: Database session
+        progress: Called after each batch when `total` is known
+        total: Number of documents
+
+    Returns:
+        Tuple of the number of chunks and their total token count
+    """
+    token_counter = get_token_counter()
+    chunk_count = 0
+    total_tokens = 0
+    with ChunkWriter(db_session) as chunk_writer:
+        for batch in batched(indexed_documents, global_config.READER_CONFIG.parse_batch_size):
+            texts = [clean_text_for_db(doc.text) for _, doc in batch]
+            token_counts = token_counter.count_batch(texts)
+            for (chunk_index, doc), text, doc_tokens in zip(batch, texts, token_counts):
+                chunk_writer.add(
+                    uuid=str(uuid.uuid4()),
+                    document_uuid=document_uuid,
+                    chunk_index=chunk_index,
+                    text=text,
+                    extra_info=doc.metadata,
+                    token_count=doc_tokens,
+                )
+                chunk_count += 1
+                total_tokens += doc_tokens
+            if progress is not None and total:
+                progress(chunk_count, total)
+    return chunk_count, total_tokens
+
+
+def store_pdf_pages(
+    file_path: Path,
+    db_session: Session,
+    checkpoint: ChunkCheckpoint,
+    progress: Optional[ProgressCallback] = None,
+) -> None:
+    """
+    Parse a PDF file window by window of `READER_CONFIG.checkpoint_pages` pages, from the checkpoint position
+
+    Args:
+        file_path: Local PDF file
+        db_session: Database session
+        checkpoint: Checkpoint of the parse, saved after each window
+        progress: Called after each window with the pages done and the number of pages
+    """
+    reader = get_extractor()[".pdf"]
+    num_pages = reader.count_pages(file_path)
+    step = max(1, global_config.READER_CONFIG.checkpoint_pages)
+    for start in range(checkpoint.position, num_pages, step):
+        end = min(start + step, num_pages)
+        chunk_count, total_tokens = store_indexed_chunks(
+            reader.iter_page_range(file_path, start, end), checkpoint.staging_key, db_session
+        )
+        checkpoint.save(end, checkpoint.chunk_count + chunk_count, checkpoint.total_tokens + total_tokens)
+        if progress is not None:
+            progress(end, num_pages)
+
+
+def get_page_ranges(file_path: str, source_key: str) -> List[Tuple[int, int]]:
+    """
+    Page ranges of a PDF large enough to be parsed by `parse_document_pages` subtasks
+
+    Args:
+        file_path: Storage URI of the document file
+        source_key: Storage key of the document file
+
+    Returns:
+        List of `(start, end)` page ranges, empty when the file is parsed by a single task
+    """
+    reader_config = global_config.READER_CONFIG
+    if Path(file_path).suffix.lower() != ".pdf" or reader_config.pdf_split_min_pages <= 0:
+        return []
+    # Only the cross-reference table is read, through ranged requests on remote storages
+    with get_storage().open(source_key) as stream:
+        num_pages = get_extractor()[".pdf"].count_pages(stream)
+    if num_pages < reader_config.pdf_split_min_pages:
+        return []
+    step = max(1, reader_config.pdf_split_pages)
+    return [(start, min(start + step, num_pages)) for start in range(0, num_pages, step)]
+
 
 @celery_app.task(name="document.upload", bind=True, max_retries=3)
 def upload_document(
     self: celery.Task,
     bucket_name: str,
-    file_content: bytes,
+    blob_ref: Dict[str, Any],
     filename: str,
     session: Session = None,
 ) -> Dict[str, Any]:
@@ -35,7 +158,7 @@ def upload_document(
 
     Args:
         bucket_name: S3 bucket name or storage location identifier
-        file_content: Binary content of the file
+        blob_ref: Serialized BlobRef of the file stored by the API
         filename: Original filename
         session: Database session (optional)
 
@@ -44,7 +167,6 @@ def upload_document(
     """
     # Use provided session or create a new one
     db_session = session or get_local_session()
-    temp_file = None
     
     try:
         # Fetch job and related document in a single operation
@@ -56,7 +178,7 @@ def upload_document(
         )
         result = db_session.exec(statement).first()
         if not result:
-            raise ValueError(f"Job with UUID {self.request.id} not found")
+            raise PermanentTaskError(f"Job with UUID {self.request.id} not found")
             
         job, document = result
         
@@ -67,116 +189,85 @@ def upload_document(
         db_session.flush()
         
         # Generate storage path
-        original_filename = Path(filename)
-        extension = original_filename.suffix.lower() if original_filename.suffix else ".unknown"
         date_path = datetime.now().strftime("%Y/%m/%d")
         file_name = f"{uuid.uuid4()}_{filename}"
-        
-        # Create temp directory
-        temp_dir = Path(tempfile.gettempdir()) / "uploads"
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Use context manager for temp file handling
-        with tempfile.NamedTemporaryFile(delete=False, suffix=extension, dir=temp_dir) as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
-        
-        try:
-            self.update_state(state="PROGRESS", meta={"current": 50, "total": 100})
-            
-            # Set up storage path
-            # file_path = os.path.join(date_path, file_name)
-            
-            # Uncomment and use this for S3 storage when needed
-            # file_path_in_s3 = s3_client.upload_file(
-            #     bucket_name=bucket_name,
-            #     object_name=file_path,
-            #     file_path=temp_file_path,
-            # )
-            # document.source = file_path_in_s3
-            
-            # For local storage
-            
-            local_upload_path = os.path.join("data/upload/", date_path)
-            os.makedirs(local_upload_path, exist_ok=True)
-            file_path = os.path.join(local_upload_path, file_name)
-            # Copy file to local storage
-            with open(file_path, "wb") as f:
-                f.write(file_content)
-                
-            document.source = file_path
-            document.status = DocumentStatus.UPLOADED
-            
-            # Update state and create response
-            self.update_state(state="PROGRESS", meta={"current": 100, "total": 100})
-            
-            task_response = TaskResponse(
-                status="success",
+        self.update_state(state="PROGRESS", meta={"current": 50, "total": 100})
+
+        # Place the blob in the upload directory of the shared storage (local directory or S3),
+        # hardlinked or copied server-side so the content is not written again
+        storage = get_storage()
+        upload_key = f"upload/{date_path}/{file_name}"
+        get_blob_store().place(BlobRef(**blob_ref), upload_key)
+        file_path = storage.uri(upload_key)
+
+        document.source = file_path
+        document.status = DocumentStatus.UPLOADED
+
+        # Update state and create response
+        self.update_state(state="PROGRESS", meta={"current": 100, "total": 100})
+
+        task_response = TaskResponse(
+            status="success",
+            task_id=self.request.id,
+            task_name=self.request.task,
+            task_retry=self.request.retries,
+            task_info={
+                "document_uuid": document.uuid,
+                "bucket_name": bucket_name,
+                "file_source": file_path,
+                "file_name": filename,
+                "sha256": blob_ref["sha256"],
+                "size": blob_ref["size"],
+            },
+            message="Document uploaded successfully",
+        )
+
+        job.status = JobStatus.COMPLETED
+        job.progress = 100
+        job.message = "Document uploaded successfully"
+        job.task = task_response.model_dump()
+
+        # Save changes
+        db_session.add(job)
+        db_session.add(document)
+
+        return task_response.model_dump()
+
+    except Exception as e:
+        logger.error(f"Error uploading document: {str(e)}")
+        logger.error(traceback.format_exc())
+
+        # Transient errors are retried with backoff, permanent ones fail right away
+        error_kind = retry_transient_error(self, e)
+        task_response = TaskResponse(
+                status="error",
                 task_id=self.request.id,
                 task_name=self.request.task,
                 task_retry=self.request.retries,
                 task_info={
-                    "document_uuid": document.uuid,
+                    "document_uuid": document.uuid if 'document' in locals() else None,
                     "bucket_name": bucket_name,
-                    "file_source": file_path,
+                    "file_source": "",
                     "file_name": filename,
+                    "error_kind": error_kind.value,
                 },
-                message="Document uploaded successfully",
+                message=(
+                    f"Task failed after {self.request.retries} retries: {str(e)}"
+                    if error_kind.retryable
+                    else f"Task failed with a {error_kind.value} error: {str(e)}"
+                ),
             )
-            
-            job.status = JobStatus.COMPLETED
-            job.progress = 100
-            job.message = "Document uploaded successfully"
+        if 'document' in locals() and 'job' in locals():
+            document.status = DocumentStatus.FAILED
+            job.status = JobStatus.FAILED
+            job.progress = 0
+            job.message = "Document uploaded failed"
+
             job.task = task_response.model_dump()
-            
-            # Save changes
             db_session.add(job)
             db_session.add(document)
-            
-            return task_response.model_dump()
-            
-        finally:
-            # Clean up temp file - moved to finally block for better handling
-            if os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                except Exception as e:
-                    logger.warning(f"Failed to delete temp file: {str(e)}")
-                    
-    except Exception as e:
-        logger.error(f"Error uploading document: {str(e)}")
-        logger.error(traceback.format_exc())
-        
-        try:
-            # Try to retry the task
-            logger.info(f"Retrying task {self.request.id}, attempt {self.request.retries + 1}")
-            self.retry(countdown=10 * (self.request.retries + 1), exc=e)
-        except self.MaxRetriesExceededError:
-            # Handle max retries case
-            task_response = TaskResponse(
-                    status="error",
-                    task_id=self.request.id,
-                    task_name=self.request.task,
-                    task_retry=self.request.retries,
-                    task_info={
-                        "document_uuid": document.uuid,
-                        "bucket_name": bucket_name,
-                        "file_source": "",
-                        "file_name": filename,
-                    },
-                    message=f"Task failed after {self.request.retries} retries: {str(e)}",
-                )
-            if 'document' in locals() and 'job' in locals():
-                document.status = DocumentStatus.FAILED
-                job.status = JobStatus.FAILED
-                job.progress = 0
-                job.message = "Document uploaded failed"
-        
-                job.task = task_response.model_dump()
-                db_session.add(job)
-                db_session.add(document)
-            
-            return task_response.model_dump()
+
+        return task_response.model_dump()
     
     finally:
         # Only commit if we created the session
@@ -196,20 +287,24 @@ def upload_document(
 @celery_app.task(name="document.parse", bind=True, max_retries=3)
 def parse_document(
     self: celery.Task,
-    file_path: str,
+    file_path: Union[str, Dict[str, Any]],
     session: Session = None,
+    work_units: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Parse a document and extract its content
 
     Args:
-        file_path: Path to the document file
+        file_path: Storage URI of the document file (Document.source), or the result of
+            `upload_document` when both tasks are chained (auto parse)
         session: Database session (optional)
+        work_units: Pages or sheets counted when the parse was submitted, see `parse_task_options`
 
     Returns:
         TaskResponse with extracted documents and token count
     """
     # Use provided session or create a new one
+    started = time.monotonic()
     db_session = session or get_local_session()
     
     try:
@@ -222,73 +317,136 @@ def parse_document(
         )
         result = db_session.exec(statement).first()
         if not result:
-            raise ValueError(f"Job with UUID {self.request.id} not found")
+            raise PermanentTaskError(f"Job with UUID {self.request.id} not found")
             
         job, document = result
-        
-        # Update state and job status
-        self.update_state(state="PROGRESS", meta={"current": 0, "total": 100})
+
+        if isinstance(file_path, dict):
+            # Chained after upload_document, the upload result carries the file location
+            upload_result = file_path
+            file_path = upload_result.get("task_info", {}).get("file_source", "")
+            if upload_result.get("status") != "success":
+                error_response = TaskResponse(
+                    status="error",
+                    task_id=self.request.id,
+                    task_name=self.request.task,
+                    task_retry=self.request.retries,
+                    task_info={"document_uuid": document.uuid, "file_path": file_path},
+                    message=f"Document upload failed: {upload_result.get('message')}",
+                )
+                job.status = JobStatus.FAILED
+                job.message = error_response.message
+                job.task = error_response.model_dump()
+                db_session.add(job)
+                if session is None:
+                    db_session.commit()
+                return error_response.model_dump()
+            document.step = DocumentStep.PARSE
+            document.status = DocumentStatus.PARSING
+            db_session.add(document)
+
+        # Same content already parsed (e.g. uploaded again with auto parse), its chunks are reused
+        duplicate = find_parsed_duplicate(db_session, document)
+        if duplicate:
+            task_response = reuse_parsed_chunks(
+                db_session, document, duplicate, self.request.id, self.request.task
+            )
+            job.status = JobStatus.COMPLETED
+            job.progress = 100
+            job.message = task_response.message
+            job.task = task_response.model_dump()
+            db_session.add(job)
+            if session is None:
+                db_session.commit()
+            return task_response.model_dump()
+
+        # Update job status, committed so the progress writes of the reporter
+        # never wait on the row lock of this transaction
         job.status = JobStatus.PROCESSING
         job.progress = 10
         job.message = "Processing document"
         db_session.add(job)
-        db_session.flush()
+        if session is None:
+            db_session.commit()
+        else:
+            db_session.flush()
+        reporter = ProgressReporter(self, job.uuid, db_interval=None if session is None else 0)
+        reporter.stage("Processing document", 10, 30)
 
         # Verify file exists
-        if not os.path.exists(file_path):
+        storage = get_storage()
+        source_key = storage.key_from_uri(file_path)
+        if not storage.exists(source_key):
             raise FileNotFoundError(f"File not found: {file_path}")
         file_extractor = FileExtractor()
         # Process the document using FileExtractor
         extractor = file_extractor.get_extractor_for_file(file_path)
         if not extractor:
-            raise ValueError(f"No suitable extractor found for file: {file_path}")
+            raise UnsupportedFileError(f"No suitable extractor found for file: {file_path}")
 
-        self.update_state(state="PROGRESS", meta={"current": 30, "total": 100})
-        job.progress = 30
-        job.message = "Extracting content from document"
-        db_session.add(job)
-        db_session.flush()
-        # Parse the files
-        documents = parse_multiple_files(file_path, extractor)
-        if not documents:
-            logger.warning(f"No content extracted from file: {file_path}")
-            documents = []  # Ensure documents is at least an empty list
+        # Chunks are staged and replace the chunks of the document once the parse completes.
+        # Only a PDF parsed by this task resumes from its last checkpoint, the pages before it
+        # are not read again. The other readers parse the whole file in one call, their retry
+        # starts over, and the page range subtasks of a split PDF write their own ranges
+        checkpoint = ChunkCheckpoint(db_session, document.uuid, file_path, commit=session is None)
+        page_ranges = get_page_ranges(file_path, source_key)
+        if not page_ranges and Path(file_path).suffix.lower() == ".pdf":
+            position = checkpoint.load()
+        else:
+            position = 0
+            checkpoint.discard()
 
-        self.update_state(state="PROGRESS", meta={"current": 70, "total": 100})
-        job.progress = 70
-        job.message = "Parse content from list of chunk document"
-        db_session.add(job)
-        db_session.flush()
-        # Count tokens for all documents
-        total_tokens = 0
-        serializable_documents = []
-
-        for idx, doc in enumerate(documents):
-            doc_tokens = count_tokens_from_string(doc.text)
-            total_tokens += doc_tokens
-            chunk_uuid = str(uuid.uuid4())
-            # Convert Document objects to serializable dictionaries
-            serializable_documents.append(
-                {
-                    "id": chunk_uuid,
-                    "text": clean_text_for_db(doc.text),
-                    "metadata": doc.metadata,
-                    "token_count": doc_tokens,
-                }
-            )
-            
-            doc_chunk = DocumentChunk(
-                uuid=chunk_uuid,
-                document_uuid=document.uuid,
-                chunk_index=idx,
-                text=clean_text_for_db(doc.text),
-                extra_info=doc.metadata,
-                token_count=doc_tokens,
+        if page_ranges:
+            # Large PDF, page ranges are parsed by a group of subtasks and merged by a chord
+            # callback that takes over the id of this task, so the job result stays the same
+            reporter.close()
+            message = f"Parsing {len(page_ranges)} page ranges"
+            job.message = message
+            db_session.add(job)
+            if session is None:
+                db_session.commit()
+            self.update_state(state="PROGRESS", meta={"current": job.progress, "total": 100, "message": message})
+            num_pages = page_ranges[-1][1]
+            logger.info(f"Split {file_path} ({num_pages} pages) into {len(page_ranges)} page ranges")
+            return self.replace(
+                celery.chord(
+                    [
+                        parse_document_pages.s(
+                            job.uuid, document.uuid, file_path, start, end, num_pages, len(page_ranges)
+                        ).set(**estimate_time_limits(file_path, None, end - start))
+                        for start, end in page_ranges
+                    ],
+                    merge_document_pages.s(job.uuid, document.uuid, file_path),
+                )
             )
-            db_session.add(doc_chunk)
+
+        reporter.stage("Extracting content from document", 30, 95)
+        # Parse the files, chunks are staged batch by batch as they are extracted
+        if storage.local_path(source_key) is None and is_streamable(file_path):
+            # Remote object read through ranged requests, no local copy needed
+            with storage.open(source_key) as stream:
+                documents = parse_stream(stream, Path(file_path).name, extractor, progress=reporter)
+                store_document_chunks(documents, checkpoint.staging_key, db_session, progress=reporter)
+        else:
+            with storage.local_copy(source_key) as local_path:
+                if Path(file_path).suffix.lower() == ".pdf":
+                    # Pages before the checkpoint are not read again
+                    store_pdf_pages(local_path, db_session, checkpoint, progress=reporter)
+                else:
+                    documents = lazy_parse_multiple_files(str(local_path), extractor, progress=reporter)
+                    store_document_chunks(documents, checkpoint.staging_key, db_session)
+        reporter.close()
+        # The staged chunks replace the chunks of an earlier parse with the final commit
+        chunk_count, total_tokens = checkpoint.swap()
+        if not chunk_count:
+            logger.warning(f"No content extracted from file: {file_path}")
+        if self.request.retries == 0 and not position:
+            # Durations of complete parses calibrate the time limits of the next ones
+            record_duration(file_path, storage.size(source_key), work_units, time.monotonic() - started)
 
         # Update document status
         document.status = DocumentStatus.PARSED
+        document.chunk_source_uuid = None
         db_session.add(document)
         
         # Update job status and task info
@@ -303,9 +461,14 @@ def parse_document(
             task_info={
                 "document_uuid": document.uuid,
                 "file_path": file_path,
-                "chunks": serializable_documents,
                 "total_tokens": total_tokens,
-                "chunk_count": len(documents),
+                "chunk_count": chunk_count,
+                # Chunk content is served by GET /document/{document_uuid}/chunks
+                "chunk_range": {
+                    "document_uuid": document.uuid,
+                    "start": 0,
+                    "end": chunk_count,
+                },
             },
             message="Document parsed successfully",
         )
@@ -319,44 +482,288 @@ def parse_document(
             db_session.commit()
             
         return task_response.model_dump()
-        
+
+    except Ignore:
+        # Replaced by the page range chord
+        raise
     except Exception as e:
-        # Special handling for missing files
+        if 'reporter' in locals():
+            reporter.close()
+        # Chunks written since the last checkpoint are dropped, the retry parses them again
+        if session is None:
+            db_session.rollback()
         logger.error(f"Error processing document: {file_path}")
         logger.error(traceback.format_exc())
-        try:
-            # Try to retry the task
-            logger.info(f"Retrying task {self.request.id}, attempt {self.request.retries + 1}")
-            self.retry(countdown=10 * (self.request.retries + 1), exc=e)
-        except self.MaxRetriesExceededError:
-            logger.error(f"Max retries exceeded for task {self.request.id}")
-            if 'job' in locals() and 'document' in locals():
-                error_response = TaskResponse(
-                        status="error",
-                        task_id=self.request.id,
-                        task_name=self.request.task,
-                        task_retry=self.request.retries,
-                        task_info={
-                            "document_uuid": document.uuid,
-                            "file_path": file_path,
-                            "documents": [],
-                            "total_tokens": 0,
-                            "document_count": 0,
-                        },
-                        message=f"Error processing document: {file_path}, with max retries {self.request.retries}",
-                    )
-                document.status = DocumentStatus.FAILED
-                job.status = JobStatus.FAILED
-                job.message = f"Error processing document: {file_path}, with max retries {self.request.retries}"
-                job.task = error_response.model_dump()
-                
-                db_session.add(job)
-                db_session.add(document)
-                
-                if session is None:
-                    db_session.commit()     
-            return error_response.model_dump()
+        # Transient errors are retried with backoff, missing, unsupported and corrupt files fail right away
+        error_kind = retry_transient_error(self, e)
+        quarantined = None
+        if error_kind == ErrorKind.CORRUPT_INPUT and 'source_key' in locals():
+            try:
+                quarantined = quarantine_file(source_key)
+            except Exception as quarantine_error:
+                logger.error(f"Error quarantining {file_path}: {str(quarantine_error)}")
+        if error_kind.retryable:
+            message = f"Error processing document: {file_path}, with max retries {self.request.retries}"
+        else:
+            message = f"Error processing document: {file_path}, {error_kind.value} error: {str(e)}"
+        error_response = TaskResponse(
+                status="error",
+                task_id=self.request.id,
+                task_name=self.request.task,
+                task_retry=self.request.retries,
+                task_info={
+                    "document_uuid": document.uuid if 'document' in locals() else None,
+                    "file_path": file_path,
+                    "total_tokens": 0,
+                    "chunk_count": 0,
+                    "error_kind": error_kind.value,
+                    "quarantine": quarantined,
+                },
+                message=message,
+            )
+        if 'job' in locals() and 'document' in locals():
+            document.status = DocumentStatus.FAILED
+            if quarantined:
+                document.source = quarantined
+            job.status = JobStatus.FAILED
+            job.message = message
+            job.task = error_response.model_dump()
+
+            db_session.add(job)
+            db_session.add(document)
+
+            if session is None:
+                db_session.commit()
+        return error_response.model_dump()
     finally:
         # Only close if we created the session
         if session is None and 'db_session' in locals():
             db_session.close()
+
+
+@celery_app.task(name="document.parse_pages", bind=True, max_retries=3)
+def parse_document_pages(
+    self: celery.Task,
+    job_uuid: str,
+    document_uuid: str,
+    file_path: str,
+    start: int,
+    end: int,
+    num_pages: int,
+    num_ranges: int,
+    session: Session = None,
+) -> Dict[str, Any]:
+    """
+    Parse the pages `[start, end)` of a PDF document, one subtask of a split parse
+
+    Chunks are written with their position in the whole file as `chunk_index`
+    (see `PDFThumbnailReader.iter_page_range`), `merge_document_pages` makes
+    them contiguous once every range is parsed.
+
+    Args:
+        job_uuid: UUID of the parse job
+        document_uuid: UUID of the parsed document
+        file_path: Storage URI of the document file
+        start: Index of the first page
+        end: Index after the last page
+        num_pages: Number of pages of the file
+        num_ranges: Number of page ranges of the split parse
+        session: Database session (optional)
+
+    Returns:
+        TaskResponse with the number of chunks and tokens of the range
+    """
+    started = time.monotonic()
+    db_session = session or get_local_session()
+
+    try:
+        storage = get_storage()
+        reader = get_extractor()[".pdf"]
+        staging_key = staging_chunk_key(document_uuid)
+        # Chunks left by a failed attempt of this range are replaced in the same transaction
+        db_session.exec(
+            delete(DocumentChunk).where(
+                DocumentChunk.document_uuid == staging_key,
+                or_(
+                    DocumentChunk.chunk_index.between(start, end - 1),
+                    DocumentChunk.chunk_index.between(num_pages + start, num_pages + end - 1),
+                ),
+            )
+        )
+        with storage.local_copy(storage.key_from_uri(file_path)) as local_path:
+            chunk_count, total_tokens = store_indexed_chunks(
+                reader.iter_page_range(local_path, start, end), staging_key, db_session
+            )
+        # Parse progress goes from 10 to 95 as the ranges complete
+        db_session.exec(
+            update(Job)
+            .where(Job.uuid == job_uuid, Job.status == JobStatus.PROCESSING)
+            .values(progress=Job.progress + 85 // num_ranges)
+        )
+        task_response = TaskResponse(
+            status="success",
+            task_id=self.request.id,
+            task_name=self.request.task,
+            task_retry=self.request.retries,
+            task_info={
+                "document_uuid": document_uuid,
+                "start": start,
+                "end": end,
+                "chunk_count": chunk_count,
+                "total_tokens": total_tokens,
+            },
+            message=f"Pages {start}-{end} parsed successfully",
+        )
+        if session is None:
+            db_session.commit()
+        if self.request.retries == 0:
+            record_duration(file_path, None, end - start, time.monotonic() - started)
+        return task_response.model_dump()
+
+    except Exception as e:
+        db_session.rollback()
+        logger.error(f"Error parsing pages {start}-{end} of document: {file_path}")
+        logger.error(traceback.format_exc())
+        error_kind = retry_transient_error(self, e)
+        # Returned instead of raised so the chord callback still runs and fails the job
+        return TaskResponse(
+            status="error",
+            task_id=self.request.id,
+            task_name=self.request.task,
+            task_retry=self.request.retries,
+            task_info={"document_uuid": document_uuid, "start": start, "end": end, "error_kind": error_kind.value},
+            message=f"Error parsing pages {start}-{end} of document: {file_path}: {str(e)}",
+        ).model_dump()
+    finally:
+        if session is None:
+            db_session.close()
+
+
+@celery_app.task(name="document.merge_pages", bind=True)
+def merge_document_pages(
+    self: celery.Task,
+    results: List[Dict[str, Any]],
+    job_uuid: str,
+    document_uuid: str,
+    file_path: str,
+    session: Session = None,
+) -> Dict[str, Any]:
+    """
+    Chord callback of a split parse: renumber the chunks in page order and complete the job
+
+    Args:
+        results: Results of the `parse_document_pages` subtasks
+        job_uuid: UUID of the parse job
+        document_uuid: UUID of the parsed document
+        file_path: Storage URI of the document file
+        session: Database session (optional)
+
+    Returns:
+        TaskResponse of the parse job
+    """
+    db_session = session or get_local_session()
+
+    try:
+        job = db_session.exec(select(Job).where(Job.uuid == job_uuid)).one()
+        document = db_session.exec(select(Document).where(Document.uuid == document_uuid)).one()
+
+        checkpoint = ChunkCheckpoint(db_session, document_uuid, file_path, commit=False)
+        failed = [result for result in results if result.get("status") != "success"]
+        if failed:
+            # Partial content is not kept, the chunks of an earlier parse stay in place
+            checkpoint.discard()
+            quarantined = None
+            if any(result.get("task_info", {}).get("error_kind") == ErrorKind.CORRUPT_INPUT for result in failed):
+                storage = get_storage()
+                quarantined = quarantine_file(storage.key_from_uri(file_path))
+                document.source = quarantined
+            message = f"Error processing document: {file_path}, {len(failed)} of {len(results)} page ranges failed"
+            task_response = TaskResponse(
+                status="error",
+                task_id=job_uuid,
+                task_name="document.parse",
+                task_info={
+                    "document_uuid": document_uuid,
+                    "file_path": file_path,
+                    "total_tokens": 0,
+                    "chunk_count": 0,
+                    "errors": [result.get("message") for result in failed],
+                    "quarantine": quarantined,
+                },
+                message=message,
+            )
+            document.status = DocumentStatus.FAILED
+            job.status = JobStatus.FAILED
+            job.message = message
+        else:
+            # Positions (page, then number of pages plus page for thumbnails) become 0..n-1
+            # and replace the chunks of an earlier parse
+            chunk_count, total_tokens = checkpoint.swap()
+            task_response = TaskResponse(
+                status="success",
+                task_id=job_uuid,
+                task_name="document.parse",
+                task_info={
+                    "document_uuid": document_uuid,
+                    "file_path": file_path,
+                    "total_tokens": total_tokens,
+                    "chunk_count": chunk_count,
+                    "page_ranges": len(results),
+                    # Chunk content is served by GET /document/{document_uuid}/chunks
+                    "chunk_range": {
+                        "document_uuid": document_uuid,
+                        "start": 0,
+                        "end": chunk_count,
+                    },
+                },
+                message="Document parsed successfully",
+            )
+            document.status = DocumentStatus.PARSED
+            document.chunk_source_uuid = None
+            job.status = JobStatus.COMPLETED
+            job.progress = 100
+            job.message = "Document parsed successfully"
+
+        job.task = task_response.model_dump()
+        db_session.add(job)
+        db_session.add(document)
+        if session is None:
+            db_session.commit()
+        return task_response.model_dump()
+
+    except Exception as e:
+        logger.error(f"Error merging page ranges of document: {file_path}")
+        logger.error(traceback.format_exc())
+        db_session.rollback()
+        db_session.exec(
+            update(Job)
+            .where(Job.uuid == job_uuid)
+            .values(status=JobStatus.FAILED, message=f"Error merging page ranges of document: {file_path}: {str(e)}")
+        )
+        if session is None:
+            db_session.commit()
+        raise
+    finally:
+        if session is None:
+            db_session.close()
+
+
+@celery_app.task(name="document.dispatch_deferred")
+def dispatch_deferred_jobs() -> Dict[str, Any]:
+    """
+    Fair dispatch of the jobs waiting in the jobs table, run periodically by celery beat
+
+    Jobs whose message was lost are expired first, so they stop holding broker capacity.
+
+    Returns:
+        TaskResponse with the number of jobs expired and sent per tenant
+    """
+    with get_local_session() as db_session:
+        expired = expire_pending(db_session)
+        sent = dispatch_deferred(db_session)
+    return TaskResponse(
+        status="success",
+        task_name="document.dispatch_deferred",
+        task_info={"sent": sent, "expired": expired},
+        message=f"Dispatched {sum(sent.values())} waiting jobs, expired {expired} lost jobs",
+    ).model_dump()
@@ -0,0 +1,208 @@
+# src/tasks/errors.py
+import enum
+import random
+from typing import Iterator
+from src.config import global_config
+from src.logger import get_formatted_logger
+
+logger = get_formatted_logger(__file__)
+
+
+class ErrorKind(str, enum.Enum):
+    """How a task failure is handled"""
+
+    PERMANENT = "permanent"  # fails immediately
+    CORRUPT_INPUT = "corrupt_input"  # fails immediately, the file is quarantined
+    TRANSIENT = "transient"  # retried with backoff
+    RATE_LIMITED = "rate_limited"  # retried with a longer backoff and more attempts
+
+    @property
+    def retryable(self) -> bool:
+        return self in (ErrorKind.TRANSIENT, ErrorKind.RATE_LIMITED)
+
+
+class TaskError(Exception):
+    """Base error of the task layer, `kind` tells how the failure is handled"""
+
+    kind = ErrorKind.TRANSIENT
+
+
+class PermanentTaskError(TaskError):
+    kind = ErrorKind.PERMANENT
+
+
+class UnsupportedFileError(PermanentTaskError):
+    """No reader for the file extension"""
+
+
+class CorruptInputError(PermanentTaskError):
+    kind = ErrorKind.CORRUPT_INPUT
+
+
+class TransientTaskError(TaskError):
+    kind = ErrorKind.TRANSIENT
+
+
+class RateLimitError(TransientTaskError):
+    kind = ErrorKind.RATE_LIMITED
+
+
+# Matched by class name (including base classes) so optional reader libraries are not imported
+PERMANENT_ERRORS = {
+    "FileNotFoundError",
+    "IsADirectoryError",
+    "PermissionError",
+    "ImportError",
+    "NotImplementedError",
+    "UnsupportedFormatException",
+    "MissingDependencyException",
+    "OutsideStorageError",  # source outside of the storage, e.g. a legacy local path
+}
+CORRUPT_INPUT_ERRORS = {
+    "PdfReadError",  # pypdf, includes PdfStreamError and EmptyFileError
+    "FileDataError",  # PyMuPDF
+    "BadZipFile",  # docx, xlsx
+    "InvalidFileException",  # openpyxl
+    "XLRDError",
+    "UnidentifiedImageError",  # Pillow
+    "JSONDecodeError",
+    "UnicodeDecodeError",
+    "ParserError",  # pandas
+    "EmptyDataError",  # pandas
+}
+TRANSIENT_ERRORS = {
+    "SoftTimeLimitExceeded",
+    "TimeoutError",
+    "ConnectionError",  # builtin and requests
+    "Timeout",  # requests
+    "TransportError",  # httpx, used by the LLM client
+    "TimeoutException",  # httpx
+    "EndpointConnectionError",  # botocore
+    "ConnectTimeoutError",  # botocore
+    "OperationalError",  # database
+}
+THROTTLING_CODES = {"SlowDown", "Throttling", "ThrottlingException", "RequestLimitExceeded", "TooManyRequestsException"}
+
+
+def _error_chain(exc: BaseException) -> Iterator[BaseException]:
+    """The error, then the errors it wraps: MarkItDown conversion attempts and exception causes"""
+    seen = set()
+    pending = [exc]
+    while pending:
+        error = pending.pop(0)
+        if error is None or id(error) in seen:
+            continue
+        seen.add(id(error))
+        yield error
+        for attempt in getattr(error, "attempts", None) or []:
+            if getattr(attempt, "exc_info", None):
+                pending.append(attempt.exc_info[1])
+        pending.append(error.__cause__)
+
+
+def _classify_one(error: BaseException) -> ErrorKind | None:
+    if isinstance(error, TaskError):
+        return error.kind
+    names = {cls.__name__ for cls in type(error).__mro__}
+    # LLM API errors (google-genai APIError) carry the HTTP status code
+    code = getattr(error, "code", None)
+    if "APIError" in names and isinstance(code, int):
+        if code == 429:
+            return ErrorKind.RATE_LIMITED
+        if code == 408 or code >= 500:
+            return ErrorKind.TRANSIENT
+        if code == 400:
+            return ErrorKind.CORRUPT_INPUT
+        return ErrorKind.PERMANENT
+    # S3 throttling (botocore ClientError)
+    response = getattr(error, "response", None)
+    if "ClientError" in names and isinstance(response, dict):
+        if response.get("Error", {}).get("Code") in THROTTLING_CODES:
+            return ErrorKind.RATE_LIMITED
+    if names & TRANSIENT_ERRORS:
+        return ErrorKind.TRANSIENT
+    if names & CORRUPT_INPUT_ERRORS:
+        return ErrorKind.CORRUPT_INPUT
+    if names & PERMANENT_ERRORS:
+        return ErrorKind.PERMANENT
+    return None
+
+
+def classify_error(exc: BaseException) -> ErrorKind:
+    """
+    Classify a task failure
+
+    A conversion failure is classified by the errors it wraps, so a rate limited
+    OCR call inside MarkItDown is retried rather than taken for a corrupt file.
+    Unknown errors are transient, as before the taxonomy.
+
+    Args:
+        exc (BaseException): Error raised by the task
+
+    Returns:
+        ErrorKind: How the failure is handled
+    """
+    kinds = [kind for kind in map(_classify_one, _error_chain(exc)) if kind is not None]
+    for kind in (ErrorKind.RATE_LIMITED, ErrorKind.TRANSIENT, ErrorKind.CORRUPT_INPUT, ErrorKind.PERMANENT):
+        if kind in kinds:
+            return kind
+    if "FileConversionException" in {cls.__name__ for cls in type(exc).__mro__}:
+        # A converter accepted the file but could not read it
+        return ErrorKind.CORRUPT_INPUT
+    return ErrorKind.TRANSIENT
+
+
+def max_retries_for(kind: ErrorKind, default: int) -> int:
+    """Number of retries of a failure, `default` is the `max_retries` of the task"""
+    if kind == ErrorKind.RATE_LIMITED:
+        return max(default, global_config.RETRY_CONFIG.rate_limit_max_retries)
+    return default if kind.retryable else 0
+
+
+def retry_countdown(kind: ErrorKind, retries: int) -> float:
+    """
+    Seconds before the next attempt: exponential backoff with jitter
+
+    Rate limited calls use full jitter from a longer base delay so workers hitting
+    the same quota spread out, other transient errors keep half of the delay fixed.
+
+    Args:
+        kind (ErrorKind): Kind of the failure
+        retries (int): Number of retries already done
+
+    Returns:
+        float: Countdown of the retry
+    """
+    retry_config = global_config.RETRY_CONFIG
+    if kind == ErrorKind.RATE_LIMITED:
+        delay = min(retry_config.max_delay, retry_config.rate_limit_base_delay * 2 ** retries)
+        return random.uniform(0, delay)
+    delay = min(retry_config.max_delay, retry_config.base_delay * 2 ** retries)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def retry_transient_error(task, exc: BaseException) -> ErrorKind:
+    """
+    Retry a bound task when its failure is transient and attempts are left
+
+    Args:
+        task (celery.Task): Bound task that failed
+        exc (BaseException): Error raised by the task
+
+    Returns:
+        ErrorKind: Kind of the failure when the task is not retried, it fails for good
+    """
+    kind = classify_error(exc)
+    max_retries = max_retries_for(kind, task.max_retries)
+    if kind.retryable and task.request.retries < max_retries:
+        countdown = retry_countdown(kind, task.request.retries)
+        logger.info(
+            f"Retrying task {task.request.id} in {countdown:.0f}s after a {kind.value} error, "
+            f"attempt {task.request.retries + 1}"
+        )
+        raise task.retry(countdown=countdown, max_retries=max_retries, exc=exc)
+    if kind.retryable:
+        logger.error(f"Max retries exceeded for task {task.request.id}")
+    else:
+        logger.error(f"Task {task.request.id} failed with a {kind.value} error, not retried")
+    return kind
@@ -0,0 +1,82 @@
+# src/tasks/priority.py
+from bisect import bisect_left
+from typing import Any, Dict, Optional
+from src.config import global_config
+from src.storage import get_storage
+from src.task_routes import PRIORITY_STEPS
+from .time_limits import count_work_units, estimate_duration, time_limits_for_duration
+
+
+def priority_for_duration(seconds: float) -> int:
+    """
+    Priority of a parse expected to run for `seconds`, short parses overtake long ones
+
+    Args:
+        seconds (float): Expected duration, see `estimate_duration`
+
+    Returns:
+        int: Priority, 0 (highest) for the shortest parses
+    """
+    thresholds = global_config.PRIORITY_CONFIG.duration_thresholds
+    return min(bisect_left(thresholds, seconds), PRIORITY_STEPS[-1])
+
+
+def aged_priority(priority: int, waited: float) -> int:
+    """
+    Priority of a parse after waiting `waited` seconds for its dispatch
+
+    Every `aging_interval` waited raises it one step, so long parses are not starved
+    by a steady stream of short ones.
+
+    Args:
+        priority (int): Priority estimated when the parse was submitted
+        waited (float): Seconds since it was submitted
+
+    Returns:
+        int: Raised priority, at most 0
+    """
+    steps = int(waited // global_config.PRIORITY_CONFIG.aging_interval)
+    return max(PRIORITY_STEPS[0], priority - steps)
+
+
+def with_parse_priority(signature: Dict[str, Any], priority: int) -> Dict[str, Any]:
+    """
+    Set the priority of the parse task of a serialized signature, alone or chained after an upload
+
+    Args:
+        signature (Dict[str, Any]): Signature as stored in `Job.deferred_task`
+        priority (int): Priority of the parse
+
+    Returns:
+        Dict[str, Any]: The signature, updated in place
+    """
+    if signature.get("task") == "document.parse":
+        signature.setdefault("options", {})["priority"] = priority
+    for task in signature.get("kwargs", {}).get("tasks", []):
+        with_parse_priority(task, priority)
+    return signature
+
+
+def parse_task_options(file_name: str, key: str, size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Priority, time limits and work units of a parse task, estimated from the file
+
+    Args:
+        file_name (str): File name
+        key (str): Storage key of the file, read for the pages or sheets
+        size (Optional[int]): File size in bytes, read from the storage when unknown
+
+    Returns:
+        Dict[str, Any]: Keyword arguments of `parse_document.signature`: `priority`, `soft_time_limit`,
+            `time_limit`, and the pages or sheets counted for the estimate as the `work_units`
+            task argument, so the parse records its duration without counting them again
+    """
+    if size is None:
+        size = get_storage().size(key)
+    units = count_work_units(file_name, key)
+    expected = estimate_duration(file_name, size, units)
+    return {
+        "priority": priority_for_duration(expected),
+        **time_limits_for_duration(expected),
+        "kwargs": {"work_units": units},
+    }
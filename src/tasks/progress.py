@@ -0,0 +1,171 @@
+# src/tasks/progress.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import celery
+from sqlalchemy import update
+from src.config import global_config
+from src.db import Job, JobStatus, get_local_session
+from src.logger import get_formatted_logger
+
+logger = get_formatted_logger(__file__)
+
+# Called by readers with the number of units (pages, sheets, rows...) done and their total
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+# Progress writes run off the task thread, one at a time per process
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="progress")
+
+
+class ProgressReporter:
+    """
+    Coalesced progress reporting of a running task.
+
+    Readers call the reporter as often as they like (per page, sheet or
+    batch of rows). Updates are published to the result backend only when
+    at least `min_interval` seconds and `min_delta` percent have passed,
+    and to the jobs table every `db_interval` seconds. Both writes happen
+    on a background thread; only the latest pending update is written.
+    """
+
+    def __init__(
+        self,
+        task: celery.Task,
+        job_uuid: str,
+        min_interval: Optional[float] = None,
+        min_delta: Optional[float] = None,
+        db_interval: Optional[float] = None,
+    ):
+        """
+        Initialize the progress reporter
+
+        Args:
+            task (celery.Task): Bound task whose state is updated
+            job_uuid (str): Job of the task, its progress and message are written to the database
+            min_interval (Optional[float]): Minimum seconds between two backend updates
+            min_delta (Optional[float]): Minimum progress change, in percent, for a backend update
+            db_interval (Optional[float]): Minimum seconds between two database writes, 0 to disable them
+        """
+        progress_config = global_config.PROGRESS_CONFIG
+        self.task = task
+        self.task_id = task.request.id
+        self.job_uuid = job_uuid
+        self.min_interval = progress_config.min_interval if min_interval is None else min_interval
+        self.min_delta = progress_config.min_delta if min_delta is None else min_delta
+        self.db_interval = progress_config.db_interval if db_interval is None else db_interval
+
+        self.progress = 0.0
+        self.message = ""
+        self._stage_start = 0.0
+        self._stage_end = 100.0
+        self._stage_started_at = time.monotonic()
+        self._published_at = 0.0
+        self._published_progress = -1.0
+        self._db_written_at = time.monotonic()
+
+        self._lock = threading.Lock()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._write_in_flight = None
+        self._closed = False
+
+    def stage(self, message: str, start: float, end: float) -> None:
+        """
+        Start a stage of the task, its units of work map to `start`..`end` percent
+
+        Args:
+            message (str): Description of the stage
+            start (float): Progress when the stage starts
+            end (float): Progress when the stage is done
+        """
+        self.message = message
+        self._stage_start = start
+        self._stage_end = end
+        self._stage_started_at = time.monotonic()
+        self._set(start, eta_seconds=None, force=True)
+
+    def __call__(self, done: int, total: Optional[int] = None) -> None:
+        """Report `done` units of work out of `total` for the current stage"""
+        if not total:
+            # Unknown total, the progress stays and the units done are published every `min_interval`
+            self._set(self.progress, eta_seconds=None, detail={"done": done}, check_delta=False)
+            return
+        fraction = min(done / total, 1.0)
+        progress = self._stage_start + (self._stage_end - self._stage_start) * fraction
+        elapsed = time.monotonic() - self._stage_started_at
+        eta_seconds = elapsed * (1 - fraction) / fraction if fraction > 0 else None
+        self._set(progress, eta_seconds=eta_seconds, detail={"done": done, "total": total})
+
+    def _set(
+        self,
+        progress: float,
+        eta_seconds: Optional[float],
+        detail: Optional[Dict[str, Any]] = None,
+        force: bool = False,
+        check_delta: bool = True,
+    ) -> None:
+        now = time.monotonic()
+        self.progress = progress
+        if not force and (
+            now - self._published_at < self.min_interval
+            or (check_delta and abs(progress - self._published_progress) < self.min_delta)
+        ):
+            return
+        self._published_at = now
+        self._published_progress = progress
+
+        write_db = self.db_interval > 0 and (force or now - self._db_written_at >= self.db_interval)
+        if write_db:
+            self._db_written_at = now
+        meta = {
+            "current": int(progress),
+            "total": 100,
+            "progress": round(progress, 1),
+            "message": self.message,
+            "eta_seconds": round(eta_seconds, 1) if eta_seconds is not None else None,
+            **(detail or {}),
+        }
+        with self._lock:
+            if self._closed:
+                return
+            # A write already queued picks up the latest meta, and the database flag is sticky
+            write_db = write_db or bool(self._pending and self._pending["write_db"])
+            self._pending = {"meta": meta, "write_db": write_db}
+            if self._write_in_flight is None:
+                self._write_in_flight = _writer.submit(self._drain)
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                pending, self._pending = self._pending, None
+                if pending is None:
+                    self._write_in_flight = None
+                    return
+            meta = pending["meta"]
+            try:
+                self.task.update_state(task_id=self.task_id, state="PROGRESS", meta=meta)
+            except Exception as e:
+                logger.debug(f"Failed to publish progress of {self.task_id}: {str(e)}")
+            if pending["write_db"]:
+                self._write_job(meta)
+
+    def _write_job(self, meta: Dict[str, Any]) -> None:
+        # Separate short transaction, only while the job is still running
+        try:
+            with get_local_session() as session:
+                session.exec(
+                    update(Job)
+                    .where(Job.uuid == self.job_uuid, Job.status == JobStatus.PROCESSING)
+                    .values(progress=meta["current"], message=meta["message"])
+                )
+                session.commit()
+        except Exception as e:
+            logger.debug(f"Failed to write progress of job {self.job_uuid}: {str(e)}")
+
+    def close(self) -> None:
+        """Stop reporting and wait for the pending writes, call before the final job update"""
+        with self._lock:
+            self._closed = True
+            in_flight = self._write_in_flight
+        if in_flight is not None:
+            in_flight.result()
@@ -0,0 +1,163 @@
+# src/tasks/time_limits.py
+import re
+import threading
+import zipfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from src.config import global_config
+from src.logger import get_formatted_logger
+from src.readers import get_extractor
+from src.storage import get_storage
+from src.task_routes import get_broker_client
+
+logger = get_formatted_logger(__file__)
+
+CALIBRATION_KEY = "time_limits:{extension}"
+# Exponentially weighted moving average of the seconds per unit of work, updated atomically
+CALIBRATE_SCRIPT = """
+local rate = tonumber(redis.call('HGET', KEYS[1], 'rate'))
+local observed = tonumber(ARGV[1])
+if rate then
+    rate = rate + tonumber(ARGV[2]) * (observed - rate)
+else
+    rate = observed
+end
+redis.call('HSET', KEYS[1], 'rate', rate)
+return redis.call('HINCRBY', KEYS[1], 'samples', 1)
+"""
+SHEET_RE = re.compile(rb"<(?:\w+:)?sheet\b")
+
+# Calibration of the process when the broker is not Redis
+_local_rates: Dict[str, Tuple[float, int]] = {}
+_local_lock = threading.Lock()
+
+
+def count_work_units(file_name: str, key: str) -> Optional[int]:
+    """
+    Pages of a PDF or sheets of an XLSX file, read from the file headers only
+
+    Args:
+        file_name (str): File name, its extension selects the reader
+        key (str): Storage key of the file
+
+    Returns:
+        Optional[int]: Number of units, None for other files or when the headers cannot be read
+    """
+    suffix = Path(file_name).suffix.lower()
+    if suffix not in (".pdf", ".xlsx"):
+        return None
+    try:
+        with get_storage().open(key) as stream:
+            if suffix == ".pdf":
+                return get_extractor()[".pdf"].count_pages(stream)
+            # The workbook part lists the sheets, the sheets themselves are not read
+            with zipfile.ZipFile(stream) as workbook:
+                return len(SHEET_RE.findall(workbook.read("xl/workbook.xml")))
+    except Exception as e:
+        logger.debug(f"Failed to count the units of {file_name}: {str(e)}")
+        return None
+
+
+def _work(size: Optional[int], units: Optional[int]) -> float:
+    """Units of work of a file: its pages or sheets, else its size in MB (at least 0.1 so small files do not skew the rate)"""
+    if units:
+        return float(units)
+    return max((size or 0) / 1048576, 0.1)
+
+
+def _calibrated_rate(extension: str) -> Optional[float]:
+    time_limit_config = global_config.TIME_LIMIT_CONFIG
+    client = get_broker_client()
+    try:
+        if client is not None:
+            stats = client.hgetall(CALIBRATION_KEY.format(extension=extension))
+            rate, samples = float(stats.get(b"rate", 0)), int(stats.get(b"samples", 0))
+        else:
+            rate, samples = _local_rates.get(extension, (0.0, 0))
+    except Exception as e:
+        logger.debug(f"Failed to read the calibration of {extension}: {str(e)}")
+        return None
+    return rate if samples >= time_limit_config.calibration_min_samples else None
+
+
+def estimate_duration(file_name: str, size: Optional[int], units: Optional[int] = None) -> float:
+    """
+    Expected duration of a parse
+
+    The fixed overhead plus the work (pages, sheets or MB) times the calibrated
+    rate of the extension, or its prior rate until enough durations are recorded.
+
+    Args:
+        file_name (str): File name, its extension selects the rate
+        size (Optional[int]): File size in bytes
+        units (Optional[int]): Pages or sheets, see `count_work_units`
+
+    Returns:
+        float: Expected duration in seconds
+    """
+    time_limit_config = global_config.TIME_LIMIT_CONFIG
+    extension = Path(file_name).suffix.lower()
+    rate = _calibrated_rate(extension)
+    if rate is None:
+        rate = time_limit_config.prior_rates.get(extension, time_limit_config.default_rate)
+    return time_limit_config.overhead + rate * _work(size, units)
+
+
+def time_limits_for_duration(expected: float) -> Dict[str, int]:
+    """
+    Soft and hard time limits of a task expected to run for `expected` seconds
+
+    Args:
+        expected (float): Expected duration in seconds, see `estimate_duration`
+
+    Returns:
+        Dict[str, int]: `soft_time_limit` and `time_limit` in seconds, options of `apply_async` or `Signature.set`
+    """
+    time_limit_config = global_config.TIME_LIMIT_CONFIG
+    soft = int(min(
+        time_limit_config.max_soft_time_limit,
+        max(time_limit_config.min_soft_time_limit, expected * time_limit_config.safety_factor),
+    ))
+    hard = soft + max(time_limit_config.hard_time_limit_margin, soft // 4)
+    return {"soft_time_limit": soft, "time_limit": hard}
+
+
+def estimate_time_limits(file_name: str, size: Optional[int], units: Optional[int] = None) -> Dict[str, int]:
+    """
+    Soft and hard time limits of a parse, see `estimate_duration`
+
+    Args:
+        file_name (str): File name, its extension selects the rate
+        size (Optional[int]): File size in bytes
+        units (Optional[int]): Pages or sheets, see `count_work_units`
+
+    Returns:
+        Dict[str, int]: `soft_time_limit` and `time_limit` in seconds
+    """
+    return time_limits_for_duration(estimate_duration(file_name, size, units))
+
+
+def record_duration(file_name: str, size: Optional[int], units: Optional[int], seconds: float) -> None:
+    """
+    Record the observed duration of a complete parse to calibrate the estimates
+
+    Args:
+        file_name (str): File name
+        size (Optional[int]): File size in bytes
+        units (Optional[int]): Pages or sheets
+        seconds (float): Duration of the parse
+    """
+    time_limit_config = global_config.TIME_LIMIT_CONFIG
+    extension = Path(file_name).suffix.lower()
+    observed = max(0.0, seconds - time_limit_config.overhead) / _work(size, units)
+    weight = time_limit_config.calibration_weight
+    client = get_broker_client()
+    try:
+        if client is not None:
+            client.eval(CALIBRATE_SCRIPT, 1, CALIBRATION_KEY.format(extension=extension), observed, weight)
+        else:
+            with _local_lock:
+                rate, samples = _local_rates.get(extension, (observed, 0))
+                _local_rates[extension] = (rate + weight * (observed - rate), samples + 1)
+    except Exception as e:
+        logger.debug(f"Failed to record the duration of {file_name}: {str(e)}")
@@ -0,0 +1,160 @@
+# src/tasks/token_counter.py
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional
+import tiktoken
+from src.config import global_config
+from src.logger import get_formatted_logger
+
+logger = get_formatted_logger(__file__)
+
+# Exact counts needed before the estimator ratio is calibrated from them
+CALIBRATION_MIN_CHARS = 10000
+
+
+class TokenCounter:
+    """
+    Token counting shared by every task of a process.
+
+    The tiktoken encoding is loaded once, whole documents are encoded with
+    `encode_ordinary_batch` on a thread pool, and counts of recently seen
+    texts are memoized by hash. Texts longer than `estimate_threshold`
+    characters, or every text when the encoding cannot be loaded, are
+    estimated from a characters-per-token ratio calibrated on the exact
+    counts seen so far.
+    """
+
+    def __init__(
+        self,
+        encoding_name: str = "cl100k_base",
+        num_threads: int = 4,
+        memo_size: int = 10000,
+        estimate_threshold: int = 1000000,
+        chars_per_token: float = 4.0,
+    ):
+        """
+        Initialize the token counter
+
+        Args:
+            encoding_name (str): tiktoken encoding
+            num_threads (int): Threads used by batch encoding
+            memo_size (int): Number of memoized counts
+            estimate_threshold (int): Length in characters above which a text is estimated
+            chars_per_token (float): Initial ratio of the estimator
+        """
+        self.encoding_name = encoding_name
+        self.num_threads = num_threads
+        self.memo_size = memo_size
+        self.estimate_threshold = estimate_threshold
+        self.chars_per_token = chars_per_token
+        self._encoding: Optional[tiktoken.Encoding] = None
+        self._encoding_loaded = False
+        self._memo: OrderedDict[bytes, int] = OrderedDict()
+        self._calibration_chars = 0
+        self._calibration_tokens = 0
+        self._lock = threading.Lock()
+
+    @property
+    def encoding(self) -> Optional[tiktoken.Encoding]:
+        """The tiktoken encoding, None when it cannot be loaded (e.g. offline without a cache)"""
+        if not self._encoding_loaded:
+            with self._lock:
+                if not self._encoding_loaded:
+                    try:
+                        self._encoding = tiktoken.get_encoding(self.encoding_name)
+                    except Exception as e:
+                        logger.warning(f"Failed to load encoding {self.encoding_name}, estimating tokens: {str(e)}")
+                    self._encoding_loaded = True
+        return self._encoding
+
+    def estimate(self, text: str) -> int:
+        """Estimate the number of tokens of `text` from its length"""
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def count(self, text: str) -> int:
+        """Number of tokens of `text`"""
+        return self.count_batch([text])[0]
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        """
+        Number of tokens of each text
+
+        Args:
+            texts (List[str]): Texts to count, e.g. all chunks of a document
+
+        Returns:
+            List[int]: Token count of each text, in order
+        """
+        counts: List[Optional[int]] = [None] * len(texts)
+        pending: dict[bytes, List[int]] = {}
+        with self._lock:
+            for idx, text in enumerate(texts):
+                if not text:
+                    counts[idx] = 0
+                    continue
+                key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+                count = self._memo.get(key)
+                if count is not None:
+                    self._memo.move_to_end(key)
+                    counts[idx] = count
+                else:
+                    pending.setdefault(key, []).append(idx)
+
+        if not pending:
+            return counts
+
+        keys = list(pending)
+        unique_texts = [texts[pending[key][0]] for key in keys]
+        encoding = self.encoding
+        exact = [
+            i for i, text in enumerate(unique_texts)
+            if encoding is not None and len(text) <= self.estimate_threshold
+        ]
+        results = [self.estimate(text) for text in unique_texts]
+        if exact:
+            encoded = encoding.encode_ordinary_batch(
+                [unique_texts[i] for i in exact], num_threads=self.num_threads
+            )
+            for i, tokens in zip(exact, encoded):
+                results[i] = len(tokens)
+            self._calibrate(
+                sum(len(unique_texts[i]) for i in exact),
+                sum(results[i] for i in exact),
+            )
+
+        with self._lock:
+            for key, result in zip(keys, results):
+                for idx in pending[key]:
+                    counts[idx] = result
+                self._memo[key] = result
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return counts
+
+    def _calibrate(self, chars: int, tokens: int) -> None:
+        with self._lock:
+            self._calibration_chars += chars
+            self._calibration_tokens += tokens
+            if self._calibration_chars >= CALIBRATION_MIN_CHARS and self._calibration_tokens:
+                self.chars_per_token = self._calibration_chars / self._calibration_tokens
+
+
+def get_token_counter(encoding_name: Optional[str] = None) -> TokenCounter:
+    """Process-wide token counter per encoding, None is the configured encoding"""
+    return _token_counter(encoding_name or global_config.TOKENIZER_CONFIG.encoding_name)
+
+
+# Keyed by the resolved name so the default encoding has a single counter and memo
+@lru_cache(maxsize=None)
+def _token_counter(encoding_name: str) -> TokenCounter:
+    tokenizer_config = global_config.TOKENIZER_CONFIG
+    return TokenCounter(
+        encoding_name=encoding_name,
+        num_threads=tokenizer_config.num_threads,
+        memo_size=tokenizer_config.memo_size,
+        estimate_threshold=tokenizer_config.estimate_threshold,
+        chars_per_token=tokenizer_config.chars_per_token,
+    )
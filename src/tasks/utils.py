@@ -1,7 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import Any, Optional, List, Dict, Union
-import tiktoken
-import re
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional, List, Dict, Union
+from src.tasks.token_counter import get_token_counter
+# Re-exported, the helpers live outside src.tasks so they import without the database
+from src.text import DB_UNSAFE_CHAR_RANGES, clean_text_for_db  # noqa: F401
 
 class TaskBase(BaseModel):
     """Base model for celery tasks"""
@@ -21,32 +23,13 @@ class TaskResponse(TaskBase):
     """Response model for celery tasks"""
     pass
 
-def count_tokens_from_string(string: str, encoding_name: str = "cl100k_base") -> int:
-    """Returns the number of tokens in a text string."""
-    try:
-        encoding = tiktoken.get_encoding(encoding_name)
-        num_tokens = len(encoding.encode(string))
-        return num_tokens
-    except Exception as e:
-        # Fallback: rough estimate of 4 characters per token
-        return len(string)
-
-def clean_text_for_db(text: str) -> str:
-    """
-    Clean text to ensure it's safe for database insertion.
-    Removes null bytes and all non-printable/control characters.
-    """
-    if not isinstance(text, str):
-        return text  # skip non-str types
-
-    # Remove null bytes and other control characters (ASCII 0–31, 127)
-    text = re.sub(r'[\x00-\x1F\x7F]', '', text)
+def batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most `size` items"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
 
-    # Optionally: Remove non-characters in Unicode (U+FDD0–U+FDEF and others)
-    text = re.sub(r'[\uFDD0-\uFDEF]', '', text)
-    text = re.sub(r'[\uFFFE\uFFFF]', '', text)  # non-characters
 
-    # Remove invisible formatting characters (optional, common in copy-paste)
-    text = re.sub(r'[\u200B-\u200F\u202A-\u202E\u2060-\u206F]', '', text)
-
-    return text.strip()
\ No newline at end of file
+def count_tokens_from_string(string: str, encoding_name: str = "cl100k_base") -> int:
+    """Returns the number of tokens in a text string."""
+    return get_token_counter(encoding_name).count(string)
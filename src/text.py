@@ -0,0 +1,37 @@
+# src/text.py
+"""Text helpers with no database or Celery side effects on import"""
+import re
+
+# Characters removed before database insertion: ASCII control characters (including
+# null bytes), Unicode non-characters and invisible formatting characters
+DB_UNSAFE_CHAR_RANGES = [
+    (0x00, 0x1F),
+    (0x7F, 0x7F),
+    (0xFDD0, 0xFDEF),
+    (0xFFFE, 0xFFFF),
+    (0x200B, 0x200F),
+    (0x202A, 0x202E),
+    (0x2060, 0x206F),
+]
+# ASCII text goes through str.translate (fast path for ASCII strings),
+# anything else through a single compiled character class
+_ASCII_UNSAFE_TABLE = dict.fromkeys(
+    code for start, end in DB_UNSAFE_CHAR_RANGES if end < 0x80 for code in range(start, end + 1)
+)
+_UNSAFE_CHARS_RE = re.compile(
+    "[" + "".join(f"{re.escape(chr(start))}-{re.escape(chr(end))}" for start, end in DB_UNSAFE_CHAR_RANGES) + "]"
+)
+
+
+def clean_text_for_db(text: str) -> str:
+    """
+    Clean text to ensure it's safe for database insertion.
+    Removes null bytes, non-printable/control characters, Unicode
+    non-characters and invisible formatting characters in a single pass.
+    """
+    if not isinstance(text, str):
+        return text  # skip non-str types
+
+    if text.isascii():
+        return text.translate(_ASCII_UNSAFE_TABLE).strip()
+    return _UNSAFE_CHARS_RE.sub("", text).strip()
@@ -0,0 +1,35 @@
+# tests/conftest.py
+import os
+import tempfile
+from unittest import mock
+
+# The configuration is read on import, the tasks run on SQLite and an in-memory broker
+STORAGE_DIR = tempfile.mkdtemp()
+os.environ.update(
+    CELERY_BROKER_URL="memory://",
+    STORAGE_BACKEND="local",
+    STORAGE_DIR=STORAGE_DIR,
+    STAGING_DIR=os.path.join(STORAGE_DIR, "staging"),
+    GOOGLE_API_KEY=os.environ.get("GOOGLE_API_KEY") or "test",
+)
+# The PostgreSQL engine is created on import but never connected
+for name, value in {"DB_USER": "test", "DB_PASSWORD": "test", "DB_HOST": "localhost", "DB_PORT": "5432", "DB_NAME": "test"}.items():
+    os.environ.setdefault(name, value)
+
+import pytest
+from sqlmodel import create_engine
+import src.db.models as models
+from src.celery_worker import celery_app
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    models.db_metadata.create_all(engine)
+    with mock.patch.object(models, "db_engine", engine):
+        yield engine
+
+
+@pytest.fixture(autouse=True)
+def eager_celery():
+    celery_app.conf.update(task_always_eager=True, result_backend="cache+memory://")
@@ -0,0 +1,105 @@
+# tests/test_checkpoint.py
+from types import SimpleNamespace
+from unittest import mock
+import pytest
+from sqlmodel import Session, select
+from src.config import global_config
+from src.db import DocumentCheckpoint, DocumentChunk
+from src.tasks import document_task
+from src.tasks.checkpoint import ChunkCheckpoint, staging_chunk_key
+from src.tasks.document_task import store_pdf_pages
+
+
+def add_chunk(session, document_uuid, chunk_index, text="", token_count=1):
+    session.add(
+        DocumentChunk(
+            uuid=f"{document_uuid}-{chunk_index}",
+            document_uuid=document_uuid,
+            chunk_index=chunk_index,
+            text=text,
+            token_count=token_count,
+        )
+    )
+
+
+def chunks_of(session, document_uuid):
+    return session.exec(
+        select(DocumentChunk.chunk_index, DocumentChunk.text)
+        .where(DocumentChunk.document_uuid == document_uuid)
+        .order_by(DocumentChunk.chunk_index)
+    ).all()
+
+
+class FakePDFReader:
+    """Ten pages, one chunk per page, records the pages read"""
+
+    def __init__(self, fail_at=None):
+        self.fail_at = fail_at
+        self.pages_read = []
+
+    def count_pages(self, file):
+        return 10
+
+    def iter_page_range(self, file, start, end):
+        for page in range(start, end):
+            if page == self.fail_at:
+                raise RuntimeError(f"Worker lost on page {page}")
+            self.pages_read.append(page)
+            yield page, SimpleNamespace(text=f"page {page}", metadata={"page": page})
+
+
+def test_swap_renumbers_staged_chunks_and_replaces_the_document_chunks(engine):
+    with Session(engine) as session:
+        add_chunk(session, "doc", 0, "old")
+        # Split parses leave gaps in the chunk indexes
+        for chunk_index in (40, 3, 17):
+            add_chunk(session, staging_chunk_key("doc"), chunk_index, f"chunk {chunk_index}", token_count=2)
+        checkpoint = ChunkCheckpoint(session, "doc", "upload/doc.pdf")
+        checkpoint.save(5, 3, 6)
+
+        assert checkpoint.swap() == (3, 6)
+        session.commit()
+
+        assert chunks_of(session, "doc") == [(0, "chunk 3"), (1, "chunk 17"), (2, "chunk 40")]
+        assert chunks_of(session, staging_chunk_key("doc")) == []
+        assert session.exec(select(DocumentCheckpoint)).all() == []
+
+
+def test_load_discards_the_staged_chunks_of_another_file(engine):
+    with Session(engine) as session:
+        add_chunk(session, "doc", 0, "parsed")
+        add_chunk(session, staging_chunk_key("doc"), 0, "staged")
+        ChunkCheckpoint(session, "doc", "upload/old.pdf").save(1, 1, 1)
+
+        assert ChunkCheckpoint(session, "doc", "upload/old.pdf").load() == 1
+        assert ChunkCheckpoint(session, "doc", "upload/new.pdf").load() == 0
+        session.commit()
+
+        assert chunks_of(session, staging_chunk_key("doc")) == []
+        assert chunks_of(session, "doc") == [(0, "parsed")]
+        assert session.exec(select(DocumentCheckpoint)).all() == []
+
+
+def test_retry_resumes_a_pdf_after_its_last_checkpoint(engine, tmp_path):
+    with mock.patch.object(global_config.READER_CONFIG, "checkpoint_pages", 2):
+        reader = FakePDFReader(fail_at=5)
+        with Session(engine) as session, mock.patch.object(document_task, "get_extractor", return_value={".pdf": reader}):
+            with pytest.raises(RuntimeError):
+                store_pdf_pages(tmp_path / "doc.pdf", session, ChunkCheckpoint(session, "doc", "upload/doc.pdf"))
+            # Chunks written after the last checkpoint are rolled back with the failed attempt
+            session.rollback()
+        assert reader.pages_read == [0, 1, 2, 3, 4]
+
+        reader = FakePDFReader()
+        with Session(engine) as session, mock.patch.object(document_task, "get_extractor", return_value={".pdf": reader}):
+            checkpoint = ChunkCheckpoint(session, "doc", "upload/doc.pdf")
+            assert checkpoint.load() == 4
+            store_pdf_pages(tmp_path / "doc.pdf", session, checkpoint)
+            chunk_count, total_tokens = checkpoint.swap()
+            session.commit()
+
+            assert chunk_count == 10
+            assert total_tokens == sum(session.exec(select(DocumentChunk.token_count)).all())
+
+            assert reader.pages_read == [4, 5, 6, 7, 8, 9]
+            assert chunks_of(session, "doc") == [(page, f"page {page}") for page in range(10)]
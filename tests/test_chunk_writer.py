@@ -0,0 +1,112 @@
+# tests/test_chunk_writer.py
+import json
+import re
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+from sqlmodel import Session, select
+from src.db.chunk_writer import CHUNK_COLUMNS, JSON_COLUMNS, ChunkWriter
+from src.db.models import DocumentChunk
+
+TEXT = "tab\there\nnew line\r\nback\\slash \\N not null\x00 nul"
+ROWS = [
+    {"uuid": "c0", "document_uuid": "doc", "chunk_index": 0, "text": TEXT, "token_count": 7,
+     "extra_info": {"page_label": "1", "note": "a\tb\\c\nd"}, "vector": [0.5, -1.0]},
+    {"uuid": "c1", "document_uuid": "doc", "chunk_index": 1, "text": None, "token_count": 0,
+     "extra_info": None, "vector": None},
+]
+
+
+class FakeCursor:
+    def __init__(self):
+        self.copied = None
+
+    def copy_expert(self, sql, file):
+        self.copied = (sql, file.read())
+
+    def close(self):
+        pass
+
+
+def postgres_session(cursor):
+    dbapi_connection = SimpleNamespace(cursor=lambda: cursor)
+    connection = SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql", driver="psycopg2"),
+        connection=SimpleNamespace(dbapi_connection=dbapi_connection),
+    )
+    return SimpleNamespace(connection=lambda: connection)
+
+
+def read_copy_text(data):
+    """Decode rows of the COPY text format the way PostgreSQL reads them"""
+    escapes = {"n": "\n", "r": "\r", "t": "\t", "\\": "\\"}
+    rows = []
+    for line in data.split("\n")[:-1]:
+        values = [
+            None if field == "\\N" else re.sub(r"\\(.)", lambda match: escapes[match.group(1)], field)
+            for field in line.split("\t")
+        ]
+        rows.append(dict(zip(CHUNK_COLUMNS, values)))
+    return rows
+
+
+def write(session, copy_threshold):
+    with ChunkWriter(session, batch_size=100, copy_threshold=copy_threshold) as writer:
+        for row in ROWS:
+            writer.add(**row)
+    return writer
+
+
+def test_copy_escapes_text_and_reads_back_the_input():
+    cursor = FakeCursor()
+    writer = write(postgres_session(cursor), copy_threshold=1)
+
+    sql, data = cursor.copied
+    assert sql.startswith(f"COPY document_chunks ({', '.join(CHUNK_COLUMNS)}) FROM STDIN")
+    assert writer.written == 2
+    copied = read_copy_text(data)
+    assert len(copied) == 2
+    for row, read in zip(ROWS, copied):
+        for column in ("uuid", "document_uuid"):
+            assert read[column] == row[column]
+        assert int(read["chunk_index"]) == row["chunk_index"]
+        assert int(read["token_count"]) == row["token_count"]
+        for column in JSON_COLUMNS:
+            assert (read[column] and json.loads(read[column])) == row[column]
+        # Timestamps are ISO 8601 with their UTC offset
+        created_at = datetime.fromisoformat(read["created_at"])
+        assert created_at.utcoffset().total_seconds() == 0
+    # PostgreSQL text cannot hold NUL, it is dropped
+    assert copied[0]["text"] == TEXT.replace("\x00", "")
+    assert copied[1]["text"] is None
+
+
+def test_execute_values_below_the_copy_threshold():
+    cursor = FakeCursor()
+    with mock.patch("psycopg2.extras.execute_values") as execute_values:
+        writer = write(postgres_session(cursor), copy_threshold=10)
+
+    assert cursor.copied is None
+    assert writer.written == 2
+    (_, sql, values), kwargs = execute_values.call_args
+    assert sql == f"INSERT INTO document_chunks ({', '.join(CHUNK_COLUMNS)}) VALUES %s"
+    assert kwargs == {"page_size": 2}
+    for row, value in zip(ROWS, values):
+        read = dict(zip(CHUNK_COLUMNS, value))
+        for column in JSON_COLUMNS:
+            adapted = read[column].adapted if read[column] is not None else None
+            assert adapted == row[column]
+        assert isinstance(read["created_at"], datetime)
+        assert read["created_at"].utcoffset().total_seconds() == 0
+    assert dict(zip(CHUNK_COLUMNS, values[0]))["text"] == TEXT.replace("\x00", "")
+
+
+def test_other_databases_insert_through_sqlalchemy(engine):
+    with Session(engine) as session:
+        write(session, copy_threshold=1)
+        session.commit()
+        chunks = session.exec(select(DocumentChunk).order_by(DocumentChunk.chunk_index)).all()
+
+    assert [
+        {column: getattr(chunk, column) for column in ROWS[0]} for chunk in chunks
+    ] == ROWS
@@ -0,0 +1,51 @@
+# tests/test_dispatch.py
+from datetime import datetime, timedelta, timezone
+from sqlmodel import Session, select
+from src.db import Document, DocumentJobs, DocumentStatus, DocumentStep, Job, JobStatus, JobType
+from src.tasks.dispatch import count_in_flight, count_queued, expire_pending
+
+HOURS_AGO = datetime.now(timezone.utc) - timedelta(hours=12)
+
+
+def add_document(session, uuid, jobs, status=DocumentStatus.UPLOADING):
+    session.add(
+        Document(uuid=uuid, name=f"{uuid}.txt", source="", step=DocumentStep.UPLOAD, status=status)
+    )
+    for job in jobs:
+        session.add(job)
+        session.add(DocumentJobs(job_uuid=job.uuid, document_uuid=uuid))
+
+
+def test_expire_pending_fails_lost_jobs_only(engine):
+    with Session(engine) as session:
+        # Sent 12 hours ago and never started
+        add_document(session, "lost", [
+            Job(uuid="lost-upload", type=JobType.UPLOAD, tenant="a", updated_at=HOURS_AGO),
+            Job(uuid="lost-parse", type=JobType.PARSE, tenant="a", updated_at=HOURS_AGO),
+        ])
+        # Sent just now
+        add_document(session, "recent", [Job(uuid="recent-upload", type=JobType.UPLOAD, tenant="a")])
+        # Waiting for its dispatch for 12 hours, with its chained parse
+        add_document(session, "deferred", [
+            Job(uuid="deferred-upload", type=JobType.UPLOAD, tenant="a", updated_at=HOURS_AGO,
+                deferred_task={"task": "document.upload"}),
+            Job(uuid="deferred-parse", type=JobType.PARSE, tenant="a", updated_at=HOURS_AGO),
+        ])
+        session.commit()
+        assert count_queued(session, "a") == 1
+
+        assert expire_pending(session) == 2
+
+        statuses = dict(session.exec(select(Job.uuid, Job.status)).all())
+        assert statuses == {
+            "lost-upload": JobStatus.FAILED,
+            "lost-parse": JobStatus.FAILED,
+            "recent-upload": JobStatus.PENDING,
+            "deferred-upload": JobStatus.PENDING,
+            "deferred-parse": JobStatus.PENDING,
+        }
+        documents = dict(session.exec(select(Document.uuid, Document.status)).all())
+        assert documents["lost"] == DocumentStatus.FAILED
+        assert documents["recent"] == DocumentStatus.UPLOADING
+        assert count_in_flight(session, "a") == 3
+        assert expire_pending(session) == 0
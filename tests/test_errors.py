@@ -0,0 +1,81 @@
+# tests/test_errors.py
+import json
+from types import SimpleNamespace
+import pytest
+from src.storage import LocalStorage
+from src.tasks.errors import (
+    CorruptInputError,
+    ErrorKind,
+    RateLimitError,
+    UnsupportedFileError,
+    classify_error,
+)
+
+
+def named_error(name, base=Exception, **attributes):
+    """Error of a class named like the one of an optional library"""
+    error = type(name, (base,), {})()
+    for attribute, value in attributes.items():
+        setattr(error, attribute, value)
+    return error
+
+
+def caused_by(error, cause):
+    error.__cause__ = cause
+    return error
+
+
+def conversion_error(*causes):
+    """MarkItDown FileConversionException wrapping the errors of its conversion attempts"""
+    attempts = [SimpleNamespace(exc_info=(type(cause), cause, None)) for cause in causes]
+    return named_error("FileConversionException", attempts=attempts)
+
+
+def outside_storage_error(tmp_path):
+    try:
+        LocalStorage(tmp_path / "storage").key_from_uri(str(tmp_path / "legacy" / "a.pdf"))
+    except ValueError as error:
+        return error
+
+
+@pytest.mark.parametrize(
+    "error, kind",
+    [
+        (UnsupportedFileError("no reader"), ErrorKind.PERMANENT),
+        (CorruptInputError("broken"), ErrorKind.CORRUPT_INPUT),
+        (RateLimitError("quota"), ErrorKind.RATE_LIMITED),
+        (FileNotFoundError("gone"), ErrorKind.PERMANENT),
+        (PermissionError("denied"), ErrorKind.PERMANENT),
+        (TimeoutError(), ErrorKind.TRANSIENT),
+        (ConnectionResetError(), ErrorKind.TRANSIENT),
+        (json.JSONDecodeError("bad", "{", 0), ErrorKind.CORRUPT_INPUT),
+        (named_error("PdfStreamError", type("PdfReadError", (Exception,), {})), ErrorKind.CORRUPT_INPUT),
+        (named_error("BadZipFile"), ErrorKind.CORRUPT_INPUT),
+        (named_error("OperationalError"), ErrorKind.TRANSIENT),
+        (named_error("APIError", code=429), ErrorKind.RATE_LIMITED),
+        (named_error("APIError", code=503), ErrorKind.TRANSIENT),
+        (named_error("APIError", code=408), ErrorKind.TRANSIENT),
+        (named_error("APIError", code=400), ErrorKind.CORRUPT_INPUT),
+        (named_error("APIError", code=403), ErrorKind.PERMANENT),
+        (named_error("ClientError", response={"Error": {"Code": "SlowDown"}}), ErrorKind.RATE_LIMITED),
+        (named_error("ClientError", response={"Error": {"Code": "AccessDenied"}}), ErrorKind.TRANSIENT),
+        # Unknown errors are retried
+        (RuntimeError("unknown"), ErrorKind.TRANSIENT),
+        (ValueError("unknown"), ErrorKind.TRANSIENT),
+        # Wrapped errors: the most retryable kind of the chain wins
+        (caused_by(RuntimeError(), named_error("APIError", code=429)), ErrorKind.RATE_LIMITED),
+        (caused_by(FileNotFoundError(), TimeoutError()), ErrorKind.TRANSIENT),
+        (conversion_error(named_error("PdfReadError"), named_error("APIError", code=429)), ErrorKind.RATE_LIMITED),
+        (conversion_error(named_error("PdfReadError")), ErrorKind.CORRUPT_INPUT),
+        (conversion_error(RuntimeError()), ErrorKind.CORRUPT_INPUT),
+    ],
+)
+def test_classify_error(error, kind):
+    assert classify_error(error) == kind
+
+
+def test_source_outside_of_the_storage_is_permanent(tmp_path):
+    error = outside_storage_error(tmp_path)
+
+    assert isinstance(error, ValueError)
+    assert classify_error(error) == ErrorKind.PERMANENT
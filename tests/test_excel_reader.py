@@ -0,0 +1,36 @@
+# tests/test_excel_reader.py
+import types
+import pandas as pd
+from src.readers.extractor import get_extractor
+from src.readers.utils import documents_from_conversion, iter_excel_documents, parse_stream
+
+
+def write_workbook(path):
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}).to_excel(writer, sheet_name="First", index=False)
+        pd.DataFrame({"c": [3]}).to_excel(writer, sheet_name="Second", index=False)
+
+
+def test_sheets_are_read_one_at_a_time_as_markitdown_converts_them(tmp_path):
+    path = tmp_path / "book.xlsx"
+    write_workbook(path)
+    converted = documents_from_conversion(get_extractor()[".xlsx"].convert(str(path)), path.name, ".xlsx")
+
+    progress = []
+    documents = iter_excel_documents(path, path.name, ".xlsx", progress=lambda done, total: progress.append((done, total)))
+
+    assert isinstance(documents, types.GeneratorType)
+    documents = list(documents)
+    assert [document.text for document in documents] == [document.text for document in converted]
+    assert [document.metadata["sheet_index"] for document in documents] == [0, 1]
+    assert documents[0].text.startswith("## First")
+    assert progress == [(1, None), (2, None)]
+
+
+def test_parse_stream_reads_excel_sheets_lazily(tmp_path):
+    path = tmp_path / "book.xlsx"
+    write_workbook(path)
+    with open(path, "rb") as stream:
+        documents = parse_stream(stream, "book.xlsx", get_extractor())
+        assert not isinstance(documents, list)
+        assert len(list(documents)) == 2
@@ -0,0 +1,44 @@
+# tests/test_progress.py
+from types import SimpleNamespace
+from src.tasks.progress import ProgressReporter
+
+
+class FakeTask:
+    def __init__(self):
+        self.request = SimpleNamespace(id="task")
+        self.states = []
+
+    def update_state(self, task_id, state, meta):
+        self.states.append(meta)
+
+
+def wait_for_writes(reporter):
+    in_flight = reporter._write_in_flight
+    if in_flight is not None:
+        in_flight.result()
+
+
+def test_unknown_total_is_published_every_min_interval():
+    task = FakeTask()
+    reporter = ProgressReporter(task, "job", min_interval=0, min_delta=5, db_interval=0)
+    reporter.stage("Extracting content from document", 30, 95)
+    wait_for_writes(reporter)
+    for done in (1, 2, 3):
+        reporter(done)
+        wait_for_writes(reporter)
+    reporter.close()
+
+    assert [state.get("done") for state in task.states] == [None, 1, 2, 3]
+    assert {state["progress"] for state in task.states} == {30}
+
+
+def test_known_total_waits_for_min_delta():
+    task = FakeTask()
+    reporter = ProgressReporter(task, "job", min_interval=0, min_delta=5, db_interval=0)
+    reporter.stage("Extracting content from document", 0, 100)
+    for done in range(1, 11):
+        reporter(done, 100)
+    reporter.close()
+
+    assert [state["progress"] for state in task.states][-1] == 10
+    assert len(task.states) <= 3
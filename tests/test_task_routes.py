@@ -0,0 +1,18 @@
+# tests/test_task_routes.py
+from celery import Celery
+from src.celery_worker import celery_app
+from src.task_routes import configure_queue_worker
+
+
+def worker_conf(queues):
+    app = Celery(set_as_current=False)
+    app.conf.update(worker_prefetch_multiplier=celery_app.conf.worker_prefetch_multiplier)
+    configure_queue_worker(sender="worker", conf=app.conf, options={"queues": queues})
+    return app.conf
+
+
+def test_only_light_workers_prefetch_several_tasks():
+    assert celery_app.conf.worker_prefetch_multiplier == 1
+    assert worker_conf("light").worker_prefetch_multiplier == 4
+    for queues in ("cpu", "llm", "audio", "light,cpu", None):
+        assert worker_conf(queues).worker_prefetch_multiplier == 1
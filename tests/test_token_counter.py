@@ -0,0 +1,11 @@
+# tests/test_token_counter.py
+from src.config import global_config
+from src.tasks.token_counter import get_token_counter
+
+
+def test_default_encoding_shares_one_counter():
+    default = global_config.TOKENIZER_CONFIG.encoding_name
+
+    assert get_token_counter() is get_token_counter(default)
+    assert get_token_counter(None) is get_token_counter()
+    assert get_token_counter("o200k_base") is not get_token_counter(default)
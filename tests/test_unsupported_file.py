@@ -0,0 +1,47 @@
+# tests/test_unsupported_file.py
+from unittest import mock
+from sqlmodel import Session, select
+from src.db import Document, DocumentJobs, DocumentStatus, DocumentStep, Job, JobStatus, JobType
+from src.readers.extractor import FileExtractor
+from src.storage import get_storage
+from src.tasks import parse_document
+
+
+def test_extractor_for_unsupported_extension():
+    file_extractor = FileExtractor()
+    assert file_extractor.get_extractor_for_file("a.XYZ") == {}
+    assert list(file_extractor.get_extractor_for_file("a.TXT")) == [".txt"]
+
+
+def test_unsupported_file_fails_without_retry(engine, tmp_path):
+    local_file = tmp_path / "a.XYZ"
+    local_file.write_bytes(b"not a supported format")
+    storage = get_storage()
+    storage.put_file(local_file, "upload/a.XYZ")
+    source = storage.uri("upload/a.XYZ")
+
+    with Session(engine) as session:
+        session.add(Job(uuid="job", type=JobType.PARSE, status=JobStatus.PENDING))
+        session.add(
+            Document(
+                uuid="doc",
+                name="a.XYZ",
+                source=source,
+                extension="XYZ",
+                step=DocumentStep.PARSE,
+                status=DocumentStatus.PARSING,
+            )
+        )
+        session.add(DocumentJobs(job_uuid="job", document_uuid="doc"))
+        session.commit()
+
+    with mock.patch.object(parse_document, "retry") as retry:
+        result = parse_document.apply(args=[source], task_id="job").get()
+
+    retry.assert_not_called()
+    assert result["status"] == "error"
+    assert result["task_retry"] == 0
+    assert result["task_info"]["error_kind"] == "permanent"
+    with Session(engine) as session:
+        job = session.exec(select(Job).where(Job.uuid == "job")).one()
+        assert job.status == JobStatus.FAILED